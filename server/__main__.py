@@ -102,6 +102,19 @@ if __name__ == "__main__":
         help="modbus address of the inverter (default=1).",
     )
 
+    parser.add_argument(
+        "--async_modbus",
+        action="store_true",
+        help="harvest Modbus TCP devices with pipelined requests on a single async engine thread.",
+    )
+
+    parser.add_argument(
+        "--chip_session_idle_s",
+        type=float,
+        default=5.0,
+        help="seconds the crypto chip stays initialized after use, 0 initializes and releases it for every operation (default=5).",
+    )
+
     args = parser.parse_args()
 
     # if the host ip is not set, use the web host
@@ -124,4 +137,11 @@ if __name__ == "__main__":
             args.inverter_type,
             args.inverter_address,
         )
+    if args.async_modbus:
+        from server.devices.inverters.ModbusTCP import ModbusTCP
+        ModbusTCP.ASYNC_HARVEST = True
+
+    import server.crypto.crypto as crypto
+    crypto.Chip.SESSION_IDLE_S = args.chip_session_idle_s
+
     app.main((args.host_ip, args.host_port), (args.web_host, args.web_port), inverter)
@@ -5,9 +5,11 @@ from datetime import datetime
 from server.app.backend_settings_saver import BackendSettingsSaver
 from server.app.task_scheduler import TaskScheduler
 from server.crypto.crypto_state import CryptoState
+from server.crypto.signing_service import SigningService
+import server.crypto.crypto as crypto
 from server.network.network_utils import NetworkUtils
-from server.tasks.checkForWebRequestTask import CheckForWebRequest
 from server.tasks.saveStateTask import SaveStatePerpetualTask
+from server.tasks.itask import Lane
 import server.web.server
 from server.tasks.openDeviceTask import OpenDeviceTask
 from server.devices.inverters.ModbusTCP import ModbusTCP
@@ -21,6 +23,8 @@ from server.tasks.discoverHostsTask import DiscoverHostsTask
 from server.app.settings import ChangeSource
 from server.devices.IComFactory import IComFactory
 from server.tasks.initializeMqttTask import InitializeMqttTask
+from server.tasks.harvest_queue_drain_task import HarvestQueueDrainTask
+from server.backend.http_client import configure_client
 
 logger = logging.getLogger(__name__)
 
@@ -43,22 +47,27 @@ os.environ['LC_ALL'] = 'en_US.UTF-8'
 os.environ['LANG'] = 'en_US.UTF-8'
 
 # Constants
-MAX_WORKERS = 4
+MAX_WORKERS = 4  # realtime workers for harvest and control
+LANE_WORKERS = {Lane.NETWORK: 2, Lane.DISCOVERY: 2}
+HTTP_POOL_SIZE = MAX_WORKERS + LANE_WORKERS[Lane.NETWORK]  # connections kept per backend host, one per worker that calls it
+HTTP_CONNECT_TIMEOUT = 5  # seconds
+HTTP_READ_TIMEOUT = 5  # seconds
 INITIAL_SETTINGS_DELAY = 500  # milliseconds
 SAVE_STATE_DELAY = 10000  # milliseconds (10 seconds)
-CHECK_WEB_REQUEST_DELAY = 1000  # milliseconds
 SCAN_WIFI_DELAY = 10000  # milliseconds
 
 
 def main(server_host: tuple[str, int], web_host: tuple[str, int], inverter: ModbusTCP | None = None):
 
+    configure_client(pool_size=HTTP_POOL_SIZE, connect_timeout=HTTP_CONNECT_TIMEOUT, read_timeout=HTTP_READ_TIMEOUT)
+
     try:
         crypto_state = CryptoState()
     except Exception as e:
         logger.error(f"Failed to get crypto state: {e}")
         return
     bb = BlackBoard(crypto_state)
-    scheduler = TaskScheduler(max_workers=MAX_WORKERS, system_time=bb, task_source=bb)
+    scheduler = TaskScheduler(max_workers=MAX_WORKERS, system_time=bb, task_source=bb, stats=bb.scheduler_stats, lane_workers=LANE_WORKERS)
 
     HarvestFactory(bb)  # this is what creates the harvest tasks when inverters are added
 
@@ -67,6 +76,7 @@ def main(server_host: tuple[str, int], web_host: tuple[str, int], inverter: Modb
     bb.rest_server_port = server_host[1]
     bb.rest_server_ip = server_host[0]
     web_server = server.web.server.Server(web_host, bb)
+    web_server.start()
     logger.info("Server started http://%s:%s", web_host[0], web_host[1])
 
     props = {
@@ -111,10 +121,10 @@ def main(server_host: tuple[str, int], web_host: tuple[str, int], inverter: Modb
     if inverter is not None:
         scheduler.add_task(OpenDeviceTask(bb.time_ms(), bb, inverter))
 
-    scheduler.add_task(CheckForWebRequest(bb.time_ms() + 1000, bb, web_server))
-
     scheduler.add_task(DiscoverHostsTask(bb.time_ms() + 1000, bb))
 
+    scheduler.add_task(HarvestQueueDrainTask(bb.time_ms() + 30000, bb))
+
     # scheduler.add_task(SaveDeviceConfigurationTask(bb.time_ms() + 1000 * 10, bb))
     
     # Initialize MQTT service after web server is ready (5 second delay)
@@ -132,6 +142,7 @@ def main(server_host: tuple[str, int], web_host: tuple[str, int], inverter: Modb
             i.disconnect()
 
         bb.devices.lst.clear()
+        bb.harvest_queue.flush()
         web_server.close()
         
         # Stop MQTT service
@@ -145,6 +156,10 @@ def main(server_host: tuple[str, int], web_host: tuple[str, int], inverter: Modb
         control_client.stop()
         control_client.join()
 
+        # sign what is queued and release the chip that is kept initialized between uses
+        SigningService.get_instance().stop()
+        crypto.Chip.release_session()
+
         # Stop mDNS advertisement
         NetworkUtils.stop_mdns_advertisement()
 
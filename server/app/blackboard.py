@@ -7,7 +7,7 @@ import logging
 import os
 from server.app.isystem_time import ISystemTime
 from server.app.itask_source import ITaskSource
-import server.crypto.crypto as crypto
+from server.crypto.signing_service import SigningService, SigningPriority
 from server.app.message import Message
 from server.crypto.crypto_state import CryptoState
 from server.devices.IComFactory import IComFactory
@@ -16,8 +16,11 @@ from server.app.settings import Settings, ChangeSource
 from server.devices.ICom import ICom
 from server.network.network_utils import HostInfo
 from server.storage.gateway_storage import DeviceStorage
+from server.storage.harvest_queue import HarvestQueue
+from server.app.scheduler_stats import SchedulerStats
 from server.network.network_utils import NetworkUtils
 from server.backend.mqtt_service import MQTTService
+from server.backend.http_client import get_client
     
 
 logger = logging.getLogger(__name__)
@@ -45,6 +48,8 @@ class BlackBoard(ISystemTime, ITaskSource):
     _available_hosts: list[HostInfo]
     _tasks: list[ITask]
     _device_storage: DeviceStorage
+    _harvest_queue: HarvestQueue
+    _scheduler_stats: SchedulerStats
     _mqtt_service: MQTTService
 
     def __init__(self, crypto_state: CryptoState):
@@ -61,12 +66,22 @@ class BlackBoard(ISystemTime, ITaskSource):
         self._available_devices = []
         self._available_hosts = []
         self._device_storage = DeviceStorage()
+        self._harvest_queue = HarvestQueue()
+        self._scheduler_stats = SchedulerStats()
         self._mqtt_service = None # This is set from app.py
 
     @property
     def device_storage(self) -> DeviceStorage:
         return self._device_storage
 
+    @property
+    def harvest_queue(self) -> HarvestQueue:
+        return self._harvest_queue
+
+    @property
+    def scheduler_stats(self) -> SchedulerStats:
+        return self._scheduler_stats
+
     @property
     def mqtt_service(self) -> MQTTService:
         return self._mqtt_service
@@ -157,13 +172,14 @@ class BlackBoard(ISystemTime, ITaskSource):
     def state(self) -> dict:
         state = dict()
         state['balena_uuid'] = os.environ.get('RESIN_DEVICE_UUID', socket.gethostname())
-        state['status'] = {'version': self.get_version(), 'uptime': self.elapsed_time(), 'messages': self.message_state()}
+        state['status'] = {'version': self.get_version(), 'uptime': self.elapsed_time(), 'messages': self.message_state(), 'http_pool': get_client().pool_stats()}
         state['timestamp'] = self.time_ms()
         state['crypto'] = self.crypto_state().to_dict(self.chip_death_count)
         state['network'] = self.network_state()
         state['devices'] = self.devices_state()
         state['available_devices'] = [device.get_config() for device in self.get_available_devices()]
         state['available_hosts'] = [host.to_dict() for host in self.get_available_hosts()]
+        state['scheduler'] = self.scheduler_stats.to_dict()
         return state
 
     def message_state(self) -> dict:
@@ -268,9 +284,8 @@ class BlackBoard(ISystemTime, ITaskSource):
         return (time.monotonic_ns() - self._start_time) // 1_000_000
 
     def get_chip_info(self):
-        with crypto.Chip() as chip:
-            device_name = chip.get_device_name()
-            serial_number = chip.get_serial_number().hex()
+        read = lambda chip: (chip.get_device_name(), chip.get_serial_number().hex())
+        device_name, serial_number = SigningService.get_instance().submit(read, SigningPriority.REQUEST).result(SigningService.TIMEOUT_S)
 
         return "device: " + device_name + " serial: " + serial_number
 
@@ -0,0 +1,153 @@
+import bisect
+import threading
+import time
+from typing import Dict, Optional
+
+
+class LatencyHistogram:
+    """Histogram of durations in milliseconds with fixed, roughly logarithmic buckets"""
+
+    BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1_000, 2_000, 5_000, 10_000)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)  # the last bucket holds everything above the last bound
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, value_ms: float):
+        self.counts[bisect.bisect_left(self.BUCKETS_MS, value_ms)] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Returns the upper bound of the bucket that holds the p:th percentile, the max for the overflow bucket"""
+        if self.count == 0:
+            return None
+        rank = p / 100 * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count > 0:
+                return self.BUCKETS_MS[i] if i < len(self.BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> dict:
+        labels = [f"<={b}" for b in self.BUCKETS_MS] + [f">{self.BUCKETS_MS[-1]}"]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 2) if self.count else None,
+            "p95_ms": self.percentile(95),
+            "max_ms": round(self.max_ms, 2),
+            "buckets": {label: count for label, count in zip(labels, self.counts) if count > 0},
+        }
+
+
+class WorkerUtilization:
+    """How many workers of a pool are busy over time and how long all of them were busy"""
+
+    def __init__(self, max_workers: int, now: float):
+        self.max_workers = max_workers
+        self.active = 0
+        self._since = now
+        self._busy_worker_s = 0.0  # integral of the number of active workers over time
+        self._saturated_s = 0.0  # time all workers were busy
+
+    def set_active(self, active: int, now: float):
+        self.accumulate(now)
+        self.active = active
+
+    def accumulate(self, now: float):
+        elapsed = now - self._since
+        self._busy_worker_s += elapsed * self.active
+        if self.max_workers > 0 and self.active >= self.max_workers:
+            self._saturated_s += elapsed
+        self._since = now
+
+    def to_dict(self, uptime_s: float) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "active_workers": self.active,
+            "worker_utilization": round(self._busy_worker_s / (uptime_s * self.max_workers), 4) if self.max_workers else None,
+            "saturated_ratio": round(self._saturated_s / uptime_s, 4),
+        }
+
+
+class SchedulerStats:
+    """Thread safe instrumentation of the task scheduler: execution time and start lateness per task class,
+    queue depth and how much of the time the workers are busy, in total and per worker lane"""
+
+    def __init__(self, max_workers: int = 0):
+        self._lock = threading.Lock()
+        self._execution: Dict[str, LatencyHistogram] = {}
+        self._lateness: Dict[str, LatencyHistogram] = {}
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+
+        self._start = time.monotonic()
+        self._workers = WorkerUtilization(max_workers, self._start)
+        self._lanes: Dict[str, WorkerUtilization] = {}
+        self._lane_lateness: Dict[str, LatencyHistogram] = {}
+
+    @property
+    def max_workers(self) -> int:
+        return self._workers.max_workers
+
+    @max_workers.setter
+    def max_workers(self, max_workers: int):
+        with self._lock:
+            self._workers.accumulate(time.monotonic())
+            self._workers.max_workers = max_workers
+
+    def set_lane_workers(self, lane: str, max_workers: int):
+        """Track the workers of a lane, a lane can be saturated while the other lanes are idle"""
+        with self._lock:
+            now = time.monotonic()
+            if lane in self._lanes:
+                self._lanes[lane].accumulate(now)
+                self._lanes[lane].max_workers = max_workers
+            else:
+                self._lanes[lane] = WorkerUtilization(max_workers, now)
+
+    def record_execution(self, task_class: str, lateness_ms: float, execution_ms: float, lane: Optional[str] = None):
+        with self._lock:
+            self._lateness.setdefault(task_class, LatencyHistogram()).add(max(0.0, lateness_ms))
+            self._execution.setdefault(task_class, LatencyHistogram()).add(execution_ms)
+            if lane is not None:
+                self._lane_lateness.setdefault(lane, LatencyHistogram()).add(max(0.0, lateness_ms))
+
+    def record_queue_depth(self, depth: int):
+        with self._lock:
+            self.queue_depth = depth
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+
+    def record_active_workers(self, active: int, lane: Optional[str] = None, lane_active: int = 0):
+        """Record the number of busy workers, and of the lane that changed if it is given"""
+        with self._lock:
+            now = time.monotonic()
+            self._workers.set_active(active, now)
+            if lane is not None:
+                self._lanes.setdefault(lane, WorkerUtilization(0, now)).set_active(lane_active, now)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            self._workers.accumulate(now)
+            for workers in self._lanes.values():
+                workers.accumulate(now)
+            uptime_s = max(now - self._start, 1e-9)
+            return {
+                "uptime_s": round(uptime_s, 1),
+                **self._workers.to_dict(uptime_s),
+                "queue_depth": self.queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "lanes": {
+                    lane: {**self._lanes[lane].to_dict(uptime_s), "lateness": self._lane_lateness.get(lane, LatencyHistogram()).to_dict()}
+                    for lane in sorted(self._lanes)
+                },
+                "tasks": {
+                    task_class: {"execution": self._execution[task_class].to_dict(), "lateness": self._lateness[task_class].to_dict()}
+                    for task_class in sorted(self._execution)
+                },
+            }
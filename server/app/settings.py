@@ -262,6 +262,9 @@ class Settings(Observable):
         def __init__(self, parent: Optional[Observable] = None):
             super().__init__(parent)
             self._endpoints = []
+            self._delta_encoding = False
+            self._payload_formats: dict[str, str] = {}
+            self._batch_window_ms = 0
 
         @property
         def HARVEST(self):
@@ -271,16 +274,67 @@ class Settings(Observable):
         def ENDPOINTS(self):
             return "endpoints"
 
+        @property
+        def DELTA_ENCODING(self):
+            return "delta_encoding"
+
+        @property
+        def PAYLOAD_FORMATS(self):
+            return "payload_formats"
+
+        @property
+        def BATCH_WINDOW_MS(self):
+            return "batch_window_ms"
+
         def update_from_dict(self, data: dict, source: ChangeSource):
             if self.ENDPOINTS in data:
                 self._endpoints = data[self.ENDPOINTS]
                 self.notify_listeners(source)
+            if self.DELTA_ENCODING in data:
+                self.set_delta_encoding(bool(data[self.DELTA_ENCODING]), source)
+            if self.PAYLOAD_FORMATS in data:
+                self._payload_formats = dict(data[self.PAYLOAD_FORMATS])
+                self.notify_listeners(source)
+            if self.BATCH_WINDOW_MS in data:
+                self.set_batch_window_ms(int(data[self.BATCH_WINDOW_MS]), source)
 
         def to_dict(self) -> dict:
             return {
-                self.ENDPOINTS: self._endpoints
+                self.ENDPOINTS: self._endpoints,
+                self.DELTA_ENCODING: self._delta_encoding,
+                self.PAYLOAD_FORMATS: self._payload_formats.copy(),
+                self.BATCH_WINDOW_MS: self._batch_window_ms
             }
 
+        @property
+        def delta_encoding(self) -> bool:
+            """True if register harvests are sent delta encoded, see BarnDeltaEncoder"""
+            return self._delta_encoding
+
+        def set_delta_encoding(self, value: bool, source: ChangeSource):
+            if value != self._delta_encoding:
+                self._delta_encoding = value
+                self.notify_listeners(source)
+
+        def payload_format(self, endpoint: str) -> str:
+            """The payload format of the barns uploaded to an endpoint, json unless the endpoint has been set up for another format"""
+            return self._payload_formats.get(endpoint, "json")
+
+        def set_payload_format(self, endpoint: str, payload_format: str, source: ChangeSource):
+            if self._payload_formats.get(endpoint) != payload_format:
+                self._payload_formats[endpoint] = payload_format
+                self.notify_listeners(source)
+
+        @property
+        def batch_window_ms(self) -> int:
+            """Time the barns of all devices are collected into one upload, 0 uploads the barn of each device on its own"""
+            return self._batch_window_ms
+
+        def set_batch_window_ms(self, value: int, source: ChangeSource):
+            if value != self._batch_window_ms:
+                self._batch_window_ms = value
+                self.notify_listeners(source)
+
         @property
         def endpoints(self):
             return self._endpoints.copy()
@@ -1,25 +1,55 @@
-import copy
 import logging
 import threading
-import queue
+import time
+from typing import Optional
 from concurrent.futures import ThreadPoolExecutor
 from server.app.isystem_time import ISystemTime
 from server.app.itask_source import ITaskSource
-from server.tasks.itask import ITask
+from server.app.timing_wheel import TimingWheel
+from server.app.scheduler_stats import SchedulerStats
+from server.tasks.itask import ITask, Lane
 
 logger = logging.getLogger(__name__)
 
 
+class WorkerLane:
+    """The queued tasks of a lane and the workers that execute them"""
+
+    def __init__(self, lane: Lane, max_workers: int):
+        self.lane = lane
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=lane.value)
+        self.tasks = TimingWheel()
+        self.active = 0
+
+    def has_capacity(self) -> bool:
+        return self.active < self.max_workers
+
+
 class TaskScheduler:
+    """Executes tasks when they are due. Tasks run on the workers of their lane, a lane that is busy
+    (e.g. with a network scan) never takes workers from the other lanes."""
+
+    def __init__(self, max_workers: int, system_time: ISystemTime, task_source: ITaskSource, stats: Optional[SchedulerStats] = None,
+                 lane_workers: Optional[dict[Lane, int]] = None):
+        """max_workers is the number of realtime workers, lane_workers the number of workers of the other lanes (by default 1 each)"""
+        workers = {lane: 1 for lane in Lane}
+        workers[Lane.REALTIME] = max_workers
+        workers.update(lane_workers or {})
+        self.lanes: dict[Lane, WorkerLane] = {lane: WorkerLane(lane, count) for lane, count in workers.items()}
 
-    def __init__(self, max_workers: int, system_time: ISystemTime, task_source: ITaskSource):
-        self.executor = ThreadPoolExecutor(max_workers=max_workers)
-        self.tasks: queue.PriorityQueue = queue.PriorityQueue()
         self.active_threads = 0
         self.new_tasks_condition = threading.Condition()
         self.stop_event = threading.Event()
         self.system_time = system_time
         self.task_source = task_source
+        self.stats = stats if stats is not None else SchedulerStats()
+        self.stats.max_workers = sum(workers.values())
+        for lane, count in workers.items():
+            self.stats.set_lane_workers(lane.value, count)
+
+    def _lane(self, task: ITask) -> WorkerLane:
+        return self.lanes.get(getattr(task, "lane", None), self.lanes[Lane.REALTIME])
 
     def add_task(self, task: ITask):
         with self.new_tasks_condition:
@@ -28,24 +58,85 @@ class TaskScheduler:
                 logger.warning("Task (%s) is in the past by %d ms, adjusting time to now", task, self.system_time.time_ms() - task.get_time())
                 task.adjust_time(self.system_time.time_ms() + 100)
 
-            self.tasks.put(task)
+            self._lane(task).tasks.add(task)
+            self.new_tasks_condition.notify()
+
+    def cancel_task(self, task: ITask) -> bool:
+        """Remove a queued task, returns False if the task is not queued (e.g. it is executing)"""
+        with self.new_tasks_condition:
+            return self._lane(task).tasks.cancel(task)
+
+    def reschedule_task(self, task: ITask, new_time: int) -> bool:
+        """Move a queued task to a new time, returns False if the task is not queued"""
+        with self.new_tasks_condition:
+            tasks = self._lane(task).tasks
+            if task not in tasks:
+                return False
+            tasks.reschedule(task, new_time)
             self.new_tasks_condition.notify()
+            return True
 
     def stop(self):
         self.stop_event.set()
 
     @property
     def queued_tasks(self) -> list[ITask]:
-        list_tasks = []
-        queue_copy = copy.copy(self.tasks)
-        while not queue_copy.empty():
-            list_tasks.append(queue_copy.get())
+        with self.new_tasks_condition:
+            entries = [entry for lane in self.lanes.values() for entry in lane.tasks.tasks()]
+        return [task for _, task in sorted(entries, key=lambda entry: entry[0])]
+
+    def dispatch_due(self, now: int) -> list[ITask]:
+        """Takes the due tasks of all lanes that have free workers and marks the workers as busy.
+        Must be called with the new_tasks_condition held, every dispatched task must be finished with finish_task."""
+        dispatched = []
+        for lane in self.lanes.values():
+            lane_dispatched = 0
+            while lane.has_capacity():
+                task = lane.tasks.pop_due(now)
+                if task is None:
+                    break
+                lane.active += 1
+                self.active_threads += 1
+                dispatched.append(task)
+                lane_dispatched += 1
+            if lane_dispatched:
+                self.stats.record_active_workers(self.active_threads, lane.lane.value, lane.active)
+
+        if dispatched:
+            self.stats.record_queue_depth(sum(len(lane.tasks) for lane in self.lanes.values()))
+        return dispatched
+
+    def next_due_time(self) -> Optional[int]:
+        """Returns the earliest time of a task in a lane with free workers, None if there is none.
+        Must be called with the new_tasks_condition held."""
+        times = [lane.tasks.peek_time() for lane in self.lanes.values() if lane.has_capacity()]
+        times = [t for t in times if t is not None]
+        return min(times) if times else None
+
+    def finish_task(self, task: ITask, new_tasks):
+        """Queues the tasks returned by a dispatched task and frees its worker"""
+        if new_tasks is not None:
+            if not isinstance(new_tasks, list):
+                new_tasks_list = [new_tasks]
+            else:
+                new_tasks_list = new_tasks
+            new_tasks_list = new_tasks_list + self.task_source.purge_tasks()
+            for new_task in new_tasks_list:
+                self.add_task(new_task)
 
-        return list_tasks
+        with self.new_tasks_condition:
+            lane = self._lane(task)
+            lane.active -= 1
+            self.active_threads -= 1
+            self.stats.record_active_workers(self.active_threads, lane.lane.value, lane.active)
+            self.new_tasks_condition.notify()
 
     def worker(self, task: ITask):
+        start_time = self.system_time.time_ms()
+        lateness = start_time - task.get_time()
+        start = time.perf_counter()
         try:
-            new_tasks = task.execute(self.system_time.time_ms())
+            new_tasks = task.execute(start_time)
 
             if new_tasks is None:
                 new_tasks = []
@@ -56,38 +147,29 @@ class TaskScheduler:
         except Exception as e:
             logging.error(f"Failed to execute task {task}: {e}")
             new_tasks = None
+        self.stats.record_execution(type(task).__name__, lateness, (time.perf_counter() - start) * 1000, self._lane(task).lane.value)
 
-        if new_tasks is not None:
-            if not isinstance(new_tasks, list):
-                new_tasks_list = [new_tasks]
-            else:
-                new_tasks_list = new_tasks
-            new_tasks_list = new_tasks_list + self.task_source.purge_tasks()
-            for new_task in new_tasks_list:
-                self.add_task(new_task)
-
-        with self.new_tasks_condition:
-            self.active_threads -= 1
-            self.new_tasks_condition.notify()
+        self.finish_task(task, new_tasks)
 
     def main_loop(self):
         while not self.stop_event.is_set():
             with self.new_tasks_condition:
-                while (self.active_threads >= self.executor._max_workers) or self.tasks.empty() or self.tasks.queue[0].get_time() > self.system_time.time_ms():
+                dispatched = self.dispatch_due(self.system_time.time_ms())
+                while not dispatched:
                     if self.stop_event.is_set():
                         break
 
-                    if not self.tasks.empty():
+                    next_time = self.next_due_time()
+                    if next_time is not None:
                         # wake the loop up gain when the next task is due (note that it may wake up before that if a new task is added)
-                        delay = max(0, (self.tasks.queue[0].get_time() - self.system_time.time_ms()) / 1000)
+                        delay = max(0, (next_time - self.system_time.time_ms()) / 1000)
                         self.new_tasks_condition.wait(delay)
                     else:
                         self.new_tasks_condition.wait()
+                    dispatched = self.dispatch_due(self.system_time.time_ms())
 
                 if self.stop_event.is_set():
                     break
 
-                if not self.tasks.empty() and self.tasks.queue[0].get_time() <= self.system_time.time_ms():
-                    task = self.tasks.get()
-                    self.executor.submit(self.worker, task)
-                    self.active_threads += 1
+                for task in dispatched:
+                    self._lane(task).executor.submit(self.worker, task)
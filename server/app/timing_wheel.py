@@ -0,0 +1,175 @@
+import heapq
+from typing import Iterator, Optional
+from server.tasks.itask import ITask
+
+
+class _Entry:
+    __slots__ = ("task", "time", "tick", "seq", "slot")
+
+    def __init__(self, task: ITask, time: int, tick: int, seq: int):
+        self.task = task
+        self.time = time
+        self.tick = tick
+        self.seq = seq
+        self.slot = -1  # -1 when the entry is in the ready heap
+
+
+class TimingWheel:
+    """Hashed timing wheel of tasks ordered by their time in milliseconds.
+
+    Tasks are hashed into one of num_slots slots of tick_ms each, so adding, cancelling and rescheduling
+    a task is O(1). Tasks that are further away than one turn of the wheel stay in their slot until
+    the wheel comes around to their tick. Due tasks are moved to a small heap so they are handed out
+    in time order, tasks with the same time in the order they were added.
+
+    The time of a task is read when it is added, changing it afterwards has no effect, use reschedule.
+    The wheel is not thread safe, the scheduler serializes access to it."""
+
+    def __init__(self, tick_ms: int = 10, num_slots: int = 1024):
+        self.tick_ms = tick_ms
+        self.num_slots = num_slots
+        self._slots: list[dict[int, _Entry]] = [{} for _ in range(num_slots)]
+        self._occupied = 0  # bit i is set when slot i is not empty
+        self._ready: list[tuple[int, int, _Entry]] = []
+        self._entries: dict[int, _Entry] = {}  # id(task) -> entry
+        self._cursor: Optional[int] = None  # all ticks before the cursor have been moved to the ready heap
+        self._seq = 0
+        self._next_slot_time: Optional[int] = None  # cached earliest time of the entries in the slots
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, task: ITask) -> bool:
+        return id(task) in self._entries
+
+    def add(self, task: ITask, time: Optional[int] = None):
+        """Schedule task at time, or at task.get_time() if no time is given. Adding a task that is already scheduled reschedules it."""
+        if time is None:
+            time = task.get_time()
+        self.cancel(task)
+
+        self._seq += 1
+        entry = _Entry(task, time, time // self.tick_ms, self._seq)
+        self._entries[id(task)] = entry
+
+        if self._cursor is None:
+            self._cursor = entry.tick
+        if entry.tick < self._cursor:
+            heapq.heappush(self._ready, (time, entry.seq, entry))
+        else:
+            slot = entry.tick % self.num_slots
+            entry.slot = slot
+            self._slots[slot][entry.seq] = entry
+            self._occupied |= 1 << slot
+            if self._next_slot_time is not None and time < self._next_slot_time:
+                self._next_slot_time = time
+
+    def cancel(self, task: ITask) -> bool:
+        """Remove task from the wheel, returns False if it was not scheduled"""
+        entry = self._entries.pop(id(task), None)
+        if entry is None:
+            return False
+
+        if entry.slot >= 0:
+            slot = self._slots[entry.slot]
+            del slot[entry.seq]
+            if not slot:
+                self._occupied &= ~(1 << entry.slot)
+            if entry.time == self._next_slot_time:
+                self._next_slot_time = None
+        else:
+            # lazily removed from the ready heap
+            entry.task = None
+        return True
+
+    def reschedule(self, task: ITask, new_time: int):
+        """Move a scheduled task to a new time and adjust the time of the task"""
+        task.adjust_time(new_time)
+        self.add(task, new_time)
+
+    def peek_time(self) -> Optional[int]:
+        """Returns the time of the next task, or None if the wheel is empty"""
+        # the ready heap holds everything before the cursor, so a live entry there is always the earliest
+        ready = self._ready
+        while ready and ready[0][2].task is None:
+            heapq.heappop(ready)
+        if ready:
+            return ready[0][0]
+
+        if self._next_slot_time is None and self._entries:
+            self._next_slot_time = self._find_next_slot_time()
+        return self._next_slot_time
+
+    def pop_due(self, now: int) -> Optional[ITask]:
+        """Returns the next task with a time up to now, or None if no task is due"""
+        self._advance(now)
+        ready = self._ready
+        while ready:
+            time, _, entry = ready[0]
+            if entry.task is None:
+                heapq.heappop(ready)
+                continue
+            if time > now:
+                return None
+            heapq.heappop(ready)
+            del self._entries[id(entry.task)]
+            return entry.task
+        return None
+
+    def tasks(self) -> Iterator[tuple[int, ITask]]:
+        """Iterates over (time, task) of the scheduled tasks without copying the wheel, in no particular order"""
+        for entry in self._entries.values():
+            yield entry.time, entry.task
+
+    def _advance(self, now: int):
+        """Move all entries with a tick up to now to the ready heap"""
+        if self._cursor is None:
+            return
+        target = now // self.tick_ms
+        if target < self._cursor:
+            return
+
+        if target - self._cursor + 1 >= self.num_slots:
+            candidates = self._occupied
+        else:
+            candidates = self._occupied & self._ring_mask(self._cursor % self.num_slots, target % self.num_slots)
+
+        while candidates:
+            low = candidates & -candidates
+            candidates ^= low
+            index = low.bit_length() - 1
+            slot = self._slots[index]
+            for seq in [seq for seq, entry in slot.items() if entry.tick <= target]:
+                entry = slot.pop(seq)
+                entry.slot = -1
+                heapq.heappush(self._ready, (entry.time, entry.seq, entry))
+                if entry.time == self._next_slot_time:
+                    self._next_slot_time = None
+            if not slot:
+                self._occupied &= ~low
+
+        self._cursor = target + 1
+
+    def _ring_mask(self, first: int, last: int) -> int:
+        """Bit mask of the slots from first to last, wrapping around the end of the wheel"""
+        if first <= last:
+            return ((1 << (last - first + 1)) - 1) << first
+        return ((1 << (self.num_slots - first)) - 1) << first | ((1 << (last + 1)) - 1)
+
+    def _find_next_slot_time(self) -> Optional[int]:
+        if not self._occupied:
+            return None
+
+        # the first occupied slot from the cursor that has an entry in this turn of the wheel holds the earliest tick
+        cursor_slot = self._cursor % self.num_slots
+        end_tick = self._cursor + self.num_slots
+        for mask in (self._occupied >> cursor_slot << cursor_slot, self._occupied & ((1 << cursor_slot) - 1)):
+            while mask:
+                low = mask & -mask
+                mask ^= low
+                times = [entry.time for entry in self._slots[low.bit_length() - 1].values() if entry.tick < end_tick]
+                if times:
+                    return min(times)
+
+        # only tasks more than one turn of the wheel away
+        return min(entry.time for slot in self._slots for entry in slot.values())
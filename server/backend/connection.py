@@ -1,4 +1,4 @@
-import requests
+from .http_client import get_client
 
 class Connection:
 
@@ -7,7 +7,7 @@ class Connection:
         self.timeout = timeout
 
     def post(self, query: str) -> dict:
-        response = requests.post(self.url, json={"query": query}, timeout=self.timeout)
+        response = get_client().post(self.url, json={"query": query}, timeout=self.timeout)
         response.raise_for_status()
 
         return response.json()
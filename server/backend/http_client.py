@@ -0,0 +1,113 @@
+import logging
+import threading
+from typing import Dict, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class PoolStats:
+    """Thread safe per host counters of requests sent on a kept alive connection (hit)
+    and requests that needed a new TCP/TLS handshake (miss)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict[str, int]] = {}
+
+    def record(self, host: str, reused: bool):
+        with self._lock:
+            counters = self._hosts.setdefault(host, {"hits": 0, "misses": 0})
+            counters["hits" if reused else "misses"] += 1
+
+    def to_dict(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {host: dict(counters) for host, counters in self._hosts.items()}
+
+
+def _counting_pool(base: type, stats: PoolStats) -> type:
+    class CountingConnectionPool(base):
+        def _make_request(self, conn, *args, **kwargs):
+            # a closed connection is (re)connected by the request, i.e. a new handshake
+            stats.record(self.host, not conn.is_closed)
+            return super()._make_request(conn, *args, **kwargs)
+    return CountingConnectionPool
+
+
+class _CountingAdapter(HTTPAdapter):
+    def __init__(self, stats: PoolStats, **kwargs):
+        self._stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting_pool(HTTPConnectionPool, self._stats),
+            "https": _counting_pool(HTTPSConnectionPool, self._stats),
+        }
+
+
+class HttpClient:
+    """Shared HTTP client that keeps connections alive between requests.
+    Connections are pooled per host so consecutive uploads to the backend reuse the same TCP/TLS session.
+    The client is safe to use from the task scheduler worker threads."""
+
+    DEFAULT_POOL_HOSTS = 4
+    DEFAULT_POOL_SIZE = 4
+    DEFAULT_CONNECT_TIMEOUT = 5
+    DEFAULT_READ_TIMEOUT = 5
+
+    def __init__(self, pool_hosts: int = DEFAULT_POOL_HOSTS, pool_size: int = DEFAULT_POOL_SIZE,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT, read_timeout: float = DEFAULT_READ_TIMEOUT):
+        """pool_hosts is the number of hosts to keep connections to, pool_size the number of connections kept per host.
+        The timeouts in seconds are used for the requests that do not pass their own timeout."""
+        self.timeout = (connect_timeout, read_timeout)
+        self.stats = PoolStats()
+        self._session = requests.Session()
+        adapter = _CountingAdapter(self.stats, pool_connections=pool_hosts, pool_maxsize=pool_size)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        return self._session.request(method, url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def pool_stats(self) -> Dict[str, Dict[str, int]]:
+        """Returns the keep alive hit and miss counters per host"""
+        return self.stats.to_dict()
+
+    def close(self):
+        self._session.close()
+
+
+_client: Optional[HttpClient] = None
+_client_config: Dict[str, float] = {}
+_client_lock = threading.Lock()
+
+
+def configure_client(pool_hosts: int = HttpClient.DEFAULT_POOL_HOSTS, pool_size: int = HttpClient.DEFAULT_POOL_SIZE,
+                     connect_timeout: float = HttpClient.DEFAULT_CONNECT_TIMEOUT, read_timeout: float = HttpClient.DEFAULT_READ_TIMEOUT):
+    """Sets the pool size and timeouts of the process wide HTTP client, a client that was already created is replaced"""
+    global _client
+    with _client_lock:
+        _client_config.update(pool_hosts=pool_hosts, pool_size=pool_size, connect_timeout=connect_timeout, read_timeout=read_timeout)
+        previous, _client = _client, None
+    if previous is not None:
+        previous.close()
+
+
+def get_client() -> HttpClient:
+    """Returns the process wide HTTP client, created with the configuration of configure_client"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient(**_client_config)
+        return _client
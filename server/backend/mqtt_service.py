@@ -18,7 +18,7 @@ from collections import deque
 import threading
 from server.devices.supported_devices.data_models import DERData
 import paho.mqtt.client as mqtt
-import server.crypto.crypto as crypto
+from server.crypto.signing_service import SigningService, SigningPriority
 
 logger = logging.getLogger(__name__)
 logger.setLevel(level=logging.INFO)
@@ -70,13 +70,12 @@ class MQTTService:
                 'device': device_serial
             }
             
-            with crypto.Chip() as chip:
-                jwt = chip.build_jwt(data_2_sign=payload, headers=headers, retries=5)
-                # Create and start MQTT service
-                mqtt_service = cls(device_serial, wallet_address, jwt)
-                mqtt_service.start()
-                logger.info(f"MQTT service created and started for wallet: {wallet_address}")
-                return mqtt_service
+            jwt = SigningService.get_instance().build_jwt(payload, headers, SigningPriority.REQUEST, retries=5).result(SigningService.TIMEOUT_S)
+            # Create and start MQTT service
+            mqtt_service = cls(device_serial, wallet_address, jwt)
+            mqtt_service.start()
+            logger.info(f"MQTT service created and started for wallet: {wallet_address}")
+            return mqtt_service
             
         except Exception as e:
             logger.error(f"Failed to create MQTT service: {e}")
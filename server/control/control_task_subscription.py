@@ -9,6 +9,7 @@ from server.control.control_messages.read_message import ReadMessage
 from server.control.control_messages.auth_challenge_message import AuthChallengeMessage
 from server.control.control_messages.types import ControlMessageType, PayloadType
 from server.crypto import crypto
+from server.crypto.signing_service import SigningPriority, SigningService
 from cryptography.hazmat.primitives import hashes
 from server.tasks.control_device_task import ControlDeviceTask, ControlDeviceTaskListener
 from server.control.control_task_registry import TaskExecutionRegistry
@@ -163,24 +164,17 @@ class ControlSubscription(ControlDeviceTaskListener):
 
         logger.info(f"Verifying signature for data: {data}")
 
-        with crypto.Chip() as chip:
-            return chip.verify_signature(
-                data_hash=data_hash,
-                signature=signature,
-                public_key=pub_key
-            )
+        verify = lambda chip: chip.verify_signature(data_hash=data_hash, signature=signature, public_key=pub_key)
+        return SigningService.get_instance().submit(verify, SigningPriority.CONTROL).result(SigningService.TIMEOUT_S)
 
     def _create_signature(self) -> tuple[str, str, str]:
         timestamp: str = datetime.now().strftime(DATE_TIME_FORMAT)
         crypto_sn: str = self.crypto_state.serial_number.hex()
         data_to_sign: str = f"{crypto_sn}:{timestamp}"
 
-        with crypto.Chip() as chip:
-            signature = chip.get_signature(data_to_sign).hex()
-            # logger.info(f"Signature: {signature}")
-            return timestamp, crypto_sn, signature
-
-        return None
+        signature = SigningService.get_instance().get_signature(data_to_sign, SigningPriority.CONTROL).result(SigningService.TIMEOUT_S).hex()
+        # logger.info(f"Signature: {signature}")
+        return timestamp, crypto_sn, signature
 
     # TODO: Write tests for this!
     def _send_ack(self, message: BaseMessage, type: ControlMessageType, target_sn: str | None = None):
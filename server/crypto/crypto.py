@@ -3,6 +3,8 @@ import json
 import base64
 from base58 import b58encode_check
 import threading
+import time
+from typing import Optional
 from .crypto_interface import CryptoInterface
 from .software import SoftwareCrypto
 
@@ -130,7 +132,9 @@ def base64_url_encode(data):
 
 
 def jwtlify(data: dict) -> bytes:
-    return base64_url_encode(json.dumps(data).encode("utf-8")).decode("utf-8")
+    # compact barns serialize straight from their register buffers
+    payload = data.to_json() if hasattr(data, "to_json") else json.dumps(data)
+    return base64_url_encode(payload.encode("utf-8")).decode("utf-8")
 
 
 def public_key_to_compact(pub_key: bytearray) -> bytes:
@@ -151,6 +155,15 @@ class ChipError(Exception):
         return super().__str__() + f" cryptauthlib error code: {self.code}"
 
 
+class ChipIdentity:
+    """The immutable identity of a chip"""
+
+    def __init__(self, crypto_impl: CryptoInterface, serial_number: bytes, public_key: bytes):
+        self.crypto_impl = crypto_impl
+        self.serial_number = serial_number
+        self.public_key = public_key
+
+
 # we need an external flag so that we can skip the hardware crypto tests without creating a new Chip object
 USE_HARDWARE_CRYPTO = True
 
@@ -159,6 +172,19 @@ class Chip:
     _lock = threading.Lock()
     _lock_count = 0
 
+    # Seconds the chip stays initialized after it was used, so that signing does not pay for atcab_init and
+    # atcab_release every time. 0 initializes and releases the chip around every with block.
+    SESSION_IDLE_S = 0.0
+    # Seconds after which a reused session is checked with atcab_info before it is trusted again
+    SESSION_HEALTH_CHECK_S = 60.0
+
+    _session: Optional[CryptoInterface] = None  # the crypto implementation that is initialized between with blocks
+    _session_used = 0.0
+    _session_checked = 0.0
+    _session_timer: Optional[threading.Timer] = None
+
+    _identity: Optional['ChipIdentity'] = None  # the serial number and public key read once per process, see CryptoState
+
     def __init__(self, crypto_impl: CryptoInterface = HardwareCrypto() if USE_HARDWARE_CRYPTO else SoftwareCrypto()):
         self.crypto_impl = crypto_impl
 
@@ -178,7 +204,8 @@ class Chip:
 
     def __exit__(self, type, value, traceback):
         """Clean up the chip. Automatically run at the end of `with` block."""
-        self._release()
+        # an error ends the session so that the next use initializes the chip again
+        self._release(failed=type is not None)
         # if not self._release():
         #    logging.error("Failed to release chip!")
 
@@ -192,6 +219,11 @@ class Chip:
             self._lock_count = 0
             raise RuntimeError(f"Chip lock count is not 1 after init: {old_count}")
 
+        if Chip._session is not None:
+            if Chip._session is self.crypto_impl and self._session_is_healthy():
+                return True
+            Chip._end_session()
+
         # this is for raspberry pi should probably be checked better
         cfg = cfg_ateccx08a_i2c_default()
         cfg.cfg.atcai2c.bus = 1  # raspberry pi
@@ -200,16 +232,71 @@ class Chip:
         if self.crypto_impl.atcab_init(cfg) != ATCA_SUCCESS:
             cfg.cfg.atcai2c.address = 0xc0
             self._throw_on_error(self.crypto_impl.atcab_init(cfg), "Failed to initialize chip.")
+
+        if Chip.SESSION_IDLE_S > 0:
+            Chip._session = self.crypto_impl
+            Chip._session_checked = time.monotonic()
         return True
 
+    def _session_is_healthy(self) -> bool:
+        now = time.monotonic()
+        if now - Chip._session_checked < Chip.SESSION_HEALTH_CHECK_S:
+            return True
+        Chip._session_checked = now
+        code, _ = self.crypto_impl.atcab_info()
+        if code != ATCA_SUCCESS:
+            log.warning("Chip session failed the health check with code %s, initializing the chip again", code)
+        return code == ATCA_SUCCESS
+
+    @classmethod
+    def _end_session(cls) -> int:
+        session = cls._session
+        cls._session = None
+        return session.atcab_release()
+
+    @classmethod
+    def _release_idle_session(cls):
+        with cls._lock:
+            cls._session_timer = None
+            if cls._session is None:
+                return
+            idle_s = time.monotonic() - cls._session_used
+            if idle_s >= cls.SESSION_IDLE_S:
+                log.debug("Releasing the chip after %.1f s idle", idle_s)
+                cls._end_session()
+            else:
+                cls._schedule_idle_release(cls.SESSION_IDLE_S - idle_s)
+
+    @classmethod
+    def _schedule_idle_release(cls, delay_s: float):
+        if cls._session_timer is None:
+            cls._session_timer = threading.Timer(delay_s, cls._release_idle_session)
+            cls._session_timer.daemon = True
+            cls._session_timer.start()
+
+    @classmethod
+    def release_session(cls):
+        """Releases the chip if it is kept initialized between uses, e.g. at shutdown"""
+        with cls._lock:
+            if cls._session is not None:
+                cls._end_session()
+
     def _throw_on_error(self, code: int, message: str):
         if code != ATCA_SUCCESS:
             # we do not want to release as there may caught exceptions
             # self._lock.release()
             raise ChipError(code, message)
 
-    def _release(self) -> bool:
-        ret = self.crypto_impl.atcab_release()
+    def _release(self, failed: bool = False) -> bool:
+        if Chip._session is self.crypto_impl and not failed:
+            # keep the chip initialized for the next use
+            Chip._session_used = time.monotonic()
+            Chip._schedule_idle_release(Chip.SESSION_IDLE_S)
+            ret = ATCA_SUCCESS
+        elif Chip._session is self.crypto_impl:
+            ret = Chip._end_session()
+        else:
+            ret = self.crypto_impl.atcab_release()
         self._lock_count -= 1
         self._lock.release()
         if self._lock_count != 0:
@@ -231,8 +318,25 @@ class Chip:
         code, info = self.crypto_impl.atcab_info()
         return atcab_get_device_name(info)  # this one does not access the hardware chip at all so we do not need to inject it, but it could be nice to do in the future
 
+    def cache_identity(self, serial_number: bytes, public_key: bytes):
+        """Keeps the serial number and public key of the chip for the rest of the process, they never change
+        so signing paths do not have to read them from the chip for every JWT"""
+        Chip._identity = ChipIdentity(self.crypto_impl, serial_number, public_key)
+
+    @classmethod
+    def clear_identity(cls):
+        cls._identity = None
+
+    def _cached_identity(self) -> Optional['ChipIdentity']:
+        identity = Chip._identity
+        return identity if identity is not None and identity.crypto_impl is self.crypto_impl else None
+
     def get_serial_number(self, retries: int = 0) -> bytearray:
         self.ensure_chip_initialized()
+        identity = self._cached_identity()
+        if identity is not None:
+            return identity.serial_number
+
         code, ret = self.crypto_impl.atcab_read_serial_number()
         if retries > 0 and code != ATCA_SUCCESS:
 
@@ -248,6 +352,9 @@ class Chip:
 
     def get_public_key(self, retries: int = 0) -> bytearray:
         self.ensure_chip_initialized()
+        identity = self._cached_identity()
+        if identity is not None:
+            return identity.public_key
 
         code, public_key = self.crypto_impl.atcab_get_pubkey(0)
         if retries > 0 and code != ATCA_SUCCESS:
@@ -293,10 +400,13 @@ class Chip:
         return signature
 
     def build_jwt(self, data_2_sign, headers: dict, retries: int = 0):
+        return self.sign_payload(jwtlify(data_2_sign), headers, retries)
+
+    def sign_payload(self, payload_base64: str, headers: dict, retries: int = 0):
+        """Builds a JWT of an already base64url encoded payload, e.g. a binary barn"""
         self.ensure_chip_initialized()
         header_base64 = jwtlify(self.build_header(headers))
 
-        payload_base64 = jwtlify(data_2_sign)
         header_and_payload = header_base64 + "." + payload_base64
 
         signature = self.get_signature(header_and_payload, retries)
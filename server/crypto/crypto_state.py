@@ -1,4 +1,5 @@
 from server.crypto import crypto
+from server.crypto.signing_service import SigningService, SigningPriority
 
 
 class CryptoState:
@@ -44,11 +45,17 @@ class CryptoState:
         return "chipDeathCount"
 
     def __init__(self):
-        with crypto.Chip() as chip:
-            self._device_name = chip.get_device_name()
-            self._serial_number = chip.get_serial_number()
-            self._public_key = chip.get_public_key()
-            self._compact_key = crypto.public_key_to_compact(self._public_key)
+        service = SigningService.get_instance()
+        if service.on_service_thread():
+            raise RuntimeError("CryptoState can not be created by a signing operation, it waits for the signing service")
+        service.submit(self._read_identity, SigningPriority.REQUEST).result(SigningService.TIMEOUT_S)
+
+    def _read_identity(self, chip: crypto.Chip):
+        self._device_name = chip.get_device_name()
+        self._serial_number = chip.get_serial_number()
+        self._public_key = chip.get_public_key()
+        self._compact_key = crypto.public_key_to_compact(self._public_key)
+        chip.cache_identity(self._serial_number, self._public_key)
 
     @property
     def device_name(self) -> str:
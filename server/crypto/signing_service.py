@@ -0,0 +1,130 @@
+import itertools
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from enum import IntEnum
+from typing import Callable, Optional
+import server.crypto.crypto as crypto
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class SigningPriority(IntEnum):
+    """Order in which queued chip operations are done, lower first"""
+    CONTROL = 0  # acknowledgements and signature checks of control messages
+    REQUEST = 1  # local API requests, backend connections and identity reads
+    HARVEST = 2  # harvest uploads
+    STATE = 3  # state and settings saves
+
+
+class SigningService:
+    """Does all signing on one thread so that chip latency only delays the callers waiting for a signature.
+
+    Operations are queued by priority and get a concurrent.futures.Future. The service takes all queued
+    operations (up to MAX_BATCH) at once and does them in priority order in one chip session, so the chip is
+    locked and initialized once for the batch instead of once per operation. Each operation gets its own
+    signature as the backend verifies every JWT on its own."""
+
+    MAX_BATCH = 16
+    TIMEOUT_S = 10  # longest a caller waits for the result of a queued operation
+    _STOP = len(SigningPriority)  # priority of the stop marker, after all queued operations
+
+    _instance: Optional['SigningService'] = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls) -> 'SigningService':
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self, chip_factory: Optional[Callable[[], crypto.Chip]] = None):
+        self._chip_factory = chip_factory or (lambda: crypto.Chip())
+        self._queue: queue.PriorityQueue = queue.PriorityQueue()
+        self._sequence = itertools.count()  # operations of the same priority are done in order
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, operation: Callable[[crypto.Chip], object], priority: SigningPriority) -> Future:
+        """Queue an operation that is called with an initialized chip, the future holds its result"""
+        future = Future()
+        self._queue.put((priority, next(self._sequence), operation, future))
+        self._start()
+        return future
+
+    def build_jwt(self, data: dict, headers: dict, priority: SigningPriority, retries: int = 5) -> Future:
+        return self.submit(lambda chip: chip.build_jwt(data, headers, retries), priority)
+
+    def sign_payload(self, payload_base64: str, headers: dict, priority: SigningPriority, retries: int = 5) -> Future:
+        return self.submit(lambda chip: chip.sign_payload(payload_base64, headers, retries), priority)
+
+    def get_signature(self, data_to_sign: str, priority: SigningPriority) -> Future:
+        return self.submit(lambda chip: chip.get_signature(data_to_sign), priority)
+
+    def get_serial_number(self, priority: SigningPriority) -> Future:
+        return self.submit(lambda chip: chip.get_serial_number(), priority)
+
+    def on_service_thread(self) -> bool:
+        """True when called by a queued operation, waiting for another operation there would wait for itself"""
+        return threading.current_thread() is self._thread
+
+    def stop(self, timeout: float = 5):
+        """Do the queued operations and stop the service thread, an operation submitted later starts it again"""
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._queue.put((self._STOP, next(self._sequence), None, None))
+        thread.join(timeout)
+
+    def _start(self):
+        with self._lock:
+            self._start_locked()
+
+    def _start_locked(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="signing-service", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.MAX_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            operations = [item for item in batch if item[2] is not None]
+            if operations:
+                self._do_batch(operations)
+            if len(operations) < len(batch):
+                with self._lock:
+                    self._thread = None
+                    if not self._queue.empty():  # submitted while stopping
+                        self._start_locked()
+                return
+
+    def _do_batch(self, batch: list):
+        chip_failed = False
+        try:
+            with self._chip_factory() as chip:
+                for _, _, operation, future in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        future.set_result(operation(chip))
+                    except Exception as e:
+                        chip_failed = chip_failed or isinstance(e, crypto.ChipError)
+                        future.set_exception(e)
+        except Exception as e:
+            logger.error("Error opening the chip for %d signing operations: %s", len(batch), e)
+            for _, _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+        if chip_failed:
+            # the errors were handled per operation, the next batch initializes the chip again
+            crypto.Chip.release_session()
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import Future
 from typing import Optional
 from enum import Enum
 from server.devices.supported_devices.data_models import DERData
@@ -94,6 +95,18 @@ class ICom(ABC):
     def read_harvest_data(self, force_verbose) -> dict:
         pass
 
+    def get_barn_deadbands(self) -> list[tuple[tuple[int, ...], int]]:
+        ''' (registers, deadband) pairs used when the harvests of the device are delta encoded.'''
+        return []
+
+    def supports_async_harvest(self) -> bool:
+        ''' True if the device can start a harvest with read_harvest_data_async without blocking the caller.'''
+        return False
+
+    def read_harvest_data_async(self, force_verbose) -> Future:
+        ''' Start a harvest in the background, the future resolves to the same dict as read_harvest_data.'''
+        raise NotImplementedError("Device does not support async harvest")
+
     @abstractmethod
     def get_harvest_data_type(self) -> HarvestDataType:
         pass
@@ -40,6 +40,7 @@ class TCPDevice(Device, ABC):
 
         self.ip = ip
         self.port = port
+        self.mac = NetworkUtils.INVALID_MAC  # set by the devices that know their MAC address
 
     @staticmethod
     def get_config_schema(connection: str):
@@ -64,6 +65,14 @@ class TCPDevice(Device, ABC):
 
     def find_device(self) -> Optional['ICom']:
         port = self.get_config()[self.PORT]  # get the port from the previous device config
+
+        # a device that got a new IP address is usually in the ARP table already, no need to scan the network
+        ip = NetworkUtils.get_ip_from_mac(self.mac)
+        if ip is not None and ip != self.ip and NetworkUtils.is_port_open(ip, int(port), NetworkUtils.NEIGHBOUR_PROBE_TIMEOUT):
+            clone = self._clone_with_host(HostInfo(ip=ip, port=int(port), mac=self.mac))
+            if clone is not None:
+                return clone
+
         hosts = NetworkUtils.get_hosts([int(port)], NetworkUtils.DEFAULT_TIMEOUT)
 
         if len(hosts) > 0:
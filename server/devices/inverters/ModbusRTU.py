@@ -1,7 +1,7 @@
 from typing import Optional
 from server.devices.Device import Device
 from server.devices.profile_keys import FunctionCodeKey
-from .modbus import Modbus
+from .modbus import Modbus, ReadRejectedError
 from ..ICom import ICom, HarvestDataType
 from pymodbus.client import ModbusSerialClient as ModbusClient
 from pymodbus.pdu import ExceptionResponse
@@ -175,6 +175,10 @@ class ModbusRTU(Modbus):
     def _get_connection_type(self) -> str:
         return ModbusRTU.CONNECTION
 
+    def _transport_key(self) -> tuple:
+        # all slaves on the same serial port share the bus
+        return (self._get_connection_type(), self.port)
+
     def find_device(self) -> 'ICom':
         return self
 
@@ -204,6 +208,8 @@ class ModbusRTU(Modbus):
             # We solve this by raising the exception manually
             if isinstance(resp, ModbusIOException):
                 raise ModbusIOException("Exception occurred while reading registers")
+            if isinstance(resp, ExceptionResponse):
+                raise ReadRejectedError(f"Exception response while reading registers {scan_start} - {scan_range}: {resp}")
 
             return resp.registers
 
@@ -2,8 +2,10 @@ from typing import Optional
 from server.devices.Device import Device
 from server.devices.inverters.common import INVERTER_CLIENT_NAME
 from .ModbusTCP import ModbusTCP
+from .modbus import ReadRejectedError
 from ..ICom import ICom
 from pysolarmanv5 import PySolarmanV5
+from umodbus.exceptions import ModbusError
 from server.network.network_utils import HostInfo, NetworkUtils
 import logging
 from server.devices.profile_keys import ProtocolKey
@@ -176,10 +178,13 @@ class ModbusSolarman(ModbusTCP):
         resp = None
 
         with self._lock:
-            if function_code == FunctionCodeKey.READ_INPUT_REGISTERS:
-                resp = self.client.read_input_registers(register_addr=scan_start, quantity=scan_range)
-            elif function_code == FunctionCodeKey.READ_HOLDING_REGISTERS:
-                resp = self.client.read_holding_registers(register_addr=scan_start, quantity=scan_range)
+            try:
+                if function_code == FunctionCodeKey.READ_INPUT_REGISTERS:
+                    resp = self.client.read_input_registers(register_addr=scan_start, quantity=scan_range)
+                elif function_code == FunctionCodeKey.READ_HOLDING_REGISTERS:
+                    resp = self.client.read_holding_registers(register_addr=scan_start, quantity=scan_range)
+            except ModbusError as e:  # pysolarmanv5 raises the exception responses as umodbus errors
+                raise ReadRejectedError(f"Exception response while reading registers {scan_start} - {scan_range}: {e!r}") from e
 
             return resp
 
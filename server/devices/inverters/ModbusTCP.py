@@ -1,15 +1,19 @@
+import asyncio
+from concurrent.futures import Future
 from typing import Optional
 from server.devices.TCPDevice import TCPDevice
 from server.devices.profile_keys import FunctionCodeKey
-from .modbus import Modbus
+from .modbus import Modbus, ReadRejectedError
 from ..ICom import ICom, HarvestDataType
 from pymodbus.client import ModbusTcpClient as ModbusClient
-from pymodbus.exceptions import ModbusIOException
+from pymodbus.exceptions import ModbusException, ModbusIOException
 from pymodbus.pdu import ExceptionResponse
 from pymodbus import pymodbus_apply_logging_config
 from server.network.network_utils import HostInfo, NetworkUtils
 from server.devices.supported_devices.profiles import ModbusDeviceProfiles
 from server.devices.supported_devices.profile import RegisterInterval
+from server.devices.supported_devices.read_planner import ReadBlock
+from .async_modbus_engine import AsyncModbusEngine, AsyncModbusTcpClientAdapter
 import logging
 from server.devices.profile_keys import ProtocolKey
 from server.devices.registerValue import RegisterValue
@@ -36,6 +40,10 @@ class ModbusTCP(Modbus, TCPDevice):
 
     CONNECTION = "TCP"
 
+    # Harvest over the shared async engine, all devices are then read from one event loop thread with
+    # pipelined requests instead of blocking a worker per device for every round trip
+    ASYNC_HARVEST = False
+
     @staticmethod
     def ip_key() -> str:
         return "ip"
@@ -164,8 +172,65 @@ class ModbusTCP(Modbus, TCPDevice):
     def _get_connection_type(self) -> str:
         return ModbusTCP.CONNECTION
 
+    def _transport_key(self) -> tuple:
+        return (self._get_connection_type(), self.ip, self.port)
+
     def _create_client(self, **kwargs) -> None:
-        self.client = ModbusClient(host=self.ip, port=self.port, unit_id=self.slave_id, **kwargs)
+        if self.ASYNC_HARVEST:
+            self.client = AsyncModbusTcpClientAdapter(AsyncModbusEngine.get_instance(), self.ip, self.port, **kwargs)
+        else:
+            self.client = ModbusClient(host=self.ip, port=self.port, unit_id=self.slave_id, **kwargs)
+
+    def supports_async_harvest(self) -> bool:
+        return isinstance(self.client, AsyncModbusTcpClientAdapter)
+
+    def read_harvest_data_async(self, force_verbose) -> Future:
+        if self.is_disconnected():
+            raise Exception("Device is disconnected")
+
+        verbose = force_verbose or self.profile.verbose_always
+        return self.client.engine.submit(self._read_harvest_data_async(verbose))
+
+    async def _read_harvest_data_async(self, verbose: bool) -> dict:
+        res = {}
+        blocks = self._harvest_read_plan(verbose)
+        for values in await asyncio.gather(*(self._read_block_async(block) for block in blocks)):
+            res.update(values)
+        return self._complete_harvest(res, verbose, len(blocks))
+
+    async def _read_block_async(self, block: ReadBlock) -> dict:
+        """Async version of _read_block, the blocks and the intervals of a split block are read concurrently"""
+        if len(block.spans) > 1 and block not in self._split_blocks:
+            try:
+                values = await self._read_registers_async(block.function_code, block.start_register, block.count)
+            except ReadRejectedError as e:
+                log.debug("Coalesced read %s rejected: %s", block, e)
+                values = None
+
+            if values is not None and len(values) == block.count:
+                return block.split(values)
+
+            log.info("Coalesced read %s rejected by %s, reading the intervals separately", block, self.device_type)
+            self._split_blocks.add(block)
+
+        res = {}
+        spans = await asyncio.gather(*(self._read_span_async(block.function_code, scan_start, scan_range) for scan_start, scan_range in block.spans))
+        for (scan_start, scan_range), values in zip(block.spans, spans):
+            res.update(zip(self._populate_registers(scan_start, scan_range), values))
+        return res
+
+    async def _read_span_async(self, function_code: FunctionCodeKey, scan_start: int, scan_range: int) -> list:
+        try:
+            return await self._read_registers_async(function_code, scan_start, scan_range)
+        except (ModbusException, ReadRejectedError) as e:
+            log.error(str(e))
+            return []
+
+    async def _read_registers_async(self, function_code: FunctionCodeKey, scan_start: int, scan_range: int) -> list:
+        resp = await self.client.session.read(function_code, scan_start, scan_range, self.slave_id)
+        if resp.isError():
+            raise ReadRejectedError(f"Error response while reading registers {scan_start} - {scan_range}: {resp}")
+        return resp.registers
 
     def _read_registers(self, function_code: FunctionCodeKey, scan_start: int, scan_range: int) -> list:
         resp = None
@@ -182,6 +247,8 @@ class ModbusTCP(Modbus, TCPDevice):
             # We solve this by raising the exception manually
             if isinstance(resp, ModbusIOException):
                 raise ModbusIOException(f"ModbusIOException occurred while reading registers: {resp.message}")
+            if isinstance(resp, ExceptionResponse):
+                raise ReadRejectedError(f"Exception response while reading registers {scan_start} - {scan_range}: {resp}")
 
             return resp.registers
 
@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Coroutine, Optional
+from pymodbus.client import AsyncModbusTcpClient
+from pymodbus.exceptions import ConnectionException, ModbusIOException
+from pymodbus.pdu import ModbusResponse
+from server.devices.profile_keys import FunctionCodeKey
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class AsyncModbusEngine:
+    """Runs the Modbus TCP I/O of all devices on a single asyncio event loop in one thread.
+
+    A harvest is submitted as a coroutine and returns a concurrent.futures.Future, so the
+    harvest tasks only hand out requests and collect results instead of blocking a worker
+    on the network round trips."""
+
+    _instance: Optional['AsyncModbusEngine'] = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls) -> 'AsyncModbusEngine':
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def thread(self) -> Optional[threading.Thread]:
+        return self._thread
+
+    def _start(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="modbus-engine", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def submit(self, coro: Coroutine) -> Future:
+        """Schedule a coroutine on the engine loop, the loop is started on first use"""
+        return asyncio.run_coroutine_threadsafe(coro, self._start())
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None):
+        """Run a coroutine on the engine loop and block until it is done"""
+        return self.submit(coro).result(timeout)
+
+    def stop(self):
+        with self._lock:
+            if self._loop is None:
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = None
+            self._thread = None
+
+
+class AsyncModbusTcpSession:
+    """A Modbus TCP connection that keeps up to max_in_flight requests outstanding.
+
+    Requests are matched to responses by their transaction id, so several register blocks can
+    be on the wire at once. Some devices only handle one request at a time and drop the rest or
+    the connection, when a pipelined request fails the session reconnects and sends one request
+    at a time from then on."""
+
+    def __init__(self, host: str, port: int, max_in_flight: int = 4, timeout: float = 3, **kwargs):
+        self.host = host
+        self.port = port
+        self.max_in_flight = max_in_flight
+        # reconnects are done by the session so that requests never go out on a half open connection
+        self.client = AsyncModbusTcpClient(host, port=port, timeout=timeout, retries=0, reconnect_delay=0, **kwargs)
+        self._in_flight = 0
+        self._can_send: Optional[asyncio.Condition] = None  # created on the engine loop
+        self._connecting: Optional[asyncio.Lock] = None
+
+    @property
+    def connected(self) -> bool:
+        return self.client.connected
+
+    def _connection_lock(self) -> asyncio.Lock:
+        if self._connecting is None:
+            self._connecting = asyncio.Lock()
+        return self._connecting
+
+    async def connect(self) -> bool:
+        # requests retried after a failed pipeline must not open a connection each, and a close
+        # while connecting would leave the client with an open transport it considers closed
+        async with self._connection_lock():
+            if not self.client.connected:
+                await self.client.connect()
+        return self.client.connected
+
+    async def close(self):
+        async with self._connection_lock():
+            # closing as a lost connection fails the outstanding requests right away instead of letting
+            # them run into the timeout, without a reconnect delay the client does not reconnect by itself
+            self.client.close(reconnect=True)
+
+    async def read(self, function_code: FunctionCodeKey, address: int, count: int, slave: int) -> ModbusResponse:
+        if function_code == FunctionCodeKey.READ_INPUT_REGISTERS:
+            return await self._execute(lambda: self.client.read_input_registers(address, count, slave=slave))
+        elif function_code == FunctionCodeKey.READ_HOLDING_REGISTERS:
+            return await self._execute(lambda: self.client.read_holding_registers(address, count, slave=slave))
+        raise ValueError(f"Unsupported function code {function_code}")
+
+    async def write_registers(self, address: int, values: list, slave: int) -> ModbusResponse:
+        return await self._execute(lambda: self.client.write_registers(address, values, slave=slave))
+
+    async def _execute(self, request) -> ModbusResponse:
+        if self._can_send is None:
+            self._can_send = asyncio.Condition()
+
+        while True:
+            async with self._can_send:
+                await self._can_send.wait_for(lambda: self._in_flight < self.max_in_flight)
+                self._in_flight += 1
+                pipelined = self._in_flight > 1
+
+            try:
+                if not await self.connect():
+                    raise ConnectionException(f"Failed to connect to {self.host}:{self.port}")
+                return await request()
+            except (ModbusIOException, ConnectionException):
+                if not pipelined and self._in_flight == 1:
+                    raise
+                # retry the requests that were on the wire together one by one
+                if self.max_in_flight > 1:
+                    logger.info("Pipelined request to %s:%s failed, sending one request at a time", self.host, self.port)
+                    self.max_in_flight = 1
+                    await self.close()
+            finally:
+                async with self._can_send:
+                    self._in_flight -= 1
+                    self._can_send.notify_all()
+
+
+class AsyncModbusTcpClientAdapter:
+    """Blocking facade of an engine session with the interface of ModbusTcpClient that ModbusTCP uses,
+    so that connecting, profile validation and writes share the connection of the async harvest."""
+
+    def __init__(self, engine: AsyncModbusEngine, host: str, port: int, timeout: float = 3, **kwargs):
+        self.engine = engine
+        self.timeout = timeout
+        self.session = AsyncModbusTcpSession(host, port, timeout=timeout, **kwargs)
+
+    @property
+    def socket(self) -> bool:
+        """Truthy while connected, like the socket of ModbusTcpClient"""
+        return self.session.connected
+
+    def connect(self) -> bool:
+        return self.engine.run(self.session.connect())
+
+    def close(self):
+        self.engine.run(self.session.close())
+
+    def read_input_registers(self, address: int, count: int, slave: int) -> ModbusResponse:
+        return self._run(self.session.read(FunctionCodeKey.READ_INPUT_REGISTERS, address, count, slave))
+
+    def read_holding_registers(self, address: int, count: int, slave: int) -> ModbusResponse:
+        return self._run(self.session.read(FunctionCodeKey.READ_HOLDING_REGISTERS, address, count, slave))
+
+    def write_registers(self, address: int, values: list, slave: int) -> ModbusResponse:
+        return self._run(self.session.write_registers(address, values, slave))
+
+    def _run(self, coro: Coroutine) -> ModbusResponse:
+        # the sync client returns the exception instead of raising it
+        try:
+            return self.engine.run(coro)
+        except ModbusIOException as e:
+            return e
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from abc import ABC, abstractmethod
 import logging
 from pymodbus.exceptions import ConnectionException, ModbusException, ModbusIOException
@@ -6,19 +6,47 @@ from server.devices.Device import Device
 from server.devices.inverters.common import INVERTER_CLIENT_NAME
 from ..ICom import HarvestDataType
 from ..supported_devices.profiles import ModbusDeviceProfiles, ModbusProfile
-from server.devices.profile_keys import FunctionCodeKey
+from server.devices.profile_keys import FunctionCodeKey, PollClassKey
 from server.devices.supported_devices.profile import RegisterInterval
+from server.devices.supported_devices.read_planner import ReadBlock
 import threading
+import time
 from server.devices.supported_devices.data_models import DERData
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 
+class ReadRejectedError(Exception):
+    """The device answered a read with a Modbus exception response, e.g. illegal data address"""
+
+
 class Modbus(Device, ABC):
     """Base class for all inverters."""
 
-    _lock = threading.Lock()
+    # One lock per physical transport (socket, serial port or logger stick), shared by every
+    # device instance that talks over that transport. Devices on separate transports can then be
+    # harvested in parallel while devices sharing e.g. an RS485 bus are still serialized.
+    _transport_locks: dict[tuple, threading.Lock] = {}
+    _transport_locks_guard = threading.Lock()
+
+    @staticmethod
+    def _get_transport_lock(transport_key: tuple) -> threading.Lock:
+        with Modbus._transport_locks_guard:
+            lock = Modbus._transport_locks.get(transport_key)
+            if lock is None:
+                lock = threading.Lock()
+                Modbus._transport_locks[transport_key] = lock
+            return lock
+
+    @property
+    def _lock(self) -> threading.Lock:
+        return self._get_transport_lock(self._transport_key())
+
+    @abstractmethod
+    def _transport_key(self) -> tuple:
+        """Identifies the physical transport of the device. Devices with equal keys share a lock."""
+        pass
 
     @property
     def DEVICE_TYPE(self) -> str:
@@ -67,6 +95,9 @@ class Modbus(Device, ABC):
             self.profile: ModbusProfile = ModbusDeviceProfiles().get(self.device_type)
 
         self.always_included = {}  # This is populated every time we do a verbose read
+        self._split_blocks: set[ReadBlock] = set()  # coalesced reads the device rejected
+        self._last_poll: dict[tuple[bool, PollClassKey], float] = {}  # monotonic time of the last read of a poll class
+        self._poll_cache: dict[bool, dict[int, int]] = {}  # latest values of the slow and static registers
 
     def _validate_and_select_profile(self):
         # check if the profile has any primary profiles to try first
@@ -80,36 +111,46 @@ class Modbus(Device, ABC):
                 break  # Break and use the first valid profile and continue with the rest of the code
 
     def _read_harvest_data(self, force_verbose: bool) -> dict:
-        regs = []
-        vals = []
-
-        registers = []
-
-        if force_verbose or self.profile.verbose_always:
-            registers = self.profile.get_registers_verbose()
-        else:
-            registers = self.profile.get_registers()
-
-        for entry in registers:
-            operation = entry.function_code
-            scan_start = entry.start_register
-            scan_range = entry.offset
-            scale_factor_register = entry.scale_factor_register
-
-            r = self._populate_registers(scan_start, scan_range)
-            v = self.read_registers(operation, scan_start, scan_range)
-
-            if scale_factor_register:
-                r += [scale_factor_register]
-                v += self.read_registers(operation, scale_factor_register, 1)
-
-            regs += r
-            vals += v
-
-        # Zip the registers and values together convert them into a dictionary
-        res = dict(zip(regs, vals))
-
-        if force_verbose or self.profile.verbose_always:
+        verbose = force_verbose or self.profile.verbose_always
+
+        blocks = self._harvest_read_plan(verbose)
+        res = {}
+        for block in blocks:
+            res.update(self._read_block(block))
+
+        return self._complete_harvest(res, verbose, len(blocks))
+
+    def _harvest_read_plan(self, verbose: bool) -> List[ReadBlock]:
+        """Returns the read blocks of the poll classes that are due. Fast registers are read on every harvest,
+        slow and static registers at the interval of their class and from the cache in between. A class is
+        due until all of its registers have been read, see _complete_harvest."""
+        now = time.monotonic()
+        blocks = []
+        for poll_class in self.profile.get_poll_classes(verbose):
+            last_poll = self._last_poll.get((verbose, poll_class))
+            if last_poll is None or (now - last_poll) * 1000 >= self.profile.poll_intervals_ms[poll_class]:
+                blocks.extend(self.profile.get_read_plan(verbose, poll_class))
+        return blocks
+
+    def _complete_harvest(self, res: dict, verbose: bool, block_count: int) -> dict:
+        """Record the poll classes that were read in full, add the cached values of the slow and static registers,
+        remember the always included registers of a verbose read and add them to a non-verbose read. A harvest
+        where none of the blocks was answered fails instead of being made up of cached values only."""
+        if block_count and not res:
+            raise Exception("readHarvestData() - no registers were read")
+
+        now = time.monotonic()
+        for poll_class in self.profile.get_poll_classes(verbose):
+            if self.profile.get_poll_class_registers(verbose, poll_class).issubset(res):
+                self._last_poll[(verbose, poll_class)] = now
+
+        fast_registers = self.profile.get_poll_class_registers(verbose, PollClassKey.FAST)
+        poll_cache = self._poll_cache.setdefault(verbose, {})
+        poll_cache.update((register, value) for register, value in res.items() if register not in fast_registers)
+        if poll_cache:
+            res = {**poll_cache, **res}
+
+        if verbose:
             for i in self.profile.always_include:
                 if i in res:
                     self.always_included[i] = res[i]
@@ -124,6 +165,36 @@ class Modbus(Device, ABC):
         else:
             raise Exception("readHarvestData() - res is empty")
 
+    def _read_block(self, block: ReadBlock) -> dict:
+        """
+        Read a coalesced block of registers. If the device rejects the merged read (e.g. because of
+        unmapped gap registers) or answers it short, the intervals are read one by one from then on.
+        Other errors are raised as for a single interval, and a read without an answer is tried
+        coalesced again on the next harvest.
+        """
+        if len(block.spans) > 1 and block not in self._split_blocks:
+            try:
+                values = self.read_registers(block.function_code, block.start_register, block.count)
+            except ReadRejectedError as e:
+                logger.debug("Coalesced read %s rejected: %s", block, e)
+                values = None
+
+            if values is not None:
+                if len(values) == block.count:
+                    return block.split(values)
+                if not values:  # read_registers logs and drops the errors of a read without an answer
+                    logger.warning("Coalesced read %s got no answer from %s", block, self.device_type)
+                    return {}
+
+            logger.info("Coalesced read %s rejected by %s, reading the intervals separately", block, self.device_type)
+            self._split_blocks.add(block)
+
+        res = {}
+        for scan_start, scan_range in block.spans:
+            values = self.read_registers(block.function_code, scan_start, scan_range)
+            res.update(zip(self._populate_registers(scan_start, scan_range), values))
+        return res
+
     def _populate_registers(self, scan_start: int, scan_range: int) -> list:
         """
         Populate a list of registers from a start address and a range
@@ -156,6 +227,9 @@ class Modbus(Device, ABC):
 
         return resp
 
+    def get_barn_deadbands(self) -> list[tuple[tuple[int, ...], int]]:
+        return self.profile.get_deadbands()
+
     def get_harvest_data_type(self) -> HarvestDataType:
         return self.data_type
 
@@ -200,8 +274,13 @@ class Modbus(Device, ABC):
         if not reg:
             return None
 
-        value = self._read_value(reg)
+        value = self.clean_SN(self._read_value(reg))
+        logger.info("SN: %s", value)
+        return value
 
+    @staticmethod
+    def clean_SN(value) -> Optional[str]:
+        """The serial number as read from the SN register, None if the register holds no serial number"""
         if not value:
             return None
 
@@ -211,8 +290,6 @@ class Modbus(Device, ABC):
             cleaned_sn = cleaned_sn.strip()
             value = cleaned_sn
 
-        logger.info("SN: %s", value)
-
         return str(value)
     
     def harvest_to_ders(self, payload: dict | str) -> DERData:
@@ -6,6 +6,7 @@ from server.devices.ICom import ICom
 from server.devices.supported_devices.profiles import ModbusProfile, ModbusDeviceProfiles
 from server.devices.profile_keys import ProtocolKey
 from server.devices.inverters.ModbusTCP import ModbusTCP
+from server.devices.inverters.modbus_fingerprint import ModbusFingerprinter
 import time
 from datetime import datetime
 from server.network.mac_lookup import MacLookupService
@@ -23,8 +24,8 @@ _is_scanning = False
 2. Scan the network for hosts with open Modbus ports
 3. For each host in parallel:
    - Look up manufacturer from MAC address
-   - If manufacturer found, test matching profiles
-   - If no manufacturer or no match, return as unknown device
+   - Fingerprint the host with the profiles of the manufacturer, or all profiles if none match
+   - If no profile matches, the host is skipped
 4. Return list of all found devices
 
 scan_for_modbus_devices()  # Entry point
@@ -38,23 +39,12 @@ scan_for_modbus_devices()  # Entry point
 │    ├─── Host1 Thread [identify_device()]
 │    │    ├─── MAC lookup -> Get manufacturer
 │    │    ├─── Filter profiles by manufacturer
-│    │    └─── Test matching profiles
-│    │        ├─── Try Slave IDs 0-5
-│    │        └─── Return first working device or unknown
+│    │    └─── Fingerprint on one connection (ModbusFingerprinter)
+│    │        ├─── Read the SN and frequency registers of the profiles, slave IDs 0-2 concurrently
+│    │        └─── Return the best scoring profile and slave ID
 │    │
-│    ├─── Host2 Thread [identify_device()]
-│    │    ├─── MAC lookup -> Get manufacturer
-│    │    ├─── Filter profiles by manufacturer
-│    │    └─── Test matching profiles
-│    │        ├─── Try Slave IDs 0-5
-│    │        └─── Return first working device or unknown
-│    │
-│    └─── Host3 Thread [identify_device()]
-│         ├─── MAC lookup -> Get manufacturer
-│         ├─── Filter profiles by manufacturer
-│         └─── Test matching profiles
-│             ├─── Try Slave IDs 0-5
-│             └─── Return first working device or unknown
+│    └─── Host2 Thread [identify_device()]
+│         └─── ...
 │
 └─── Main Thread
      └─── Collect results and return device list
@@ -132,8 +122,8 @@ def create_unknown_device(host: HostInfo) -> ICom:
 
 def identify_device(host: HostInfo, all_profiles: List[ModbusProfile]) -> Optional[ICom]:
     """
-    Try to identify a device by first checking MAC manufacturer.
-    Returns unknown device if no match found.
+    Identify a device by fingerprinting it with the profiles of its MAC manufacturer.
+    Returns None if no profile matches.
     """
 
     if host.port == 8899:
@@ -144,37 +134,18 @@ def identify_device(host: HostInfo, all_profiles: List[ModbusProfile]) -> Option
 
     logger.debug(f"The following profiles are available for {host.mac}: {[profile.name for profile in profiles]}")
 
-    # Test manufacturer-specific profiles
-    for profile in profiles:
-        device = try_profile(host, profile)
-        if device:
-            return device
-
-    return None
-
-
-def try_profile(host: HostInfo, profile: ModbusProfile) -> Optional[ICom]:
-    """Helper function to try a specific profile with different slave IDs"""
-
-    for slave_id in range(3):
-        try:
-            device = ModbusTCP(
-                ip=host.ip,
-                port=host.port,
-                mac=host.mac,
-                slave_id=slave_id,
-                device_type=profile.name
-            )
+    match = ModbusFingerprinter(profiles).identify(host)
+    if match is None:
+        return None
 
-            if device.connect():
-                device.disconnect()
-
-                return device
-
-        except Exception:
-            continue
-
-    return None
+    return ModbusTCP(
+        ip=host.ip,
+        port=host.port,
+        mac=host.mac,
+        slave_id=match.slave_id,
+        device_type=match.profile.name,
+        sn=match.sn if match.sn else host.mac  # like a connect, a valid frequency without SN register uses the MAC
+    )
 
 
 def filter_open_devices(hosts: List[HostInfo], open_devices: List[ICom]) -> List[HostInfo]:
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import List, Optional
+from pymodbus.exceptions import ConnectionException, ModbusIOException
+from server.devices.profile_keys import FunctionCodeKey
+from server.devices.registerValue import RegisterValue
+from server.devices.supported_devices.profile import RegisterInterval
+from server.devices.supported_devices.profiles import ModbusProfile
+from server.network.network_utils import HostInfo
+from .async_modbus_engine import AsyncModbusEngine, AsyncModbusTcpSession
+from .modbus import Modbus
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+@dataclass(frozen=True)
+class ProbeRead:
+    """A register read done once per slave ID, shared by all profiles that need it"""
+    function_code: FunctionCodeKey
+    address: int
+    count: int
+
+    @staticmethod
+    def of(register: RegisterInterval) -> 'ProbeRead':
+        return ProbeRead(register.function_code, register.start_register, register.offset)
+
+
+@dataclass
+class FingerprintMatch:
+    profile: ModbusProfile
+    slave_id: int
+    sn: Optional[str]
+    frequency: Optional[float]
+
+    @property
+    def score(self) -> int:
+        """A serial number counts more than a frequency in range, a profile with both beats one with either"""
+        return (2 if self.sn else 0) + (1 if self.frequency is not None else 0)
+
+
+class ModbusFingerprinter:
+    """Identifies the profile and slave ID of a Modbus TCP host with a few register reads on one connection.
+
+    A profile is identified by its SN register and its frequency register (the first harvest register),
+    the same registers a ModbusTCP connect validates. The reads of all profiles are collected once and
+    reads that several profiles share are done once. The slave IDs are probed concurrently on the async
+    Modbus engine and take turns on the connection, a slave ID that does not answer a read twice is not
+    probed further. The profile with the highest score wins, ties go to the earlier profile and then the
+    lower slave ID."""
+
+    SLAVE_IDS = (0, 1, 2)
+    PROBE_TIMEOUT_S = 1.0
+    MAX_IN_FLIGHT = 1  # the device is not known yet, many devices drop the connection on pipelined requests
+    FREQUENCY_RANGE = (48.0, 62.0)
+
+    def __init__(self, profiles: List[ModbusProfile], slave_ids=SLAVE_IDS, engine: Optional[AsyncModbusEngine] = None,
+                 timeout: float = PROBE_TIMEOUT_S):
+        self.profiles = [profile for profile in profiles if profile.registers]
+        self.slave_ids = list(slave_ids)
+        self.engine = engine or AsyncModbusEngine.get_instance()
+        self.timeout = timeout
+
+        probes = {}  # ordered like the profiles, the likely profiles are probed first
+        for profile in self.profiles:
+            for register in self._registers(profile):
+                probes.setdefault(ProbeRead.of(register), None)
+        self.probes: List[ProbeRead] = list(probes)
+
+    @staticmethod
+    def _registers(profile: ModbusProfile) -> List[RegisterInterval]:
+        return [profile.sn, profile.registers[0]] if profile.sn else [profile.registers[0]]
+
+    def identify(self, host: HostInfo) -> Optional[FingerprintMatch]:
+        """Blocking version of identify_async, run on the engine"""
+        return self.engine.run(self.identify_async(host))
+
+    async def identify_async(self, host: HostInfo) -> Optional[FingerprintMatch]:
+        session = AsyncModbusTcpSession(host.ip, host.port, max_in_flight=self.MAX_IN_FLIGHT, timeout=self.timeout)
+        try:
+            if not await session.connect():
+                logger.debug("Could not connect to %s:%s to fingerprint it", host.ip, host.port)
+                return None
+            reads = await asyncio.gather(*(self._probe_slave(session, slave_id) for slave_id in self.slave_ids))
+        except (ConnectionException, OSError) as e:
+            logger.debug("Fingerprinting %s:%s failed: %s", host.ip, host.port, e)
+            return None
+        finally:
+            await session.close()
+
+        matches = [match for slave_id, values in zip(self.slave_ids, reads) for match in self.score(slave_id, values)]
+        if not matches:
+            logger.info("No profile matches %s:%s", host.ip, host.port)
+            return None
+
+        best = max(matches, key=lambda m: (m.score, -self.profiles.index(m.profile), -self.slave_ids.index(m.slave_id)))
+        logger.info("Identified %s:%s as %s with slave ID %s, SN %s", host.ip, host.port, best.profile.name, best.slave_id, best.sn)
+        return best
+
+    async def _probe_slave(self, session: AsyncModbusTcpSession, slave_id: int) -> dict[ProbeRead, list]:
+        values = {}
+        for probe in self.probes:
+            response = await self._read(session, probe, slave_id)
+            if response is None:
+                logger.debug("Slave ID %s does not answer, not probing it further", slave_id)
+                break
+            if not response.isError() and len(response.registers) == probe.count:
+                values[probe] = response.registers
+        return values
+
+    async def _read(self, session: AsyncModbusTcpSession, probe: ProbeRead, slave_id: int):
+        # a read is retried once on a new connection, some devices close the connection on a read they do not like
+        for _ in range(2):
+            try:
+                return await session.read(probe.function_code, probe.address, probe.count, slave_id)
+            except (ModbusIOException, ConnectionException):
+                continue
+        return None
+
+    def score(self, slave_id: int, values: dict[ProbeRead, list]) -> List[FingerprintMatch]:
+        """The profiles that match the probe reads of a slave ID"""
+        matches = []
+        for profile in self.profiles:
+            sn = Modbus.clean_SN(self._decode(profile.sn, values)) if profile.sn else None
+            frequency = self._decode(profile.registers[0], values)
+            if not isinstance(frequency, (int, float)) or not self.FREQUENCY_RANGE[0] <= frequency <= self.FREQUENCY_RANGE[1]:
+                frequency = None
+            if sn or frequency is not None:
+                matches.append(FingerprintMatch(profile, slave_id, sn, frequency))
+        return matches
+
+    @staticmethod
+    def _decode(register: RegisterInterval, values: dict[ProbeRead, list]):
+        registers = values.get(ProbeRead.of(register))
+        if registers is None:
+            return None
+        _, _, value = RegisterValue(address=register.start_register,
+                                    size=register.offset,
+                                    function_code=register.function_code,
+                                    data_type=register.data_type,
+                                    scale_factor=register.scale_factor,
+                                    endianness=register.endianness).interpret_registers(registers)
+        return value
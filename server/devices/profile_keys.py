@@ -18,6 +18,8 @@ class ProfileKey(str, Enum):
     KEYWORDS = 'keywords'
     ALWAYS_INCLUDE = 'always_include'
     CONDITIONS = 'conditions'
+    READ_GAP_TOLERANCE = 'read_gap_tolerance'
+    POLL_INTERVALS = 'poll_intervals'
 
 
 class ProtocolKey(str, Enum):
@@ -38,6 +40,8 @@ class RegistersKey(str, Enum):
     SCALE_FACTOR = 'scale_factor'
     ENDIANNESS = 'endianness'
     SCALE_FACTOR_REGISTER = 'scale_factor_register'
+    POLL_CLASS = 'poll_class'
+    DEADBAND = 'deadband'
     VALUE = 'value'
 
 
@@ -65,6 +69,12 @@ class FunctionCodeKey(int, Enum):
     WRITE_MULTIPLE_REGISTERS = 0x10
 
 
+class PollClassKey(str, Enum):
+    FAST = 'fast'      # Read on every harvest, e.g. power, voltage and current
+    SLOW = 'slow'      # Slowly changing values, e.g. energy counters and temperatures
+    STATIC = 'static'  # Values that (almost) never change, e.g. serial numbers, ratings and firmware versions
+
+
 class DeviceCategoryKey(str, Enum):
     INVERTERS = 'inverters'
     METERS = 'meters'
@@ -35,7 +35,10 @@ class RegisterValue:
         """
         # Read using the specified function code
         registers = device.read_registers(self.function_code, self.address, self.size)
+        return self.interpret_registers(registers)
 
+    def interpret_registers(self, registers: List[int]) -> Tuple[bytearray, bytearray, Optional[Union[int, float, str]]]:
+        """Interprets register values that have already been read, returns the same tuple as read_value"""
         raw = bytearray()
 
         if not registers:
@@ -0,0 +1,97 @@
+import struct
+from types import MappingProxyType
+from typing import Callable, Optional, Union
+from ..profile_keys import RegistersKey, DataTypeKey, EndiannessKey
+
+
+# (number of bytes, signed) of the integer data types
+_INTEGER_TYPES = {
+    DataTypeKey.U16: (2, False),
+    DataTypeKey.I16: (2, True),
+    DataTypeKey.U32: (4, False),
+    DataTypeKey.I32: (4, True),
+    DataTypeKey.U64: (8, False),
+    DataTypeKey.I64: (8, True),
+}
+
+_F32 = struct.Struct(">f")
+
+
+class FieldDecoder:
+    """Decodes a single register definition. Everything that does not depend on the register values
+    (addresses, struct formats, register order and scale) is resolved when the decoder is created.
+    Decoding gives the same result as RegisterValue._interpret_value."""
+
+    __slots__ = ("address", "registers", "data_type", "scale_factor", "_swap", "_pack", "_width", "_signed")
+
+    def __init__(self, entry: dict):
+        self.address: int = entry[RegistersKey.START_REGISTER]
+        size: int = entry[RegistersKey.NUM_OF_REGISTERS]
+        self.registers: tuple[int, ...] = tuple(range(self.address, self.address + size))
+        self.data_type: DataTypeKey = entry[RegistersKey.DATA_TYPE]
+        self.scale_factor: float = entry[RegistersKey.SCALE_FACTOR]
+
+        # little endian swaps the register order, bytes within a register are always big endian
+        self._swap: bool = size > 1 and entry[RegistersKey.ENDIANNESS] == EndiannessKey.LITTLE
+        self._pack: Callable[..., bytes] = struct.Struct(f">{size}H").pack
+        self._width, self._signed = _INTEGER_TYPES.get(self.data_type, (0, False))
+
+    def decode(self, raw_register_values: dict) -> Optional[Union[int, float, str]]:
+        try:
+            regs = [int(raw_register_values[r]) for r in self.registers]
+        except (KeyError, ValueError, TypeError):
+            return None
+
+        if self._swap:
+            regs.reverse()
+
+        if self._width == 2:
+            value = regs[0]
+            if self._signed and value & 0x8000:
+                value -= 0x10000
+            return value * self.scale_factor
+
+        try:
+            raw = self._pack(*regs)
+
+            if self._width:
+                return int.from_bytes(raw[0:self._width], "big", signed=self._signed) * self.scale_factor
+
+            if self.data_type == DataTypeKey.F32:
+                return _F32.unpack_from(raw)[0] * self.scale_factor
+
+            if self.data_type == DataTypeKey.STR:
+                return raw.decode("ascii").rstrip('\x00')
+
+        except (struct.error, UnicodeDecodeError):
+            pass
+
+        return None
+
+
+class DecodePlan:
+    """Immutable, precompiled decoding of a list of register definitions.
+    Build it once when the profile is loaded and reuse it for every harvest."""
+
+    def __init__(self, register_defs: list):
+        self._decoders = MappingProxyType({entry[RegistersKey.START_REGISTER]: FieldDecoder(entry) for entry in register_defs})
+
+    def __len__(self) -> int:
+        return len(self._decoders)
+
+    def decode(self, raw_register_values: dict, addr: int) -> Optional[Union[int, float, str]]:
+        decoder = self._decoders.get(addr)
+        if decoder is None:
+            return None
+        return decoder.decode(raw_register_values)
+
+    def decoder(self, raw_register_values: dict) -> Callable[[int], Optional[Union[int, float, str]]]:
+        """Returns a decode(addr) function bound to the raw register values of a harvest"""
+        decoders = self._decoders
+
+        def decode(addr: int):
+            decoder = decoders.get(addr)
+            if decoder is None:
+                return None
+            return decoder.decode(raw_register_values)
+        return decode
@@ -5,8 +5,10 @@ from ....profile_keys import (
     FunctionCodeKey,
     DataTypeKey,
     EndiannessKey,
+    PollClassKey,
 )
 from ...profile import ModbusProfile
+from ...decode_plan import DecodePlan
 from ....common.types import ModbusDevice
 from ....registerValue import RegisterValue
 from .definitions_slim import deye_profile as slim_deye_profile
@@ -24,12 +26,13 @@ logging.basicConfig(level=logging.INFO)
 class DeyeProfile(ModbusProfile):
     def __init__(self):
         super().__init__(deye_profile)
+        self.decode_plan = DecodePlan(full_deye_profile[ProfileKey.REGISTERS])
 
     def profile_is_valid(self, device: ModbusDevice) -> bool:
         return True
     
     def harvest_to_decoded_dict(self, raw_register_values: dict) -> dict:
-        decode = self.create_decoder(raw_register_values, full_deye_profile[ProfileKey.REGISTERS])
+        decode = self.decode_plan.decoder(raw_register_values)
         
         registers = {}
         
@@ -54,7 +57,7 @@ class DeyeProfile(ModbusProfile):
         if not raw_register_values:
             return DERData()
 
-        decode = self.create_decoder(raw_register_values, full_deye_profile[ProfileKey.REGISTERS])
+        decode = self.decode_plan.decoder(raw_register_values)
         is_high_voltage = decode(0) == 6
 
         def scale_voltage(val: float) -> float:
@@ -225,35 +228,49 @@ deye_profile = {
     },
     ProfileKey.ALWAYS_INCLUDE: [0],
     ProfileKey.REGISTERS_VERBOSE: [
+        # Device information, serial number and ratings
         {
             RegistersKey.FUNCTION_CODE: FunctionCodeKey.READ_HOLDING_REGISTERS,
             RegistersKey.START_REGISTER: 0,
             RegistersKey.NUM_OF_REGISTERS: 59,
+            RegistersKey.POLL_CLASS: PollClassKey.STATIC,
         },
+        # Settings, energy counters and temperatures
         {
             RegistersKey.FUNCTION_CODE: FunctionCodeKey.READ_HOLDING_REGISTERS,
             RegistersKey.START_REGISTER: 60,
             RegistersKey.NUM_OF_REGISTERS: 125,
+            RegistersKey.POLL_CLASS: PollClassKey.SLOW,
         },
         {
             RegistersKey.FUNCTION_CODE: FunctionCodeKey.READ_HOLDING_REGISTERS,
             RegistersKey.START_REGISTER: 185,
             RegistersKey.NUM_OF_REGISTERS: 125,
+            RegistersKey.POLL_CLASS: PollClassKey.SLOW,
         },
         {
             RegistersKey.FUNCTION_CODE: FunctionCodeKey.READ_HOLDING_REGISTERS,
             RegistersKey.START_REGISTER: 310,
             RegistersKey.NUM_OF_REGISTERS: 125,
+            RegistersKey.POLL_CLASS: PollClassKey.SLOW,
         },
         {
             RegistersKey.FUNCTION_CODE: FunctionCodeKey.READ_HOLDING_REGISTERS,
             RegistersKey.START_REGISTER: 435,
             RegistersKey.NUM_OF_REGISTERS: 64,
+            RegistersKey.POLL_CLASS: PollClassKey.SLOW,
         },
         {
             RegistersKey.FUNCTION_CODE: FunctionCodeKey.READ_HOLDING_REGISTERS,
             RegistersKey.START_REGISTER: 500,
-            RegistersKey.NUM_OF_REGISTERS: 125,
+            RegistersKey.NUM_OF_REGISTERS: 86,
+            RegistersKey.POLL_CLASS: PollClassKey.SLOW,
+        },
+        # Battery, grid and load measurements
+        {
+            RegistersKey.FUNCTION_CODE: FunctionCodeKey.READ_HOLDING_REGISTERS,
+            RegistersKey.START_REGISTER: 586,
+            RegistersKey.NUM_OF_REGISTERS: 39,
         },
         {
             RegistersKey.FUNCTION_CODE: FunctionCodeKey.READ_HOLDING_REGISTERS,
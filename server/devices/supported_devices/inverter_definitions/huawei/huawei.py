@@ -7,6 +7,7 @@ from ....profile_keys import (
     EndiannessKey,
 )
 from ...profile import ModbusProfile
+from ...decode_plan import DecodePlan
 from .definitions import huawei_profile as full_huawei_profile
 from ....common.types import ModbusDevice
 from ....registerValue import RegisterValue
@@ -24,6 +25,7 @@ MANUFACTURER = "Huawei"
 class HuaweiProfile(ModbusProfile):
     def __init__(self):
         super().__init__(huawei_profile)
+        self.decode_plan = DecodePlan(full_huawei_profile[ProfileKey.REGISTERS])
         self.primary_profiles = [HuaweiHybridProfile()]
 
     def profile_is_valid(self, device: ModbusDevice) -> bool:
@@ -35,7 +37,7 @@ class HuaweiProfile(ModbusProfile):
         if not raw_register_values:
             return DERData()
 
-        decode = self.create_decoder(raw_register_values, full_huawei_profile[ProfileKey.REGISTERS])
+        decode = self.decode_plan.decoder(raw_register_values)
 
         pv = PVData()
         pv.make = MANUFACTURER
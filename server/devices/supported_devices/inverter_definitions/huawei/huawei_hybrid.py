@@ -7,6 +7,7 @@ from ....profile_keys import (
     EndiannessKey,
 )
 from ...profile import ModbusProfile
+from ...decode_plan import DecodePlan
 from .definitions import huawei_profile as full_huawei_profile
 from ....common.types import ModbusDevice
 from ....registerValue import RegisterValue
@@ -22,6 +23,7 @@ MANUFACTURER = "Huawei"
 class HuaweiHybridProfile(ModbusProfile):
     def __init__(self):
         super().__init__(huawei_profile)
+        self.decode_plan = DecodePlan(full_huawei_profile[ProfileKey.REGISTERS])
 
     def profile_is_valid(self, device: ModbusDevice) -> bool:
         # Implement actual validation logic if needed
@@ -32,7 +34,7 @@ class HuaweiHybridProfile(ModbusProfile):
         if not raw_register_values:
             return DERData()
 
-        decode = self.create_decoder(raw_register_values, full_huawei_profile[ProfileKey.REGISTERS])
+        decode = self.decode_plan.decoder(raw_register_values)
 
         pv = PVData()
         pv.make = MANUFACTURER
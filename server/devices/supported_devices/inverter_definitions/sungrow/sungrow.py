@@ -7,6 +7,7 @@ from ....profile_keys import (
     EndiannessKey,
 )
 from ...profile import ModbusProfile
+from ...decode_plan import DecodePlan
 from .definitions import sungrow_profile as full_sungrow_profile
 from ....common.types import ModbusDevice
 from ....registerValue import RegisterValue
@@ -23,6 +24,7 @@ MANUFACTURER = "Sungrow"
 class SungrowProfile(ModbusProfile):
     def __init__(self):
         super().__init__(sungrow_profile)
+        self.decode_plan = DecodePlan(full_sungrow_profile[ProfileKey.REGISTERS])
 
     def profile_is_valid(self, device: ModbusDevice) -> bool:
         return True
@@ -32,7 +34,7 @@ class SungrowProfile(ModbusProfile):
         if not raw_register_values:
             return DERData()
 
-        decode = self.create_decoder(raw_register_values, full_sungrow_profile[ProfileKey.REGISTERS])
+        decode = self.decode_plan.decoder(raw_register_values)
 
         pv = PVData()
         pv.make = MANUFACTURER
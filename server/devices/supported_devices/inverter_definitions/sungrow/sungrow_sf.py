@@ -7,6 +7,7 @@ from ....profile_keys import (
     EndiannessKey,
 )
 from ...profile import ModbusProfile
+from ...decode_plan import DecodePlan
 from ....common.types import ModbusDevice
 from ...data_models import DERData, PVData, BatteryData, MeterData
 from .definitions import sungrow_profile as full_sungrow_profile
@@ -22,6 +23,7 @@ MANUFACTURER = "Sungrow"
 class SungrowSFProfile(ModbusProfile):
     def __init__(self):
         super().__init__(sungrow_sf_profile)
+        self.decode_plan = DecodePlan(full_sungrow_profile[ProfileKey.REGISTERS])
 
     def profile_is_valid(self, device: ModbusDevice) -> bool:
         return True
@@ -31,7 +33,7 @@ class SungrowSFProfile(ModbusProfile):
         if not raw_register_values:
             return DERData()
 
-        decode = self.create_decoder(raw_register_values, full_sungrow_profile[ProfileKey.REGISTERS])
+        decode = self.decode_plan.decoder(raw_register_values)
 
         pv = PVData()
         pv.make = MANUFACTURER
@@ -1,9 +1,19 @@
 from abc import ABC, abstractmethod
 from typing import List
-from ..profile_keys import ProfileKey, RegistersKey, EndiannessKey, FunctionCodeKey, DataTypeKey
+from ..profile_keys import ProfileKey, RegistersKey, EndiannessKey, FunctionCodeKey, DataTypeKey, PollClassKey
 from ..common.types import ModbusDevice
 from server.devices.supported_devices.data_models import DERData
-from ..registerValue import RegisterValue
+from .decode_plan import DecodePlan
+from .read_planner import ReadPlanner, ReadBlock, DEFAULT_READ_GAP_TOLERANCE
+
+
+# How often the registers of each poll class are read, fast registers are read on every harvest.
+# Profiles can override these with ProfileKey.POLL_INTERVALS
+DEFAULT_POLL_INTERVALS_MS = {
+    PollClassKey.FAST: 0,
+    PollClassKey.SLOW: 60 * 1000,
+    PollClassKey.STATIC: 60 * 60 * 1000,
+}
 
 
 class BaseProfile(ABC):
@@ -44,7 +54,9 @@ class RegisterInterval:
                  description: str = "N/A",
                  scale_factor: float = 1.0,
                  endianness: EndiannessKey = EndiannessKey.BIG,
-                 scale_factor_register: int = None):
+                 scale_factor_register: int = None,
+                 poll_class: PollClassKey = PollClassKey.FAST,
+                 deadband: int = 0):
         self.function_code: FunctionCodeKey = function_code
         self.start_register: int = start_register
         self.offset: int = offset
@@ -54,35 +66,17 @@ class RegisterInterval:
         self.scale_factor: float = scale_factor
         self.endianness: EndiannessKey = endianness
         self.scale_factor_register: int = scale_factor_register
+        self.poll_class: PollClassKey = poll_class
+        self.deadband: int = deadband  # change in raw register units below which the value is not sent in a delta encoded barn
 
 
 class ModbusProfile(DeviceProfile):
     def create_decoder(self, raw_register_values: dict, register_defs: list):
         """
         Returns a decode(addr) function that decodes the value at a given register address using the provided register definitions.
+        This compiles the definitions on every call, profiles that decode every harvest should keep a DecodePlan instead.
         """
-        reg_defs = {entry[RegistersKey.START_REGISTER]: entry for entry in register_defs}
-        def decode(addr: int):
-            entry = reg_defs.get(addr)
-            if not entry:
-                return None
-            size = entry[RegistersKey.NUM_OF_REGISTERS]
-            try:
-                regs = [raw_register_values[addr + i] for i in range(size)]
-            except KeyError:
-                return None
-            raw = bytearray()
-            for r in regs:
-                raw.extend(int(r).to_bytes(2, "big", signed=False))
-            rv = RegisterValue(addr,
-                               size,
-                               entry[RegistersKey.FUNCTION_CODE],
-                               entry[RegistersKey.DATA_TYPE],
-                               entry[RegistersKey.SCALE_FACTOR],
-                               entry[RegistersKey.ENDIANNESS])
-            _, value = rv._interpret_value(raw)
-            return value
-        return decode
+        return DecodePlan(register_defs).decoder(raw_register_values)
     """Modbus profile class. Used to define register intervals for Modbus profiles."""
 
     def __init__(self, profile_data: dict):
@@ -91,6 +85,10 @@ class ModbusProfile(DeviceProfile):
         self.sn: RegisterInterval = None
         self.registers_verbose: List[RegisterInterval] = []
         self.registers: List[RegisterInterval] = []
+        self.read_gap_tolerance: int = profile_data.get(ProfileKey.READ_GAP_TOLERANCE, DEFAULT_READ_GAP_TOLERANCE)
+        self.poll_intervals_ms: dict[PollClassKey, int] = {**DEFAULT_POLL_INTERVALS_MS, **profile_data.get(ProfileKey.POLL_INTERVALS, {})}
+        self._read_plans: dict[tuple[bool, PollClassKey | None], List[ReadBlock]] = {}
+        self._poll_class_registers: dict[tuple[bool, PollClassKey], frozenset[int]] = {}
 
         if ProfileKey.SN in profile_data:
             sn_reg = profile_data[ProfileKey.SN]
@@ -113,6 +111,8 @@ class ModbusProfile(DeviceProfile):
                         register_interval[RegistersKey.FUNCTION_CODE],
                         register_interval[RegistersKey.START_REGISTER],
                         register_interval[RegistersKey.NUM_OF_REGISTERS],
+                        poll_class=register_interval.get(RegistersKey.POLL_CLASS, PollClassKey.FAST),
+                        deadband=register_interval.get(RegistersKey.DEADBAND, 0),
                     )
                 )
 
@@ -128,7 +128,9 @@ class ModbusProfile(DeviceProfile):
                         register_interval[RegistersKey.DESCRIPTION],
                         register_interval[RegistersKey.SCALE_FACTOR],
                         register_interval[RegistersKey.ENDIANNESS],
-                        register_interval.get(RegistersKey.SCALE_FACTOR_REGISTER, None)
+                        register_interval.get(RegistersKey.SCALE_FACTOR_REGISTER, None),
+                        register_interval.get(RegistersKey.POLL_CLASS, PollClassKey.FAST),
+                        register_interval.get(RegistersKey.DEADBAND, 0)
                     )
                 )
 
@@ -137,6 +139,41 @@ class ModbusProfile(DeviceProfile):
 
     def get_registers(self) -> List[RegisterInterval]:
         return self.registers
+
+    def get_read_plan(self, verbose: bool, poll_class: PollClassKey | None = None) -> List[ReadBlock]:
+        """Returns the coalesced read requests for the verbose or normal register set, optionally only for the intervals
+        of one poll class. The plan is built once and then reused"""
+        key = (verbose, poll_class)
+        if key not in self._read_plans:
+            registers = self.get_registers_verbose() if verbose else self.get_registers()
+            if poll_class is not None:
+                registers = [register for register in registers if register.poll_class == poll_class]
+            self._read_plans[key] = ReadPlanner(self.read_gap_tolerance).plan(registers)
+        return self._read_plans[key]
+
+    def get_poll_class_registers(self, verbose: bool, poll_class: PollClassKey) -> frozenset[int]:
+        """Returns the registers read for the intervals of a poll class, including their scale factor registers"""
+        key = (verbose, poll_class)
+        if key not in self._poll_class_registers:
+            registers = set()
+            for register in self.get_registers_verbose() if verbose else self.get_registers():
+                if register.poll_class == poll_class:
+                    registers.update(range(register.start_register, register.start_register + register.offset))
+                    if register.scale_factor_register:
+                        registers.add(register.scale_factor_register)
+            self._poll_class_registers[key] = frozenset(registers)
+        return self._poll_class_registers[key]
+
+    def get_deadbands(self) -> List[tuple[tuple[int, ...], int]]:
+        """Returns the (registers, deadband) of the intervals that have a deadband"""
+        return [(tuple(range(register.start_register, register.start_register + register.offset)), register.deadband)
+                for register in self.get_registers_verbose() + self.get_registers() if register.deadband > 0]
+
+    def get_poll_classes(self, verbose: bool) -> List[PollClassKey]:
+        """Returns the poll classes used by the verbose or normal register set"""
+        registers = self.get_registers_verbose() if verbose else self.get_registers()
+        used = {register.poll_class for register in registers}
+        return [poll_class for poll_class in PollClassKey if poll_class in used]
     
     def harvest_to_ders(payload: dict) -> DERData:
         return DERData()
@@ -0,0 +1,83 @@
+from typing import List, TYPE_CHECKING
+from ..profile_keys import FunctionCodeKey
+
+if TYPE_CHECKING:
+    from .profile import RegisterInterval
+
+
+# Maximum number of registers in a single read request (Modbus PDU limit)
+MAX_REGISTERS_PER_READ = 125
+
+# Default number of unused registers that may be read to join two intervals into one request
+DEFAULT_READ_GAP_TOLERANCE = 8
+
+
+class ReadBlock:
+    """A single read request covering one or more register intervals with the same function code.
+    The block may include unused gap registers, split() only returns the registers that were asked for."""
+
+    def __init__(self, function_code: FunctionCodeKey, start_register: int, count: int, spans: List[tuple[int, int]]):
+        self.function_code: FunctionCodeKey = function_code
+        self.start_register: int = start_register
+        self.count: int = count
+        self.spans: List[tuple[int, int]] = spans  # (start_register, count) of the requested intervals
+
+        registers = sorted({address for start, span_count in spans for address in range(start, start + span_count)})
+        self._offsets: List[tuple[int, int]] = [(address, address - start_register) for address in registers]
+
+    @property
+    def registers(self) -> List[int]:
+        return [address for address, _ in self._offsets]
+
+    def split(self, values: list) -> dict:
+        """Map the values of a read of the whole block to the requested registers"""
+        return {address: values[offset] for address, offset in self._offsets}
+
+    def __str__(self):
+        return f"ReadBlock(function_code={self.function_code}, start_register={self.start_register}, count={self.count}, spans={len(self.spans)})"
+
+
+class ReadPlanner:
+    """Coalesces register intervals into as few read requests as possible.
+
+    Intervals (and their scale factor registers) are grouped per function code and merged with their
+    neighbours as long as the gap between them is within the gap tolerance and the merged request does
+    not exceed the Modbus PDU limit."""
+
+    def __init__(self, gap_tolerance: int = DEFAULT_READ_GAP_TOLERANCE, max_registers: int = MAX_REGISTERS_PER_READ):
+        self.gap_tolerance = gap_tolerance
+        self.max_registers = max_registers
+
+    def plan(self, intervals: List['RegisterInterval']) -> List[ReadBlock]:
+        spans_by_function_code: dict[FunctionCodeKey, list[tuple[int, int]]] = {}
+
+        for interval in intervals:
+            spans = spans_by_function_code.setdefault(interval.function_code, [])
+            spans.append((interval.start_register, interval.offset))
+            if interval.scale_factor_register:
+                spans.append((interval.scale_factor_register, 1))
+
+        blocks: List[ReadBlock] = []
+        for function_code, spans in spans_by_function_code.items():
+            blocks += self._merge(function_code, sorted(spans))
+
+        return blocks
+
+    def _merge(self, function_code: FunctionCodeKey, spans: list[tuple[int, int]]) -> List[ReadBlock]:
+        blocks: List[ReadBlock] = []
+
+        block_start, block_end = spans[0][0], spans[0][0] + spans[0][1]
+        block_spans = [spans[0]]
+
+        for start, count in spans[1:]:
+            end = start + count
+            if start - block_end <= self.gap_tolerance and max(block_end, end) - block_start <= self.max_registers:
+                block_end = max(block_end, end)
+                block_spans.append((start, count))
+            else:
+                blocks.append(ReadBlock(function_code, block_start, block_end - block_start, block_spans))
+                block_start, block_end = start, end
+                block_spans = [(start, count)]
+
+        blocks.append(ReadBlock(function_code, block_start, block_end - block_start, block_spans))
+        return blocks
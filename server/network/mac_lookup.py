@@ -1,22 +1,57 @@
 from typing import Optional
+import threading
+import time
 import requests
 import logging
+from server.network.oui import OuiDatabase
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 class MacLookupService:
-    """Service to lookup MAC address manufacturer information"""
+    """Service to lookup MAC address manufacturer information.
+
+    The manufacturer is looked up in the offline OUI table, the online lookup is only done for the
+    prefixes that are not in the table. Online results are cached per prefix, failed and empty lookups
+    are retried after NEGATIVE_CACHE_TTL_S."""
     BASE_URL = "https://api.maclookup.app/v2/macs/"
-    
+    TIMEOUT_S = 3
+    NEGATIVE_CACHE_TTL_S = 3600
+
+    online_fallback = True
+    _cache: dict[int, tuple[Optional[str], float]] = {}  # OUI -> (company, time of the lookup)
+    _cache_lock = threading.Lock()
+
     @staticmethod
     def get_manufacturer(mac: str) -> Optional[str]:
         """
         Lookup manufacturer information for a MAC address
         Returns standardized manufacturer name if found, None otherwise
         """
+        oui = OuiDatabase.oui(mac)
+        if oui is None:
+            return None
+
+        company = OuiDatabase.get_instance().lookup(mac)
+        if company is not None or not MacLookupService.online_fallback:
+            return company
+
+        with MacLookupService._cache_lock:
+            cached = MacLookupService._cache.get(oui)
+        if cached is not None:
+            company, looked_up = cached
+            if company is not None or time.monotonic() - looked_up < MacLookupService.NEGATIVE_CACHE_TTL_S:
+                return company
+
+        company = MacLookupService._get_manufacturer_online(mac)
+        with MacLookupService._cache_lock:
+            MacLookupService._cache[oui] = (company, time.monotonic())
+        return company
+
+    @staticmethod
+    def _get_manufacturer_online(mac: str) -> Optional[str]:
         try:
-            response = requests.get(f"{MacLookupService.BASE_URL}{mac}")
+            response = requests.get(f"{MacLookupService.BASE_URL}{mac}", timeout=MacLookupService.TIMEOUT_S)
             if response.status_code == 200:
                 data = response.json()
                 if data.get("success") and data.get("found"):
@@ -26,4 +61,9 @@ class MacLookupService:
                     return company
         except Exception as e:
             logger.debug(f"MAC lookup failed for {mac}: {str(e)}")
-        return None 
\ No newline at end of file
+        return None
+
+    @staticmethod
+    def clear_cache():
+        with MacLookupService._cache_lock:
+            MacLookupService._cache.clear()
@@ -1,5 +1,6 @@
 import time
-from typing import List, Dict, Any, Optional, Union
+from enum import Enum
+from typing import Callable, List, Dict, Any, Optional, Tuple, Union
 import logging
 from zeroconf import ServiceBrowser, Zeroconf, ServiceListener, ServiceInfo
 from threading import Lock
@@ -8,13 +9,12 @@ from threading import Lock
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
-_scan_lock = Lock()
-_is_scanning = False
+_scanning_lock = Lock()
+_scanning = 0  # the number of scans waiting for the browser
 
 
 def is_scanning() -> bool:
-    global _is_scanning
-    return _is_scanning
+    return _scanning > 0
 
 
 class ServiceResult:
@@ -31,68 +31,177 @@ class ServiceResult:
     #     return f"MDNSServiceResult(name='{self.name}', address='{self.address}', port={self.port}, properties={self.properties})"
 
 
-class _Listener(ServiceListener):
-    def __init__(self) -> None:
-        self.services: Dict[str, ServiceResult] = {}
-
-    def remove_service(self, zeroconf: Zeroconf, type: str, name: str) -> None:
-        if name in self.services:
-            del self.services[name]
-
+class MdnsEvent(Enum):
+    ADDED = "added"
+    REMOVED = "removed"
+
+
+MdnsCallback = Callable[[MdnsEvent, ServiceResult], None]
+
+
+class MdnsBrowser(ServiceListener):
+    """Browses for mDNS services for the lifetime of the process and keeps the services found.
+
+    One Zeroconf instance browses all service types asked for so far, starting with KNOWN_SERVICES. The
+    services are kept as long as zeroconf keeps their records, zeroconf removes a service when its records
+    expire (TTL) or the service says goodbye, so lookups return the cached services right away. Callbacks
+    are called when a service is added or removed, e.g. to reconnect a device when it appears again."""
+
+    KNOWN_SERVICES = ["_enphase-envoy._tcp.local.",
+                      "_jemacp1._tcp.local.",
+                      "_hwenergy._tcp._tcp.local.",
+                      "_currently._tcp.local.",
+                      "_sourceful._tcp.local."]
+
+    _instance: Optional['MdnsBrowser'] = None
+    _instance_lock = Lock()
+
+    @classmethod
+    def get_instance(cls) -> 'MdnsBrowser':
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self, zeroconf_factory: Callable[[], Zeroconf] = Zeroconf):
+        self._zeroconf_factory = zeroconf_factory
+        self._zeroconf: Optional[Zeroconf] = None
+        self._lock = Lock()
+        self._browsers: Dict[str, ServiceBrowser] = {}
+        self._browsing_since: Dict[str, float] = {}  # service type -> time.monotonic() when browsing started
+        self._services: Dict[str, ServiceResult] = {}
+        self._callbacks: List[Tuple[MdnsCallback, Optional[List[str]]]] = []
+
+    def browse(self, services: List[str]):
+        """Start browsing for the service types that are not browsed yet, the known services are always browsed"""
+        with self._lock:
+            if self._zeroconf is None:
+                self._zeroconf = self._zeroconf_factory()
+                services = self.KNOWN_SERVICES + [t for t in services if t not in self.KNOWN_SERVICES]
+            for service_type in services:
+                if service_type not in self._browsers:
+                    logger.info("mDNS browsing for %s", service_type)
+                    self._browsing_since[service_type] = time.monotonic()
+                    self._browsers[service_type] = ServiceBrowser(self._zeroconf, service_type, listener=self)
+
+    def browsing_for(self, service_type: str) -> float:
+        """Seconds since browsing for the service type started, 0 if it is not browsed"""
+        since = self._browsing_since.get(service_type)
+        return time.monotonic() - since if since is not None else 0.0
+
+    def services(self, services: Optional[List[str]] = None) -> List[ServiceResult]:
+        """The services found so far, of the given types or of all types"""
+        with self._lock:
+            return [service for service in self._services.values() if _is_of_type(service.name, services)]
+
+    def subscribe(self, callback: MdnsCallback, services: Optional[List[str]] = None, replay: bool = True):
+        """Call back when a service of the given types (or any type) is added or removed. The types are browsed
+        from now on, with replay the services already found are called back as added right away."""
+        if services:
+            self.browse(services)
+        with self._lock:
+            self._callbacks.append((callback, services))
+            known = [service for service in self._services.values() if _is_of_type(service.name, services)]
+        if replay:
+            for service in known:
+                callback(MdnsEvent.ADDED, service)
+
+    def unsubscribe(self, callback: MdnsCallback):
+        with self._lock:
+            self._callbacks = [(c, services) for c, services in self._callbacks if c is not callback]
+
+    def close(self):
+        with self._lock:
+            zeroconf, browsers = self._zeroconf, list(self._browsers.values())
+            self._zeroconf = None
+            self._browsers.clear()
+            self._browsing_since.clear()
+            self._services.clear()
+        for browser in browsers:
+            browser.cancel()
+        if zeroconf is not None:
+            zeroconf.close()
+
+    # ServiceListener, called on the zeroconf browser threads
     def add_service(self, zeroconf: Zeroconf, type: str, name: str) -> None:
         info: Optional[ServiceInfo] = zeroconf.get_service_info(type, name)
         if info:
-            self.services[name] = ServiceResult(
+            service = ServiceResult(
                 name=name,
                 address=info.parsed_addresses()[0] if info.parsed_addresses() else None,
                 port=info.port,
                 properties=info.properties
             )
+            with self._lock:
+                self._services[name] = service
+            logger.info("mDNS service added: %s", service)
+            self._notify(MdnsEvent.ADDED, service)
+
+    def update_service(self, zeroconf: Zeroconf, type: str, name: str) -> None:
+        self.add_service(zeroconf, type, name)
+
+    def remove_service(self, zeroconf: Zeroconf, type: str, name: str) -> None:
+        with self._lock:
+            service = self._services.pop(name, None)
+        if service is not None:
+            logger.info("mDNS service removed: %s", service)
+            self._notify(MdnsEvent.REMOVED, service)
+
+    def _notify(self, event: MdnsEvent, service: ServiceResult):
+        with self._lock:
+            callbacks = [callback for callback, services in self._callbacks if _is_of_type(service.name, services)]
+        for callback in callbacks:
+            try:
+                callback(event, service)
+            except Exception as e:
+                logger.error("Error in mDNS %s callback for %s: %s", event.value, service, e)
+
+
+def _is_of_type(name: str, services: Optional[List[str]]) -> bool:
+    return services is None or any(name.endswith(service_type) for service_type in services)
 
 
 def scan(duration: int = 5, services: Union[str, List[str]] = ["_http._tcp.local."]) -> List[ServiceResult]:
-    """Scan for mDNS services of the specified type(s).
+    """Get the mDNS services of the specified type(s) from the browser.
 
     Args:
-        duration: The duration in seconds to scan for services
+        duration: The time in seconds the services must have been browsed for, a service type that
+                  has been browsed for less time is waited for
         services: A service type string (e.g. "_http._tcp.local.") or list of service types
 
     Returns:
         A list of discovered services
     """
-    global _is_scanning
-
-    if not _scan_lock.acquire(blocking=False):
-        logger.warning("An mDNS scan is already in progress. Skipping this request.")
-        return []
-
-    try:
-        logger.info(f"mDNS scanning for {services} for {duration} seconds")
-        _is_scanning = True
-        zeroconf = Zeroconf()
-        listener = _Listener()
-
-        # Convert string to list if a single service is provided as a string
-        if isinstance(services, str):
-            services_list = [services]
-        else:
-            services_list = services
-
-        browser = ServiceBrowser(zeroconf, services_list, listener)
-        time.sleep(duration)
-        browser.cancel()
-        zeroconf.close()
-        lst: List[ServiceResult] = list(listener.services.values())
-
-        # print each service result as string
-        logger.info(f"mDNS scan found {len(lst)} services:")
-        for service in lst:
-            logger.info(f"  {service}")
-
-        return lst
-    finally:
-        _is_scanning = False
-        _scan_lock.release()
+    global _scanning
+
+    # Convert string to list if a single service is provided as a string
+    if isinstance(services, str):
+        services_list = [services]
+    else:
+        services_list = services
+
+    browser = MdnsBrowser.get_instance()
+    browser.browse(services_list)
+
+    wait = duration - min(browser.browsing_for(service_type) for service_type in services_list)
+    if wait > 0:
+        logger.info(f"mDNS scanning for {services} for {wait:.1f} seconds")
+        with _scanning_lock:
+            _scanning += 1
+        try:
+            time.sleep(wait)
+        finally:
+            with _scanning_lock:
+                _scanning -= 1
+
+    lst: List[ServiceResult] = browser.services(services_list)
+
+    # print each service result as string
+    logger.info(f"mDNS scan found {len(lst)} services:")
+    for service in lst:
+        logger.info(f"  {service}")
+
+    return lst
 
 
 def scan_for_compatible_devices() -> List[ServiceResult]:
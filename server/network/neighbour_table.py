@@ -0,0 +1,90 @@
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class NeighbourTable:
+    """The kernel ARP (neighbour) table indexed by IP and by MAC address.
+
+    The table is read from /proc/net/arp at most once per TTL_S for lookups that hit, a lookup of an IP
+    that is not in the table reads it again as the entry is usually created by the connection just made.
+    Entries without a resolved MAC address are only in the IP index."""
+
+    ARP_PATH = '/proc/net/arp'
+    TTL_S = 5.0
+    INCOMPLETE_MAC = "00:00:00:00:00:00"
+    KEYS = ('ip', 'hw', 'flags', 'mac', 'mask', 'device')  # the columns of /proc/net/arp
+
+    _instance: Optional['NeighbourTable'] = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls) -> 'NeighbourTable':
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self, path: str = ARP_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: list[dict[str, str]] = []
+        self._by_ip: dict[str, dict[str, str]] = {}
+        self._by_mac: dict[str, dict[str, str]] = {}
+        self._refreshed: Optional[float] = None
+
+    def refresh(self) -> list[dict[str, str]]:
+        """Read the table from the system, returns the entries"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()[1:]  # Skip the header line
+        except FileNotFoundError:
+            logger.warning("ARP table file not found. Using empty ARP table.")
+            lines = []
+
+        entries = [dict(zip(self.KEYS, line.split())) for line in lines]
+        by_ip = {entry['ip']: entry for entry in entries if 'ip' in entry}
+        by_mac = {entry['mac'].lower(): entry for entry in entries
+                  if entry.get('mac', self.INCOMPLETE_MAC) != self.INCOMPLETE_MAC}
+
+        with self._lock:
+            self._entries, self._by_ip, self._by_mac = entries, by_ip, by_mac
+            self._refreshed = time.monotonic()
+        return entries
+
+    def invalidate(self):
+        """The next lookup reads the table again"""
+        with self._lock:
+            self._refreshed = None
+
+    def entries(self) -> list[dict[str, str]]:
+        self._refresh_if_stale()
+        return self._entries
+
+    def get_mac(self, ip: str) -> Optional[str]:
+        entry = self._lookup(lambda: self._by_ip, ip)
+        return entry['mac'] if entry is not None else None
+
+    def get_ip(self, mac: str) -> Optional[str]:
+        entry = self._lookup(lambda: self._by_mac, mac.lower())
+        return entry['ip'] if entry is not None else None
+
+    def _lookup(self, index: Callable[[], dict[str, dict[str, str]]], key: str) -> Optional[dict[str, str]]:
+        fresh = self._refresh_if_stale()
+        entry = index().get(key)  # the index is replaced by a refresh
+        if entry is None and not fresh:
+            self.refresh()
+            entry = index().get(key)
+        return entry
+
+    def _refresh_if_stale(self) -> bool:
+        """Read the table if the TTL has passed, True if it was read"""
+        refreshed = self._refreshed
+        if refreshed is None or time.monotonic() - refreshed >= self.TTL_S:
+            self.refresh()
+            return True
+        return False
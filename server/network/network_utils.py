@@ -1,10 +1,11 @@
 from dataclasses import dataclass, asdict
 import logging
-from typing import Optional, Tuple, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable
 import socket
 import ipaddress
 from furl import furl
-from concurrent.futures import ThreadPoolExecutor
+from server.network.neighbour_table import NeighbourTable
+from server.network.port_scanner import PortScanner
 from server.network.mdns.mdns_advertiser import MDNSAdvertiser
 from server.crypto.crypto_state import CryptoState
 from server.network.wifi_manager import WiFiManager
@@ -43,6 +44,7 @@ class NetworkUtils:
     TIMEOUT_KEY = 'timeout'
     DEFAULT_MODBUS_PORTS = "502,1502,6607,8899"
     DEFAULT_TIMEOUT = 5
+    NEIGHBOUR_PROBE_TIMEOUT = 1
 
     INVALID_MAC = "00:00:00:00:00:00"
 
@@ -175,32 +177,23 @@ class NetworkUtils:
     @staticmethod
     def arp_table() -> list[dict[str, str]]:
         """Refresh the ARP table from the system."""
-        try:
-            with open('/proc/net/arp', 'r', encoding='utf-8') as f:
-                lines = f.readlines()[1:]  # Skip the header line
-
-            arp_table = [
-                dict(zip([NetworkUtils.IP_KEY,
-                          NetworkUtils.HW_KEY,
-                          NetworkUtils.FLAGS_KEY,
-                          NetworkUtils.MAC_KEY,
-                          NetworkUtils.MASK_KEY,
-                          NetworkUtils.DEVICE_KEY], line.split()))
-                for line in lines
-            ]
-            return arp_table
-        except FileNotFoundError:
-            logger.warning("ARP table file not found. Using empty ARP table.")
-            return []
+        return NeighbourTable.get_instance().refresh()
 
     @staticmethod
     def get_mac_from_ip(ip: str) -> str:
         """Get the MAC address from the ARP table for a given IP address or URL."""
         ip = NetworkUtils.extract_ip(ip)
-        for entry in NetworkUtils.arp_table():
-            if entry[NetworkUtils.IP_KEY] == ip:
-                return entry[NetworkUtils.MAC_KEY]
-        return NetworkUtils.INVALID_MAC
+        if ip is None:
+            return NetworkUtils.INVALID_MAC
+        mac = NeighbourTable.get_instance().get_mac(ip)
+        return mac if mac is not None else NetworkUtils.INVALID_MAC
+
+    @staticmethod
+    def get_ip_from_mac(mac: str) -> Optional[str]:
+        """Get the IP address from the ARP table for a given MAC address, None if the MAC is not known."""
+        if not mac or mac == NetworkUtils.INVALID_MAC:
+            return None
+        return NeighbourTable.get_instance().get_ip(mac)
 
     @staticmethod
     def parse_ports(ports_str: str) -> list[int]:
@@ -228,21 +221,31 @@ class NetworkUtils:
             return False
 
     @staticmethod
-    def _check_host(ip_port: Tuple[str, int], timeout: float) -> Optional[HostInfo]:
-        """Helper method to check a single IP:port combination"""
-        ip_str, port = ip_port
-        if NetworkUtils.is_port_open(ip_str, port, timeout):
-            return HostInfo(
-                ip=ip_str,
-                port=port,
-                mac=NetworkUtils.get_mac_from_ip(ip_str)
-            )
-        return None
+    def get_local_networks() -> list[ipaddress.IPv4Network]:
+        """The /24 networks of the eth0 and wlan0 interfaces and of the default route."""
+        ips = list(NetworkUtils.get_network_interfaces().values())
+        default_ip = NetworkUtils.get_ip_address()
+        if default_ip != "0.0.0.0":
+            ips.append(default_ip)
+
+        networks = []
+        for ip in ips:
+            try:
+                network = ipaddress.ip_network(f"{ip}/24", strict=False)
+            except ValueError:
+                continue
+            if network not in networks:
+                networks.append(network)
+        return networks
 
     @staticmethod
-    def get_hosts(ports: list[int], timeout: float) -> list[HostInfo]:
+    def get_hosts(ports: list[int], timeout: float, networks: Optional[List[str]] = None,
+                  on_host: Optional[Callable[[HostInfo], None]] = None) -> list[HostInfo]:
         """
-        Scan the local network for modbus devices on the given ports using parallel threading.
+        Scan networks for modbus devices on the given ports, the local networks if no networks (CIDRs) are given.
+
+        The probes run concurrently on an event loop (see PortScanner), timeout is the longest time a probe
+        waits for an answer. on_host is called for each host as soon as it answers.
         """
         try:
             timeout = float(timeout)
@@ -250,45 +253,31 @@ class NetworkUtils:
             logger.warning("Invalid timeout value, using default: %s", NetworkUtils.DEFAULT_TIMEOUT)
             timeout = NetworkUtils.DEFAULT_TIMEOUT
 
-        try:
-            # Get local IP using socket
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            s.connect(("8.8.8.8", 80))
-            local_ip = s.getsockname()[0]
-            s.close()
-        except Exception as e:
-            logger.error("Failed to get IP address: %s", str(e))
-            return []
-
-        if not local_ip:
+        if networks is None:
+            networks = NetworkUtils.get_local_networks()
+        if not networks:
             logger.warning("No active network connection found.")
             return []
 
-        # Refresh the ARP table
-        NetworkUtils.arp_table()
+        logger.info("Scanning %s for modbus devices on ports %s with timeout %s", [str(n) for n in networks], ports, timeout)
 
-        # Extract the network prefix from the local IP address
-        network_prefix = ".".join(local_ip.split(".")[:-1]) + ".0/24"
-        subnet = ipaddress.ip_network(network_prefix)
+        hosts = []
 
-        logger.info("Scanning subnet %s for modbus devices on ports %s with timeout %s", subnet, ports, timeout)
+        def on_open(ip: str, port: int):
+            # the probe has resolved the MAC address so it is in the ARP table
+            host = HostInfo(ip=ip, port=port, mac=NetworkUtils.get_mac_from_ip(ip))
+            hosts.append(host)
+            if on_host is not None:
+                on_host(host)
 
-        # Create list of all IP:port combinations to check
-        ip_port_combinations = [(str(ip), port) for ip in subnet.hosts() for port in ports]
-        logger.info("Checking %s IP:port combinations", len(ip_port_combinations))
-
-        # Use ThreadPoolExecutor for parallel scanning
-        with ThreadPoolExecutor(max_workers=255) as executor:
-            results = executor.map(
-                lambda x: NetworkUtils._check_host(x, timeout),
-                ip_port_combinations
-            )
-
-        # Filter out None results and convert to list
-        hosts = [result for result in results if result is not None]
+        try:
+            PortScanner(timeout).scan_blocking(networks, ports, on_open)
+        except ValueError as e:
+            logger.error("Invalid network to scan: %s", str(e))
+            return []
 
         if not hosts:
-            logger.info("No IPs with given port(s) %s open found in the subnet %s", ports, subnet)
+            logger.info("No IPs with given port(s) %s open found in %s", ports, [str(n) for n in networks])
             return []
 
         logger.info("Found %s hosts: %s", len(hosts), hosts)
@@ -0,0 +1,129 @@
+import csv
+import logging
+import os
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class OuiDatabase:
+    """Offline lookup of the organization a MAC address prefix (OUI, the first 24 bits) is assigned to.
+
+    The table is a text file of sorted "OUI<TAB>organization" lines generated from the IEEE MA-L registry with
+    `python -m server.network.oui oui.csv` (or oui.txt). It is loaded on the first lookup into a sorted array of
+    prefixes and an array of indexes into the organization names, a lookup is a binary search."""
+
+    DEFAULT_PATH = os.path.join(os.path.dirname(__file__), "oui.txt")
+
+    _instance: Optional['OuiDatabase'] = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls) -> 'OuiDatabase':
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._prefixes: Optional[array] = None
+        self._organization_indexes = array('H')
+        self._organizations: list[str] = []
+
+    @staticmethod
+    def oui(mac: str) -> Optional[int]:
+        """The OUI of a MAC address in any of the usual notations, None if it is not a universally administered MAC"""
+        digits = "".join(c for c in mac if c not in ":-.")
+        if len(digits) != 12:
+            return None
+        try:
+            prefix = int(digits[:6], 16)
+            if int(digits, 16) == 0:  # no MAC address
+                return None
+        except ValueError:
+            return None
+        if prefix & 0x020000:  # locally administered, e.g. a randomized MAC
+            return None
+        return prefix
+
+    def lookup(self, mac: str) -> Optional[str]:
+        prefix = self.oui(mac)
+        if prefix is None:
+            return None
+        prefixes = self._load()
+        i = bisect_left(prefixes, prefix)
+        if i < len(prefixes) and prefixes[i] == prefix:
+            return self._organizations[self._organization_indexes[i]]
+        return None
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def _load(self) -> array:
+        with self._lock:
+            if self._prefixes is None:
+                self._prefixes = self._read()
+            return self._prefixes
+
+    def _read(self) -> array:
+        prefixes = array('I')
+        names: dict[str, int] = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip() or line.startswith('#'):
+                        continue
+                    oui, organization = line.rstrip('\n').split('\t', 1)
+                    prefixes.append(int(oui, 16))
+                    self._organization_indexes.append(names.setdefault(organization, len(names)))
+        except FileNotFoundError:
+            logger.warning("OUI table %s not found, MAC addresses are only looked up online", self.path)
+        except ValueError as e:
+            logger.error("Invalid OUI table %s: %s", self.path, e)
+            prefixes = array('I')
+            self._organization_indexes = array('H')
+            names = {}
+        self._organizations = list(names)
+        logger.debug("Loaded %d OUIs of %d organizations", len(prefixes), len(names))
+        return prefixes
+
+    @staticmethod
+    def write_table(entries: Iterable[tuple[int, str]], path: str):
+        """Write a table of (OUI, organization), sorted by OUI"""
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("# OUI<TAB>organization, sorted by OUI. Generated from the IEEE MA-L registry with python -m server.network.oui\n")
+            for oui, organization in sorted(dict(entries).items()):
+                f.write("%06X\t%s\n" % (oui, " ".join(organization.split())))
+
+    @staticmethod
+    def read_ieee_txt(path: str) -> list[tuple[int, str]]:
+        """The entries of the IEEE registry text file (https://standards-oui.ieee.org/oui/oui.txt)"""
+        entries = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                assignment, separator, organization = line.partition("(base 16)")
+                if separator and len(assignment.strip()) == 6 and organization.strip():
+                    entries.append((int(assignment.strip(), 16), organization.strip()))
+        return entries
+
+    @staticmethod
+    def read_ieee_csv(path: str) -> list[tuple[int, str]]:
+        """The entries of the IEEE registry CSV (https://standards-oui.ieee.org/oui/oui.csv)"""
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            return [(int(row["Assignment"], 16), row["Organization Name"])
+                    for row in csv.DictReader(f) if len(row.get("Assignment", "")) == 6]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: python -m server.network.oui <IEEE oui.csv or oui.txt> [output table]")
+        sys.exit(1)
+    read = OuiDatabase.read_ieee_csv if sys.argv[1].endswith(".csv") else OuiDatabase.read_ieee_txt
+    OuiDatabase.write_table(read(sys.argv[1]), sys.argv[2] if len(sys.argv) > 2 else OuiDatabase.DEFAULT_PATH)
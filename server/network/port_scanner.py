@@ -0,0 +1,185 @@
+import asyncio
+import contextlib
+import ipaddress
+import logging
+import socket
+import struct
+import time
+from typing import AsyncIterator, Callable, Iterable, Iterator, Optional, Union
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+Network = Union[str, ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+class RttEstimator:
+    """Smoothed round trip time of the answered probes (RFC 6298), the probe timeout follows it.
+
+    Both an accepted and a refused connection are answers from a live host, so both are samples.
+    Until the first answer the timeout is INITIAL_TIMEOUT_S, it is always kept between min_timeout
+    and max_timeout."""
+
+    INITIAL_TIMEOUT_S = 1.0
+    ALPHA = 1 / 8
+    BETA = 1 / 4
+    K = 4
+
+    def __init__(self, min_timeout: float, max_timeout: float):
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.srtt: Optional[float] = None
+        self.rttvar = 0.0
+        self.samples = 0
+
+    def add(self, rtt: float):
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - self.BETA) * self.rttvar + self.BETA * abs(self.srtt - rtt)
+            self.srtt = (1 - self.ALPHA) * self.srtt + self.ALPHA * rtt
+        self.samples += 1
+
+    @property
+    def timeout(self) -> float:
+        if self.srtt is None:
+            timeout = self.INITIAL_TIMEOUT_S
+        else:
+            timeout = self.srtt + self.K * self.rttvar
+        return min(self.max_timeout, max(self.min_timeout, timeout))
+
+
+class PortScanner:
+    """Scans networks for open TCP ports with non-blocking connects on an asyncio event loop.
+
+    At most max_concurrency probes (and sockets) are in flight at once. A probe of a host that has answered
+    is given up when the timeout of the RttEstimator of that host has passed, the timeout is checked again
+    while waiting so the probes already in flight are cut short as soon as the host has answered. Hosts that
+    have not answered yet get at least first_contact_timeout, as the first answer of a host includes the ARP
+    resolution and slow WiFi dataloggers take longer than the wired hosts that answer first. The connections
+    are reset instead of closed so that no connection is left in TIME_WAIT."""
+
+    DEFAULT_MAX_CONCURRENCY = 512
+    DEFAULT_MIN_TIMEOUT_S = 0.5
+    DEFAULT_FIRST_CONTACT_TIMEOUT_S = 2.0
+    CHECK_INTERVAL_S = 0.05
+
+    def __init__(self, max_timeout: float, min_timeout: float = DEFAULT_MIN_TIMEOUT_S,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY, first_contact_timeout: float = DEFAULT_FIRST_CONTACT_TIMEOUT_S):
+        self.max_timeout = max_timeout
+        self.min_timeout = min(min_timeout, max_timeout)
+        self.first_contact_timeout = min(max(first_contact_timeout, self.min_timeout), max_timeout)
+        self.max_concurrency = max_concurrency
+
+    @staticmethod
+    def targets(networks: Iterable[Network], ports: list[int]) -> Iterator[tuple[str, int]]:
+        """All IP:port pairs of the networks, hosts are not repeated when networks overlap"""
+        seen = set()
+        for network in networks:
+            network = ipaddress.ip_network(network, strict=False)
+            hosts = [network.network_address] if network.num_addresses == 1 else network.hosts()
+            for ip in hosts:
+                if ip in seen:
+                    continue
+                seen.add(ip)
+                for port in ports:
+                    yield str(ip), port
+
+    async def scan(self, networks: Iterable[Network], ports: list[int]) -> AsyncIterator[tuple[str, int]]:
+        """Yields the open IP:port pairs as the hosts answer"""
+        targets = self.targets(networks, ports)
+        rtt = RttEstimator(self.min_timeout, self.max_timeout)  # of all hosts, for the hosts that have not answered
+        host_rtts: dict[str, RttEstimator] = {}
+        found: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        async def worker():
+            try:
+                for ip, port in targets:  # shared, each target is probed by one worker
+                    if await self._probe(ip, port, rtt, host_rtts):
+                        found.put_nowait((ip, port))
+            finally:
+                found.put_nowait(done)
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(self.max_concurrency)]
+        try:
+            running = len(workers)
+            while running > 0:
+                result = await found.get()
+                if result is done:
+                    running -= 1
+                else:
+                    yield result
+            for task in workers:
+                task.result()  # raises unexpected errors of the workers
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        logger.debug("Scan done, round trip time %s s over %d answers of %d hosts", rtt.srtt, rtt.samples, len(host_rtts))
+
+    def scan_blocking(self, networks: Iterable[Network], ports: list[int],
+                      on_open: Optional[Callable[[str, int], None]] = None) -> list[tuple[str, int]]:
+        """Runs a scan on a new event loop in the calling thread, on_open is called for each open port as it is found"""
+        async def collect():
+            results = []
+            async for ip, port in self.scan(networks, ports):
+                results.append((ip, port))
+                if on_open is not None:
+                    on_open(ip, port)
+            return results
+
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(collect())
+        finally:
+            loop.close()
+
+    def _timeout(self, ip: str, rtt: RttEstimator, host_rtts: dict[str, RttEstimator]) -> float:
+        host_rtt = host_rtts.get(ip)
+        if host_rtt is not None:
+            return host_rtt.timeout
+        return max(self.first_contact_timeout, rtt.timeout)
+
+    def _answered(self, ip: str, elapsed: float, rtt: RttEstimator, host_rtts: dict[str, RttEstimator]):
+        rtt.add(elapsed)
+        host_rtts.setdefault(ip, RttEstimator(self.min_timeout, self.max_timeout)).add(elapsed)
+
+    async def _probe(self, ip: str, port: int, rtt: RttEstimator, host_rtts: dict[str, RttEstimator]) -> bool:
+        loop = asyncio.get_running_loop()
+        family = socket.AF_INET6 if ":" in ip else socket.AF_INET
+        try:
+            sock = socket.socket(family, socket.SOCK_STREAM)
+        except OSError as e:
+            logger.warning("Could not open a socket to probe %s:%s: %s", ip, port, e)
+            return False
+
+        try:
+            sock.setblocking(False)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+            start = time.monotonic()
+            connect = asyncio.ensure_future(loop.sock_connect(sock, (ip, port)))
+            while not connect.done():
+                remaining = start + self._timeout(ip, rtt, host_rtts) - time.monotonic()
+                if remaining <= 0:
+                    break
+                await asyncio.wait({connect}, timeout=min(remaining, self.CHECK_INTERVAL_S))
+
+            if not connect.done():
+                connect.cancel()
+                with contextlib.suppress(asyncio.CancelledError, OSError):
+                    await connect  # the socket is unregistered from the loop before it is closed
+                return False
+
+            try:
+                connect.result()
+            except ConnectionRefusedError:
+                self._answered(ip, time.monotonic() - start, rtt, host_rtts)
+                return False
+            except OSError:
+                return False
+            self._answered(ip, time.monotonic() - start, rtt, host_rtts)
+            return True
+        finally:
+            sock.close()
@@ -0,0 +1,169 @@
+import json
+import sqlite3
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Union
+from server.tasks.harvest_payload import cbor_decode, cbor_encode
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class QueuedBarn:
+    """A barn that could not be uploaded, together with where it should go"""
+
+    def __init__(self, id: int, endpoint: str, headers: Dict[str, Any], barn: Dict[int, Any]):
+        self.id = id
+        self.endpoint = endpoint
+        self.headers = headers
+        self.barn = barn
+
+
+class HarvestQueue:
+    """Disk backed store and forward queue for harvest barns that failed to upload.
+
+    Barns are buffered in memory and written in one transaction when the write buffer is full or old
+    enough, so a flash card is not written on every harvest. The queue is bounded in bytes, when it
+    is full the oldest barns are evicted. Barns are only deleted when they are acknowledged after a
+    successful upload, so a crash can at worst cause a barn to be uploaded twice.
+
+    Barns are stored as CBOR so that integer timestamps and register addresses come back as integers, the
+    headers are stored as JSON."""
+
+    DEFAULT_DB_PATH = "/data/srcful/harvest_queue.db"
+    DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+    DEFAULT_FLUSH_INTERVAL_MS = 60_000
+    DEFAULT_FLUSH_COUNT = 32
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 flush_interval_ms: int = DEFAULT_FLUSH_INTERVAL_MS,
+                 flush_count: int = DEFAULT_FLUSH_COUNT):
+        self.max_bytes = max_bytes
+        self.flush_interval_ms = flush_interval_ms
+        self.flush_count = flush_count
+        self._lock = threading.Lock()
+        self._pending: List[tuple] = []
+        self._pending_since_ms: Optional[int] = None
+        self._conn = self._open(db_path)
+        self._size_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM harvest_queue").fetchone()[0]
+
+    def _open(self, db_path: str) -> sqlite3.Connection:
+        try:
+            conn = self._init_db(db_path)
+            self.db_path = db_path
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open harvest queue at {db_path}, queued barns will not survive a restart: {e}")
+            conn = self._init_db(":memory:")
+            self.db_path = ":memory:"
+        return conn
+
+    @staticmethod
+    def _init_db(db_path: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS harvest_queue (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                endpoint TEXT NOT NULL,
+                headers TEXT NOT NULL,
+                barn BLOB NOT NULL,
+                size INTEGER NOT NULL
+            )
+        ''')
+        conn.commit()
+        return conn
+
+    @staticmethod
+    def _time_ms() -> int:
+        return time.monotonic_ns() // 1_000_000
+
+    def put(self, endpoint: str, headers: Dict[str, Any], barn: Dict[int, Any]):
+        """Queue a barn for later upload, it is written to disk with the next flush"""
+        barn_cbor = cbor_encode(barn)
+        with self._lock:
+            self._pending.append((endpoint, json.dumps(headers, sort_keys=True), barn_cbor, len(barn_cbor)))
+            if self._pending_since_ms is None:
+                self._pending_since_ms = self._time_ms()
+
+            if len(self._pending) >= self.flush_count or self._time_ms() - self._pending_since_ms >= self.flush_interval_ms:
+                self._flush()
+
+    def flush(self):
+        """Write all buffered barns to disk"""
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        try:
+            with self._conn:
+                self._conn.executemany("INSERT INTO harvest_queue (endpoint, headers, barn, size) VALUES (?, ?, ?, ?)", self._pending)
+                self._size_bytes += sum(p[3] for p in self._pending)
+                self._evict()
+            logger.debug("Flushed %d barns to the harvest queue", len(self._pending))
+        except sqlite3.Error as e:
+            logger.error(f"Failed to flush the harvest queue, {len(self._pending)} barns are lost: {e}")
+            self._size_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM harvest_queue").fetchone()[0]
+        self._pending = []
+        self._pending_since_ms = None
+
+    def _evict(self):
+        while self._size_bytes > self.max_bytes:
+            rows = self._conn.execute("SELECT id, size FROM harvest_queue ORDER BY id LIMIT 64").fetchall()
+            if not rows:
+                self._size_bytes = 0
+                return
+            evict_ids = []
+            for row_id, size in rows:
+                if self._size_bytes <= self.max_bytes:
+                    break
+                evict_ids.append((row_id,))
+                self._size_bytes -= size
+            self._conn.executemany("DELETE FROM harvest_queue WHERE id = ?", evict_ids)
+            logger.warning("Harvest queue is full, evicted the %d oldest barns", len(evict_ids))
+
+    def peek_batch(self, max_barns: int) -> List[QueuedBarn]:
+        """Returns the oldest queued barns that go to the same endpoint with the same headers"""
+        with self._lock:
+            self._flush()
+            first = self._conn.execute("SELECT endpoint, headers FROM harvest_queue ORDER BY id LIMIT 1").fetchone()
+            if first is None:
+                return []
+            rows = self._conn.execute("SELECT id, endpoint, headers, barn FROM harvest_queue WHERE endpoint = ? AND headers = ? ORDER BY id LIMIT ?",
+                                      (first[0], first[1], max_barns)).fetchall()
+
+        return [QueuedBarn(row_id, endpoint, json.loads(headers), self._decode_barn(barn)) for row_id, endpoint, headers, barn in rows]
+
+    @staticmethod
+    def _decode_barn(barn: Union[bytes, str]) -> Dict[int, Any]:
+        if isinstance(barn, str):
+            return json.loads(barn)  # queued as JSON by an earlier version
+        return cbor_decode(barn)
+
+    def ack(self, barns: List[QueuedBarn]):
+        """Remove barns that have been uploaded"""
+        ids = [b.id for b in barns]
+        if not ids:
+            return
+        with self._lock:
+            try:
+                with self._conn:
+                    placeholders = ",".join("?" * len(ids))
+                    size = self._conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM harvest_queue WHERE id IN ({placeholders})", ids).fetchone()[0]
+                    self._conn.execute(f"DELETE FROM harvest_queue WHERE id IN ({placeholders})", ids)
+                    self._size_bytes -= size
+            except sqlite3.Error as e:
+                logger.error(f"Failed to acknowledge barns in the harvest queue: {e}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending) + self._conn.execute("SELECT COUNT(*) FROM harvest_queue").fetchone()[0]
+
+    @property
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._size_bytes + sum(p[3] for p in self._pending)
@@ -0,0 +1,82 @@
+from typing import Optional
+
+# Value of the "enc" header of a delta encoded barn
+DELTA_ENCODING = "delta"
+KEYFRAME_KEY = "kf"
+DELTA_KEY = "d"
+
+
+class BarnDeltaEncoder:
+    """Delta encodes the register harvests of a device across the barns it sends.
+
+    The first harvest, every keyframe_interval-th harvest after it, the first harvest keyframe_age_ms after the keyframe
+    and every harvest where the set of registers changes (e.g. verbose reads) is sent as is and becomes the keyframe. The
+    harvests in between are sent as {"kf": keyframe timestamp, "d": {register: value}} with only the registers that differ
+    from the keyframe. A delta refers to its keyframe by timestamp, usually in an earlier barn as DeviceTask sends a barn
+    per harvest. A lost or evicted barn only leaves the deltas up to the next keyframe undecodable, at most
+    keyframe_interval harvests or keyframe_age_ms for devices with a long harvest interval, see decode_barn.
+
+    deadbands are (registers, deadband) pairs in raw register units, a register group is only sent when the unsigned value
+    of its registers (big endian word order) is more than deadband away from the keyframe. Other registers are sent on any change."""
+
+    def __init__(self, keyframe_interval: int = 30, deadbands: Optional[list[tuple[tuple[int, ...], int]]] = None,
+                 keyframe_age_ms: int = 60000):
+        self.keyframe_interval = keyframe_interval
+        self.keyframe_age_ms = keyframe_age_ms
+        self._groups: dict[int, tuple[tuple[int, ...], int]] = {}  # first register of a group -> group
+        self._grouped: set[int] = set()
+        for registers, deadband in deadbands or []:
+            if deadband > 0 and len(registers) > 0:
+                self._groups[registers[0]] = (tuple(registers), deadband)
+                self._grouped.update(registers)
+
+        self._keyframe: Optional[dict] = None
+        self._keyframe_time: Optional[int] = None
+        self._samples_since_keyframe = 0
+
+    def encode(self, barn: dict[int, dict]) -> dict[int, dict]:
+        return {timestamp: self._encode_harvest(timestamp, barn[timestamp]) for timestamp in sorted(barn)}
+
+    def _encode_harvest(self, timestamp: int, harvest: dict) -> dict:
+        if (self._keyframe is None or self._samples_since_keyframe >= self.keyframe_interval
+                or timestamp - self._keyframe_time >= self.keyframe_age_ms or harvest.keys() != self._keyframe.keys()):
+            self._keyframe = dict(harvest)
+            self._keyframe_time = timestamp
+            self._samples_since_keyframe = 1
+            return harvest
+
+        self._samples_since_keyframe += 1
+        keyframe = self._keyframe
+        changed = {register: value for register, value in harvest.items() if register not in self._grouped and value != keyframe[register]}
+        for registers, deadband in self._groups.values():
+            if any(register not in harvest for register in registers):
+                continue
+            if abs(_unsigned(harvest, registers) - _unsigned(keyframe, registers)) > deadband:
+                changed.update((register, harvest[register]) for register in registers)
+
+        return {KEYFRAME_KEY: self._keyframe_time, DELTA_KEY: changed}
+
+
+def _unsigned(harvest: dict, registers: tuple[int, ...]) -> int:
+    value = 0
+    for register in registers:
+        value = (value << 16) | (harvest[register] & 0xFFFF)
+    return value
+
+
+def decode_barn(barn: dict, keyframes: Optional[dict] = None) -> dict:
+    """Reconstructs the full harvests of a delta encoded barn. The keyframes of the barn are added to keyframes by
+    timestamp if it is given, pass the same dict for the barns of a device to decode deltas of earlier keyframes.
+    Deltas with an unknown keyframe, e.g. one of a lost barn, are left out."""
+    keyframes = {} if keyframes is None else keyframes
+    ret = {}
+    for timestamp in sorted(barn, key=int):
+        entry = barn[timestamp]
+        if KEYFRAME_KEY in entry and DELTA_KEY in entry:
+            keyframe = keyframes.get(entry[KEYFRAME_KEY])
+            if keyframe is not None:
+                ret[timestamp] = {**keyframe, **entry[DELTA_KEY]}
+        else:
+            keyframes[int(timestamp)] = entry
+            ret[timestamp] = entry
+    return ret
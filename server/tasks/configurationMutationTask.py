@@ -3,6 +3,7 @@ from typing import Dict, Any
 from server.app.blackboard import BlackBoard
 from server.tasks.srcfulAPICallTask import SrcfulAPICallTask
 import server.crypto.crypto as crypto
+from server.crypto.signing_service import SigningPriority, SigningService
 
 
 logger = logging.getLogger(__name__)
@@ -18,13 +19,14 @@ class ConfigurationMutationTask(SrcfulAPICallTask):
         self.post_url = "https://api.srcful.dev/"
 
     def _build_jwt(self):
+        return SigningService.get_instance().submit(self._sign, SigningPriority.STATE).result(SigningService.TIMEOUT_S)
+
+    def _sign(self, chip: crypto.Chip) -> str:
         message = crypto.jwtlify(self.data)
-        with crypto.Chip() as chip:
-            header = self._build_header(chip.get_serial_number().hex())
-            message = header + "." + message
-            signature = chip.get_signature(message)
-            message = message + "." + crypto.base64_url_encode(signature).decode("utf-8")
-            return message
+        header = self._build_header(chip.get_serial_number().hex())
+        message = header + "." + message
+        signature = chip.get_signature(message)
+        return message + "." + crypto.base64_url_encode(signature).decode("utf-8")
 
     def _build_header(self, serial_number):
         return crypto.jwtlify({
@@ -1,12 +1,16 @@
 
+import json
 import logging
-from typing import Any, List, Union
-from server.tasks.harvest import Harvest
+from array import array
+from collections.abc import Mapping
+from typing import Iterator, List, Optional, Union
+from server.tasks.harvest import AsyncHarvest, Harvest
 from server.tasks.itask import ITask
 from server.tasks.openDevicePerpetualTask import DevicePerpetualTask
 from server.app.blackboard import BlackBoard
 from .task import Task
 from .harvestTransport import ITransportFactory
+from .barn_delta import BarnDeltaEncoder, DELTA_ENCODING
 from server.devices.ICom import DeviceMode, ICom, HarvestDataType
 from server.devices.supported_devices.data_models import DERData, PVData, BatteryData, MeterData, Value
 
@@ -15,6 +19,76 @@ logger = logging.getLogger(__name__)
 logger.setLevel(level=logging.DEBUG)
 
 
+class RegisterIndex:
+    '''The register addresses of a harvest in the order their values are stored in a CompactBarn sample'''
+
+    def __init__(self, addresses: tuple[int, ...]):
+        self.addresses = addresses
+        self.json_keys = tuple('"%d": ' % address for address in addresses)  # serialized once, used for every sample
+
+    def matches(self, harvest: dict) -> bool:
+        return len(harvest) == len(self.addresses) and tuple(harvest) == self.addresses
+
+
+class CompactBarn(Mapping):
+    '''A barn of register harvests stored as one array('H') slab per sample that share the register index of the device.
+
+    A register harvest as a dict costs an int object and a dict entry per register, the slab costs two bytes per register.
+    Samples that are not 16 bit register values keyed by address (e.g. P1 telegrams or changing test data) are kept as they are.
+    Reading a sample builds its dict, to_json serializes the barn straight from the slabs.'''
+
+    def __init__(self, index: Optional[RegisterIndex] = None):
+        self.index = index  # the index of the last register sample, passed on to the next barn of the device
+        self._samples: dict[int, Union[tuple[RegisterIndex, array], dict]] = {}
+
+    def add(self, timestamp: int, harvest: dict):
+        self._samples[timestamp] = self._compact(harvest)
+
+    def _compact(self, harvest: dict) -> Union[tuple[RegisterIndex, array], dict]:
+        if self.index is None or not self.index.matches(harvest):
+            addresses = tuple(harvest)
+            if not all(type(address) is int for address in addresses):
+                return harvest
+            index = RegisterIndex(addresses)
+        else:
+            index = self.index
+
+        try:
+            slab = array('H', harvest.values())
+        except (TypeError, OverflowError):
+            return harvest
+        self.index = index
+        return index, slab
+
+    def __getitem__(self, timestamp: int) -> dict:
+        sample = self._samples[timestamp]
+        if isinstance(sample, dict):
+            return sample
+        index, slab = sample
+        return dict(zip(index.addresses, slab))
+
+    def __contains__(self, timestamp) -> bool:
+        return timestamp in self._samples
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._samples)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def to_json(self) -> str:
+        '''The same JSON as json.dumps of the barn as a dict'''
+        parts = []
+        for timestamp, sample in self._samples.items():
+            if isinstance(sample, dict):
+                body = json.dumps(sample)
+            else:
+                index, slab = sample
+                body = "{" + ", ".join(map(str.__add__, index.json_keys, map(str, slab))) + "}"
+            parts.append('"%d": %s' % (timestamp, body))
+        return "{" + ", ".join(parts) + "}"
+
+
 class DeviceTask(Task):
     '''Encapsulates basic device state behavior reading or controlling and the transport of harvest data'''
 
@@ -28,9 +102,10 @@ class DeviceTask(Task):
         self.packet_count = 0
         self.data_points_count = 0
         self.last_device_state = self.device.get_device_mode()
-        self.barn: dict[int, dict[str, Any]] = {}
+        self.barn = CompactBarn()
+        self.barn_encoder: Optional[BarnDeltaEncoder] = None  # created when delta encoding is enabled in the settings
 
-        self.harvester = Harvest()
+        self.harvester = AsyncHarvest() if device.supports_async_harvest() is True else Harvest()
         # self.controller = Controller(event_time, bb, device)
         self.last_reading_ms = bb.time_ms()
 
@@ -80,13 +155,14 @@ class DeviceTask(Task):
         return []
     
     def _handle_harvest(self, event_time: int):
-        start_time = self.bb.time_ms()
         next_event_time, harvest = self.harvester.harvest(event_time, self.device, self.bb)
-        end_time = self.bb.time_ms()
+        # an async harvester returns the read it started on a previous execution
+        start_time = self.harvester.read_start_ms
+        end_time = start_time + self.harvester.read_duration_ms
 
         if harvest:
             self.harvest_count += 1
-            self.barn[self.bb.time_ms()] = harvest
+            self.barn.add(end_time, harvest)
             
             # Publish harvest data to MQTT (non-blocking)
             try:
@@ -177,6 +253,16 @@ class DeviceTask(Task):
         headers["model"] = device.get_name().lower()
         return headers
 
+    def _encode_barn(self, barn: dict) -> tuple[dict, Optional[str]]:
+        """Delta encodes register harvests if enabled in the settings, returns the barn to send and its encoding"""
+        if not self.bb.settings.harvest.delta_encoding or self.device.get_harvest_data_type() != HarvestDataType.MODBUS_REGISTERS:
+            self.barn_encoder = None  # the next barn starts with a keyframe if encoding is enabled again
+            return barn, None
+
+        if self.barn_encoder is None:
+            self.barn_encoder = BarnDeltaEncoder(deadbands=self.device.get_barn_deadbands())
+        return self.barn_encoder.encode(barn), DELTA_ENCODING
+
     def _create_transport(self, event_time: int, endpoints: list[str], force_transport: bool = False) -> List[ITask]:
         ret: List[ITask] = []
 
@@ -186,16 +272,15 @@ class DeviceTask(Task):
 
         if (len(self.barn) > 0 and force_transport):
             logger.info("Filling the barn took %s ms for [%s] to endpoint %s", self.total_harvest_time_ms, self.device.get_SN(), endpoints)
-            for endpoint in endpoints:
-
-                headers = self._create_transport_headers(self.device)
-
-                transport = self.transport_factory(event_time + 20, self.bb, self.barn, headers)
-                transport.post_url = endpoint
-                ret.append(transport)
+            barn, encoding = self._encode_barn(self.barn)
+            headers = self._create_transport_headers(self.device)
+            if encoding:
+                headers["enc"] = encoding
 
-                self.packet_count += 1
-                self.data_points_count += len(self.barn)
+            # the barn is signed once for all endpoints
+            ret.extend(self.transport_factory.fan_out(event_time + 20, self.bb, barn, headers, endpoints))
+            self.packet_count += len(endpoints)
+            self.data_points_count += len(self.barn) * len(endpoints)
 
             if self.bb.time_ms() % 60000 == 0:
                 logger.info("A total of [%s] data points were harvested from device [%s] in the last minute and [%s] packets were sent", self.data_points_count, self.device.get_SN(), self.packet_count)
@@ -203,7 +288,7 @@ class DeviceTask(Task):
                 self.data_points_count = 0
 
             self.last_transport_time = self.bb.time_ms()
-            self.barn = {}
+            self.barn = CompactBarn(self.barn.index)
             self.total_harvest_time_ms = 0
 
         return ret
\ No newline at end of file
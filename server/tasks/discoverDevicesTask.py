@@ -1,5 +1,6 @@
 import logging
 from .task import Task
+from .itask import Lane
 from server.app.blackboard import BlackBoard
 from server.network.network_utils import NetworkUtils
 from server.tasks.discover_mdns_devices_task import DiscoverMdnsDevicesTask
@@ -17,6 +18,8 @@ class DiscoverDevicesTask(Task):
     Discover modbus and P1 devices on the network and cache the results in the blackboard.
     """
 
+    lane = Lane.DISCOVERY
+
     def __init__(self, event_time: int, bb: BlackBoard):
         super().__init__(event_time, bb)
 
@@ -1,5 +1,6 @@
 from server.network.network_utils import NetworkUtils
 from server.tasks.task import Task
+from server.tasks.itask import Lane
 from server.app.blackboard import BlackBoard
 from server.network.network_utils import HostInfo
 from typing import List
@@ -14,6 +15,8 @@ class DiscoverHostsTask(Task):
     Discover hosts on the network and cache the results in the blackboard.
     """
 
+    lane = Lane.DISCOVERY
+
     def __init__(self, event_time: int, bb: BlackBoard):
         super().__init__(event_time, bb)
 
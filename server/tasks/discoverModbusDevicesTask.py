@@ -1,5 +1,6 @@
 import logging
 from .task import Task
+from .itask import Lane
 from server.app.blackboard import BlackBoard
 from server.network.network_utils import NetworkUtils
 from server.devices.inverters.modbus_device_scanner import scan_for_modbus_devices
@@ -15,6 +16,8 @@ class DiscoverModbusDevicesTask(Task):
     Discover modbus and P1 devices on the network and cache the results in the blackboard.
     """
 
+    lane = Lane.DISCOVERY
+
     def __init__(self, event_time: int, bb: BlackBoard):
         super().__init__(event_time, bb)
 
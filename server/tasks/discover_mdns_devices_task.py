@@ -2,6 +2,7 @@ from server.network.mdns.mdns import scan_for_compatible_devices, ServiceResult
 from server.devices.ICom import ICom
 from server.devices.inverters.enphase import Enphase
 from server.tasks.task import Task
+from server.tasks.itask import Lane
 from server.app.blackboard import BlackBoard
 from typing import List
 import logging
@@ -16,6 +17,8 @@ class DiscoverMdnsDevicesTask(Task):
     Discover hosts on the network and cache the results in the blackboard.
     """
 
+    lane = Lane.DISCOVERY
+
     def __init__(self, event_time: int, bb: BlackBoard):
         super().__init__(event_time, bb)
 
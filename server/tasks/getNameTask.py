@@ -2,6 +2,7 @@ import requests
 
 import server.crypto.crypto as crypto
 from server.app.blackboard import BlackBoard
+from server.crypto.signing_service import SigningService, SigningPriority
 
 from .srcfulAPICallTask import SrcfulAPICallTask
 
@@ -16,9 +17,8 @@ class GetNameTask(SrcfulAPICallTask):
 
     def _json(self):
         try:
-            with crypto.Chip() as chip:
-                serial = chip.get_serial_number().hex()
-        except crypto.ChipError:
+            serial = SigningService.get_instance().get_serial_number(SigningPriority.REQUEST).result(SigningService.TIMEOUT_S).hex()
+        except (crypto.ChipError, TimeoutError):
             serial = "0000000000000000"
 
         q = """{
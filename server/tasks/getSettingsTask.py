@@ -6,6 +6,7 @@ import requests
 from .itask import ITask
 import server.crypto.crypto as crypto
 from server.app.blackboard import BlackBoard
+from server.crypto.signing_service import SigningService, SigningPriority
 from .srcfulAPICallTask import SrcfulAPICallTask
 from server.app.settings import ChangeSource
 from server.tasks.saveSettingsTask import SaveSettingsTask
@@ -83,9 +84,8 @@ class GetSettingsTask(SrcfulAPICallTask):
         logger.info("GetSettingsTask created, will request settings from %s", self.post_url)
 
     def _json(self):
-        with crypto.Chip() as chip:
-            query = create_query_json(chip, self.bb.settings.SETTINGS_SUBKEY)
-        return query
+        subkey = self.bb.settings.SETTINGS_SUBKEY
+        return SigningService.get_instance().submit(lambda chip: create_query_json(chip, subkey), SigningPriority.STATE).result(SigningService.TIMEOUT_S)
 
     def _on_error(self, reply: requests.Response) -> Union[int, Tuple[int, Union[List[ITask], ITask, None]]]:
         return 0
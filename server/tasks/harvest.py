@@ -1,4 +1,6 @@
 import logging
+from concurrent.futures import Future
+from typing import Optional
 from server.app.blackboard import BlackBoard
 from server.devices.ICom import ICom
 
@@ -11,6 +13,8 @@ class Harvest:
         self.backoff_time = None  # Will be set in the harvest method from the device
         self.harvest_count = 0
         self.total_harvest_time_ms = 0
+        self.read_start_ms = 0  # start and duration of the read of the last returned harvest
+        self.read_duration_ms = 0
 
     def harvest(self, event_time:int, device: ICom, bb: BlackBoard) -> tuple[int, dict]:
 
@@ -18,9 +22,11 @@ class Harvest:
         elapsed_time_ms = 0
 
         try:
+            self.read_start_ms = bb.time_ms()
             harvest = device.read_harvest_data(force_verbose=self.harvest_count % 10 == 0)
             self.harvest_count += 1
             end_time = bb.time_ms()
+            self.read_duration_ms = end_time - self.read_start_ms
 
             elapsed_time_ms = end_time - start_time
             # Initialize backoff_time on first harvest if not set
@@ -43,4 +49,57 @@ class Harvest:
         else:
             next_time = bb.time_ms() + 100  # Start next harvest immediately if we're behind schedule
 
-        return next_time, harvest    
\ No newline at end of file
+        return next_time, harvest
+
+
+class AsyncHarvest(Harvest):
+    """Harvest of a device that reads in the background, e.g. on the async Modbus engine.
+    Each call collects the read started by the previous call and starts the next one, so the task never waits on the device."""
+
+    POLL_INTERVAL_MS = 20
+
+    def __init__(self):
+        super().__init__()
+        self.pending: Optional[Future] = None
+        self.pending_start_ms = 0
+        self.pending_end_ms: Optional[int] = None
+
+    def harvest(self, event_time: int, device: ICom, bb: BlackBoard) -> tuple[int, Optional[dict]]:
+        if self.backoff_time is None:
+            self.backoff_time = device.DEFAULT_HARVEST_INTERVAL_MS
+
+        harvest = None
+        try:
+            if self.pending is not None:
+                if not self.pending.done():
+                    # the device is slower than the harvest interval, collect the read as soon as it is done
+                    return bb.time_ms() + self.POLL_INTERVAL_MS, None
+
+                pending, self.pending = self.pending, None
+                harvest = pending.result()
+                self.read_start_ms = self.pending_start_ms
+                self.read_duration_ms = (self.pending_end_ms or bb.time_ms()) - self.pending_start_ms
+                self.total_harvest_time_ms += self.read_duration_ms
+                logger.debug("Harvest from [%s] took %s ms. Data points: %s", device.get_SN(), self.read_duration_ms, len(harvest))
+
+            self._start_read(device, bb)
+        except Exception as e:
+            self.pending = None
+            raise ICom.ConnectionException("Error harvesting from device", device, e)
+
+        next_time = event_time + self.backoff_time
+        if next_time <= bb.time_ms():
+            next_time = bb.time_ms() + 100  # Start next harvest immediately if we're behind schedule
+
+        return next_time, harvest
+
+    def _start_read(self, device: ICom, bb: BlackBoard):
+        self.pending_start_ms = bb.time_ms()
+        self.pending_end_ms = None
+        self.pending = device.read_harvest_data_async(force_verbose=self.harvest_count % 10 == 0)
+        self.harvest_count += 1
+
+        def done(future: Future):
+            if future is self.pending:
+                self.pending_end_ms = bb.time_ms()
+        self.pending.add_done_callback(done)
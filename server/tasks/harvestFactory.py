@@ -1,7 +1,7 @@
 from server.app.blackboard import BlackBoard
 from server.devices.ICom import ICom
 from .deviceTask import DeviceTask
-from .harvestTransport import DefaultHarvestTransportFactory
+from .harvest_batch import BatchingHarvestTransportFactory
 from server.app.settings import ChangeSource
 import logging
 
@@ -14,6 +14,7 @@ class HarvestFactory:
 
     def __init__(self, bb: BlackBoard):
         self.bb = bb
+        self.transport_factory = BatchingHarvestTransportFactory()  # shared so that the barns of all devices can be batched
         bb.devices.add_listener(self)
 
     def add_device(self, com: ICom):
@@ -27,7 +28,7 @@ class HarvestFactory:
             logger.warning(f"Failed to save connection for device {com.get_name()} : {com.get_SN()}")
 
         # Create device task and save to settings
-        self.bb.add_task(DeviceTask(self.bb.time_ms() + 1000, self.bb, com, DefaultHarvestTransportFactory()))
+        self.bb.add_task(DeviceTask(self.bb.time_ms() + 1000, self.bb, com, self.transport_factory))
         self.bb.settings.devices.add_connection(com, ChangeSource.LOCAL)
         logger.info(f"Added device {com.get_name()} : {com.get_SN()}")
         self.bb.add_info(f"Added device {com.get_name()} : {com.get_SN()}")
@@ -1,14 +1,25 @@
 import logging
+import threading
+from typing import Optional
 import requests
 from server.app.blackboard import BlackBoard
 import server.crypto.crypto as crypto
 import server.crypto.revive_run as revive_run
+from server.crypto.signing_service import SigningPriority, SigningService
 from .srcfulAPICallTask import SrcfulAPICallTask
+from .harvest_payload import PayloadFormat, encode_payload
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 
+def is_transient_error(reply: requests.Response) -> bool:
+    """True if the upload may succeed later, i.e. no connection, a server error or rate limiting"""
+    if reply.status_code is None:
+        return True
+    return isinstance(reply.status_code, int) and (reply.status_code >= 500 or reply.status_code in (408, 429))
+
+
 class IHarvestTransport(SrcfulAPICallTask):
     pass
 
@@ -17,6 +28,55 @@ class ITransportFactory:
     def __call__(self, event_time: int, bb: BlackBoard, barn: dict, headers: dict) -> IHarvestTransport:
         pass
 
+    def create(self, event_time: int, bb: BlackBoard, barn: dict, headers: dict, endpoint: str, signed: Optional['SignedBarn'] = None) -> IHarvestTransport:
+        """Creates the transport of a barn to an endpoint in the payload format set up for the endpoint"""
+        transport = self(event_time, bb, barn, headers)
+        transport.post_url = endpoint
+        transport.payload_format = payload_format(bb, endpoint)
+        if signed is not None:
+            transport.signed = signed
+        return transport
+
+    def fan_out(self, event_time: int, bb: BlackBoard, barn: dict, headers: dict, endpoints: list[str]) -> list[IHarvestTransport]:
+        """Creates one transport per endpoint that share the signature of the barn. The transports are separate
+        tasks in the network lane so the uploads run concurrently and each endpoint has its own retries."""
+        signed = SignedBarn(barn, headers)
+        return [self.create(event_time, bb, barn, headers, endpoint, signed) for endpoint in endpoints]
+
+
+def payload_format(bb: BlackBoard, endpoint: str) -> PayloadFormat:
+    try:
+        return PayloadFormat(bb.settings.harvest.payload_format(endpoint))
+    except ValueError:
+        logger.warning("Unknown payload format for %s, using json", endpoint)
+        return PayloadFormat.JSON
+
+
+class SignedBarn:
+    """A barn and its headers signed once for all the endpoints it is sent to.
+
+    The JWT of a payload format is created by the first transport that needs it, transports of other endpoints
+    wait for it and reuse it instead of signing the same barn again on the chip."""
+
+    def __init__(self, barn: dict, headers: dict):
+        self.barn = barn
+        self.headers = headers
+        self._lock = threading.Lock()
+        self._jwts: dict[PayloadFormat, str] = {}
+
+    def jwt(self, payload_format: PayloadFormat) -> str:
+        with self._lock:
+            if payload_format not in self._jwts:
+                self._jwts[payload_format] = self._sign(payload_format)
+            return self._jwts[payload_format]
+
+    def _sign(self, payload_format: PayloadFormat) -> str:
+        service = SigningService.get_instance()
+        if payload_format == PayloadFormat.JSON:
+            return service.build_jwt(self.barn, self.headers, SigningPriority.HARVEST).result(SigningService.TIMEOUT_S)
+        headers = {**self.headers, "cty": payload_format.value}
+        return service.sign_payload(encode_payload(self.barn, payload_format), headers, SigningPriority.HARVEST).result(SigningService.TIMEOUT_S)
+
 
 class HarvestTransport(IHarvestTransport):
     do_increase_chip_death_count = True  # prevents excessive incrementing of chip death count
@@ -25,15 +85,16 @@ class HarvestTransport(IHarvestTransport):
         super().__init__(event_time, bb)
         self.barn = barn
         self.headers = headers
+        self.payload_format = PayloadFormat.JSON
+        self.signed = SignedBarn(barn, headers)  # shared with the transports of the other endpoints, see ITransportFactory.fan_out
 
     def _create_jwt(self):
-        with crypto.Chip() as chip:
-            try:
-                jwt = chip.build_jwt(self.barn, self.headers, 5)
-                HarvestTransport.do_increase_chip_death_count = True
-            except crypto.ChipError as e:
-                logger.error("Error creating JWT: %s", e)
-                raise e
+        try:
+            jwt = self.signed.jwt(self.payload_format)
+            HarvestTransport.do_increase_chip_death_count = True
+        except crypto.ChipError as e:
+            logger.error("Error creating JWT: %s", e)
+            raise e
 
         return jwt
 
@@ -68,6 +129,9 @@ class HarvestTransport(IHarvestTransport):
 
     def _on_error(self, reply: requests.Response):
         logger.warning("Error in harvest transport: %s", str(reply))
+        if is_transient_error(reply):
+            # keep the barn so it can be uploaded when the connection is back
+            self.bb.harvest_queue.put(self.post_url, self.headers, self.barn)
         return 0
 
 
@@ -81,12 +145,14 @@ class HarvestTransportTimedSignature(HarvestTransport):
         super().__init__(event_time, bb, barn, headers)
 
     def _create_header(self):
-        with crypto.Chip() as chip:
-            HarvestTransportTimedSignature._header = chip.build_header(self.headers["model"].lower())
-            HarvestTransportTimedSignature._header["valid_until"] = self.bb.time_ms() + 60000 * 45  # 45 minutes from now is the time to live
-
-            HarvestTransportTimedSignature._signature_base64 = chip.get_signature(crypto.Chip.jwtlify(HarvestTransportTimedSignature._header))
-            HarvestTransportTimedSignature._signature_base64 = crypto.base64_url_encode(HarvestTransportTimedSignature._signature_base64).decode("utf-8")
+        header, signature = SigningService.get_instance().submit(self._sign_header, SigningPriority.HARVEST).result(SigningService.TIMEOUT_S)
+        HarvestTransportTimedSignature._header = header
+        HarvestTransportTimedSignature._signature_base64 = crypto.base64_url_encode(signature).decode("utf-8")
+
+    def _sign_header(self, chip: crypto.Chip):
+        header = chip.build_header(self.headers["model"].lower())
+        header["valid_until"] = self.bb.time_ms() + 60000 * 45  # 45 minutes from now is the time to live
+        return header, chip.get_signature(crypto.Chip.jwtlify(header))
 
     def _data(self):
         if self._time_to_renew_header():
@@ -0,0 +1,107 @@
+import json
+import logging
+import threading
+from typing import Optional
+import requests
+from server.app.blackboard import BlackBoard
+from .harvestTransport import DefaultHarvestTransportFactory, HarvestTransport, IHarvestTransport, SignedBarn, is_transient_error, payload_format
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+BATCH_DTYPE = "batch"
+
+
+class BarnEnvelope(dict):
+    """The barns of several devices in one upload, {"devices": [{"headers": device headers, "barn": barn}, ...]}"""
+
+    def __init__(self, sections: list[tuple[dict, dict]]):
+        super().__init__(devices=[{"headers": headers, "barn": barn} for headers, barn in sections])
+
+    def to_json(self) -> str:
+        """The same JSON as json.dumps, with compact barns serialized from their buffers"""
+        parts = []
+        for section in self["devices"]:
+            barn = section["barn"]
+            barn_json = barn.to_json() if hasattr(barn, "to_json") else json.dumps(barn)
+            parts.append('{"headers": %s, "barn": %s}' % (json.dumps(section["headers"]), barn_json))
+        return '{"devices": [' + ", ".join(parts) + ']}'
+
+
+class BarnBatch:
+    """The barns and transport headers of the devices collected within a batch window, signed once when the window closes"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.sections: list[tuple[dict, dict]] = []
+        self.signed: Optional[SignedBarn] = None
+
+    def add(self, barn: dict, headers: dict) -> bool:
+        """Adds a barn to the batch, False if the batch is already closed"""
+        with self._lock:
+            if self.signed is not None:
+                return False
+            self.sections.append((headers, barn))
+            return True
+
+    def close(self) -> SignedBarn:
+        with self._lock:
+            if self.signed is None:
+                self.signed = SignedBarn(BarnEnvelope(self.sections), {"dtype": BATCH_DTYPE})
+            return self.signed
+
+
+class BatchHarvestTransport(HarvestTransport):
+    """Uploads a batch to one endpoint when its window has passed, the transports of the other endpoints share the signature"""
+
+    def __init__(self, event_time: int, bb: BlackBoard, batch: BarnBatch):
+        super().__init__(event_time, bb, {}, {"dtype": BATCH_DTYPE})
+        self.batch = batch
+
+    def execute(self, event_time):
+        self.signed = self.batch.close()
+        self.barn = self.signed.barn
+        self.headers = self.signed.headers
+        logger.debug("Uploading the barns of %d devices to %s", len(self.batch.sections), self.post_url)
+        return super().execute(event_time)
+
+    def _on_error(self, reply: requests.Response):
+        logger.warning("Error in batch harvest transport: %s", str(reply))
+        if is_transient_error(reply):
+            # queued per device like unbatched barns, so the queue drain can merge them
+            for headers, barn in self.batch.sections:
+                self.bb.harvest_queue.put(self.post_url, headers, barn)
+        return 0
+
+
+class BatchingHarvestTransportFactory(DefaultHarvestTransportFactory):
+    """Transport factory shared by all device tasks. When the harvest settings have a batch window the barns of all
+    devices are collected for the window and uploaded together, one signature and one request per endpoint instead of
+    one per device. Without a batch window every barn gets its own transports."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._batches: dict[tuple[str, ...], BarnBatch] = {}  # the open batch by endpoints
+
+    def fan_out(self, event_time: int, bb: BlackBoard, barn: dict, headers: dict, endpoints: list[str]) -> list[IHarvestTransport]:
+        window_ms = bb.settings.harvest.batch_window_ms
+        if window_ms <= 0 or len(endpoints) == 0:
+            return super().fan_out(event_time, bb, barn, headers, endpoints)
+
+        key = tuple(endpoints)
+        with self._lock:
+            batch = self._batches.get(key)
+            if batch is not None and batch.add(barn, headers):
+                return []  # the transports of the batch are already scheduled
+
+            batch = BarnBatch()
+            batch.add(barn, headers)
+            self._batches[key] = batch
+
+        transports = []
+        for endpoint in endpoints:
+            transport = BatchHarvestTransport(event_time + window_ms, bb, batch)
+            transport.post_url = endpoint
+            transport.payload_format = payload_format(bb, endpoint)
+            transports.append(transport)
+        return transports
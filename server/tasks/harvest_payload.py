@@ -0,0 +1,136 @@
+import base64
+import json
+import struct
+import zlib
+from collections.abc import Mapping
+from enum import Enum
+from typing import Any
+import server.crypto.crypto as crypto
+
+
+class PayloadFormat(Enum):
+    """The encoding of the barn in the payload of a signed harvest upload.
+
+    JSON is the plain JWT payload every endpoint accepts. CBOR_ZLIB is the barn as CBOR (RFC 8949), zlib
+    compressed, in place of the JSON. It is marked by the "cty" header, which is covered by the signature,
+    and integer timestamps and register addresses stay integers instead of becoming strings."""
+
+    JSON = "json"
+    CBOR_ZLIB = "cbor+zlib"
+
+
+def encode_payload(barn: dict, payload_format: PayloadFormat) -> str:
+    """The base64url payload segment of the JWT for the barn"""
+    if payload_format == PayloadFormat.CBOR_ZLIB:
+        return crypto.base64_url_encode(zlib.compress(cbor_encode(barn))).decode("utf-8")
+    return crypto.jwtlify(barn)
+
+
+def decode_payload(segment: str, payload_format: PayloadFormat) -> Any:
+    data = base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+    if payload_format == PayloadFormat.CBOR_ZLIB:
+        return cbor_decode(zlib.decompress(data))
+    return json.loads(data)
+
+
+def _head(major: int, value: int) -> bytes:
+    if value < 24:
+        return bytes([major << 5 | value])
+    if value < 0x100:
+        return bytes([major << 5 | 24, value])
+    if value < 0x10000:
+        return bytes([major << 5 | 25]) + value.to_bytes(2, "big")
+    if value < 0x100000000:
+        return bytes([major << 5 | 26]) + value.to_bytes(4, "big")
+    if value < 0x10000000000000000:
+        return bytes([major << 5 | 27]) + value.to_bytes(8, "big")
+    raise ValueError(f"Integer {value} does not fit in 64 bits")
+
+
+def _encode(data: Any, out: bytearray):
+    if data is None:
+        out.append(0xf6)
+    elif data is True:  # before int as bool is a subclass of int
+        out.append(0xf5)
+    elif data is False:
+        out.append(0xf4)
+    elif isinstance(data, int):
+        out += _head(0, data) if data >= 0 else _head(1, -1 - data)
+    elif isinstance(data, float):
+        out += b"\xfb" + struct.pack(">d", data)
+    elif isinstance(data, str):
+        encoded = data.encode("utf-8")
+        out += _head(3, len(encoded))
+        out += encoded
+    elif isinstance(data, (bytes, bytearray)):
+        out += _head(2, len(data))
+        out += data
+    elif isinstance(data, Mapping):
+        out += _head(5, len(data))
+        for key, value in data.items():
+            _encode(key, out)
+            _encode(value, out)
+    elif isinstance(data, (list, tuple)):
+        out += _head(4, len(data))
+        for value in data:
+            _encode(value, out)
+    else:
+        raise TypeError(f"Cannot CBOR encode {type(data)}")
+
+
+def cbor_encode(data: Any) -> bytes:
+    """CBOR encodes the JSON like data of a barn, i.e. maps, arrays, strings, numbers, booleans and None"""
+    out = bytearray()
+    _encode(data, out)
+    return bytes(out)
+
+
+def _decode(data: bytes, pos: int) -> tuple[Any, int]:
+    major, info = data[pos] >> 5, data[pos] & 0x1f
+    pos += 1
+    if major == 7:
+        if info == 20:
+            return False, pos
+        if info == 21:
+            return True, pos
+        if info == 22:
+            return None, pos
+        if info == 27:
+            return struct.unpack_from(">d", data, pos)[0], pos + 8
+        raise ValueError(f"Unsupported CBOR simple value {info}")
+
+    if info < 24:
+        value = info
+    elif info <= 27:
+        size = 1 << (info - 24)
+        value = int.from_bytes(data[pos:pos + size], "big")
+        pos += size
+    else:
+        raise ValueError(f"Unsupported CBOR length {info}")
+
+    if major == 0:
+        return value, pos
+    if major == 1:
+        return -1 - value, pos
+    if major == 2:
+        return data[pos:pos + value], pos + value
+    if major == 3:
+        return data[pos:pos + value].decode("utf-8"), pos + value
+    if major == 4:
+        items = []
+        for _ in range(value):
+            item, pos = _decode(data, pos)
+            items.append(item)
+        return items, pos
+    if major == 5:
+        ret = {}
+        for _ in range(value):
+            key, pos = _decode(data, pos)
+            ret[key], pos = _decode(data, pos)
+        return ret, pos
+    raise ValueError(f"Unsupported CBOR major type {major}")
+
+
+def cbor_decode(data: bytes) -> Any:
+    value, _ = _decode(data, 0)
+    return value
@@ -0,0 +1,56 @@
+import logging
+import requests
+from server.app.blackboard import BlackBoard
+from server.storage.harvest_queue import QueuedBarn
+from .harvestTransport import HarvestTransport, SignedBarn, is_transient_error, payload_format
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class HarvestQueueDrainTask(HarvestTransport):
+    """Perpetual task that uploads the barns stored in the harvest queue once the backend can be reached again.
+    Queued barns of the same device and endpoint are merged into one signed upload, and only one batch is sent
+    per BATCH_INTERVAL_MS so a large backlog does not saturate the uplink."""
+
+    IDLE_INTERVAL_MS = 10_000
+    BATCH_INTERVAL_MS = 1_000
+    RETRY_INTERVAL_MS = 30_000
+    MAX_BATCH_BARNS = 60
+
+    def __init__(self, event_time: int, bb: BlackBoard):
+        super().__init__(event_time, bb, {}, {})
+        self.batch: list[QueuedBarn] = []
+
+    def execute(self, event_time):
+        self.batch = self.bb.harvest_queue.peek_batch(self.MAX_BATCH_BARNS)
+
+        if len(self.batch) == 0:
+            self.time = event_time + self.IDLE_INTERVAL_MS
+            return self
+
+        self.post_url = self.batch[0].endpoint
+        self.payload_format = payload_format(self.bb, self.post_url)
+        self.headers = self.batch[0].headers
+        self.barn = {}
+        for queued in self.batch:
+            self.barn.update(queued.barn)
+        self.signed = SignedBarn(self.barn, self.headers)
+
+        logger.info("Uploading %d queued barns (%d data points) to %s", len(self.batch), len(self.barn), self.post_url)
+        return super().execute(event_time)
+
+    def _on_200(self, reply):
+        self.bb.harvest_queue.ack(self.batch)
+        self.time = self.bb.time_ms() + self.BATCH_INTERVAL_MS
+        return self
+
+    def _on_error(self, reply: requests.Response):
+        if is_transient_error(reply):
+            logger.info("Backend not reachable, %d barns remain in the harvest queue", len(self.bb.harvest_queue))
+            return self.RETRY_INTERVAL_MS
+
+        # the backend will never accept this batch, drop it so it does not block the queue
+        logger.warning("Dropping %d queued barns rejected by the backend: %s", len(self.batch), str(reply))
+        self.bb.harvest_queue.ack(self.batch)
+        return self.BATCH_INTERVAL_MS
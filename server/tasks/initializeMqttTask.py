@@ -9,6 +9,7 @@ and creating the MQTT service instance.
 import logging
 import requests
 from server.tasks.task import Task
+from server.tasks.itask import Lane
 from server.backend.mqtt_service import MQTTService
 
 logger = logging.getLogger(__name__)
@@ -16,6 +17,8 @@ logger.setLevel(level=logging.INFO)
 
 
 class InitializeMqttTask(Task):
+    lane = Lane.NETWORK
+
     def __init__(self, time, bb, web_host: tuple[str, int]):
         super().__init__(time, bb)
         self.web_host = web_host
@@ -3,6 +3,7 @@ import requests
 from typing import List, Union, Tuple
 import server.crypto.crypto as crypto
 from server.app.blackboard import BlackBoard
+from server.crypto.signing_service import SigningService, SigningPriority
 from .itask import ITask
 
 
@@ -24,13 +25,15 @@ class InitializeTask(SrcfulAPICallTask):
 
 
     def get_id_and_wallet(self):
-        with crypto.Chip() as chip:
-            serial = chip.get_serial_number().hex()
-            # pub_key = chip.get_public_key().hex()
+        return SigningService.get_instance().submit(self._sign_id_and_wallet, SigningPriority.REQUEST).result(SigningService.TIMEOUT_S)
 
-            # id_and_wallet = serial + ":" + self.wallet + ":" + pub_key
-            id_and_wallet = serial + ":" + self.wallet
-            sign = chip.get_signature(id_and_wallet).hex()
+    def _sign_id_and_wallet(self, chip: crypto.Chip):
+        serial = chip.get_serial_number().hex()
+        # pub_key = chip.get_public_key().hex()
+
+        # id_and_wallet = serial + ":" + self.wallet + ":" + pub_key
+        id_and_wallet = serial + ":" + self.wallet
+        sign = chip.get_signature(id_and_wallet).hex()
         return id_and_wallet, sign, serial
 
     def _json(self):
@@ -1,12 +1,23 @@
 from __future__ import annotations
+from enum import Enum
 from typing import List, Union
 
 
+class Lane(Enum):
+    """Worker lane of a task, each lane has its own workers so slow tasks in one lane cannot delay the others"""
+    REALTIME = "realtime"  # harvest and control of devices
+    NETWORK = "network"  # uploads and other calls to the backend
+    DISCOVERY = "discovery"  # scans for hosts and devices
+
+
 class ITask:
     """Interface for a task. A task is a unit of work that can be scheduled for execution at a given time.
     Tasks are executed synchronously, so they should not block.
     Blocking operations should be performed in a separate thread. Results should
-    then be collected and processed in the task's execute method."""
+    then be collected and processed in the task's execute method.
+    Tasks that block for long (network calls, scans) should override lane so they do not delay harvests."""
+
+    lane: Lane = Lane.REALTIME
 
     def __init__(self):
         pass
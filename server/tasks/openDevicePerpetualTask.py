@@ -2,6 +2,7 @@ import logging
 from server.app.blackboard import BlackBoard
 from server.devices.IComFactory import IComFactory
 from .task import Task
+from .itask import Lane
 from server.devices.ICom import ICom
 from server.network.network_utils import NetworkUtils
 
@@ -10,6 +11,8 @@ logger = logging.getLogger(__name__)
 
 
 class DevicePerpetualTask(Task):
+    lane = Lane.DISCOVERY
+
     def __init__(self, event_time: int, bb: BlackBoard, device: ICom):
         super().__init__(event_time, bb)
         self.device: ICom = device
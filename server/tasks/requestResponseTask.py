@@ -71,20 +71,14 @@ def handle_request(bb: BlackBoard, request_data: Dict[str, Any]):
             return ResponseTask(bb.time_ms() + 500, bb, id, {"error": f"Request too old"})
 
         # Create a RequestData object
-        endpoints = Endpoints()
+        endpoints = Endpoints.shared()
 
         path, query = endpoints.pre_do(path)
 
-        if method == 'GET':
-            endpoints_dict = endpoints.api_get
-        elif method == 'POST':
-            endpoints_dict = endpoints.api_post
-        elif method == 'DELETE':
-            endpoints_dict = endpoints.api_delete
-        else:
+        if method not in endpoints.routers:
             return ResponseTask(bb.time_ms() + 500, bb, id, {"error": f"Method {method} not allowed"})
-        
-        api_handler, params = endpoints.get_api_handler(path, "/api/", endpoints_dict)
+
+        api_handler, params = endpoints.route(method, path)
         if api_handler is None:
             return ResponseTask(bb.time_ms() + 500, bb, id, {"error": f"API handler not found for path {path}"})
         
@@ -2,7 +2,8 @@ from abc import ABC, abstractmethod
 import logging
 import requests
 from typing import List, Union, Tuple
-from .itask import ITask
+from .itask import ITask, Lane
+from server.backend.http_client import get_client
 from server.app.blackboard import BlackBoard
 from .task import Task
 
@@ -19,6 +20,8 @@ def arg_2_str(arg):
 
 
 class SrcfulAPICallTask(Task, ABC):
+    lane = Lane.NETWORK
+
     def __init__(self, event_time: int, bb: BlackBoard):
         super().__init__(event_time, bb)
         self.reply = None
@@ -48,20 +51,21 @@ class SrcfulAPICallTask(Task, ABC):
 
         # this is the function that will be executed in the thread
         def post():
+            client = get_client()
             # pylint: disable=assignment-from-none
             data = self._data()
             if data is not None:
                 logger.debug("%s %s", self.post_url, arg_2_str(data))
-                return requests.post(self.post_url, data=data, timeout=5)
+                return client.post(self.post_url, data=data)
             else:
                 json = self._json()
                 if json is not None:
                     logger.debug("%s %s", self.post_url, arg_2_str(json))
-                    ret = requests.post(self.post_url, json=json, timeout=5)
+                    ret = client.post(self.post_url, json=json)
                     return ret
                 else:
                     logger.debug("%s %s", self.post_url, "no data or json")
-                    return requests.post(self.post_url, timeout=5)
+                    return client.post(self.post_url)
         try:
             response = post()
             self.reply = response
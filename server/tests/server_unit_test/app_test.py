@@ -216,3 +216,45 @@ def test_main_loop_with_blocking_task(scheduler, bb, short_task, long_task):
 
     # assert that the short task was executed while the long task was sleeping
     assert short_task.execute_time <= short_task_time + 500  # we alllow for some time of context switching
+
+
+def test_cancel_task(scheduler, bb, normal_task, stop_task):
+    stop_task.adjust_time(normal_task.get_time() + 100)
+
+    scheduler.add_task(normal_task)
+    scheduler.add_task(stop_task)
+    assert scheduler.cancel_task(normal_task)
+    assert not scheduler.cancel_task(normal_task)
+    assert scheduler.queued_tasks == [stop_task]
+
+    scheduler.main_loop()
+    assert not normal_task.execute.called
+
+
+def test_reschedule_task(scheduler, bb, normal_task, stop_task):
+    scheduler.add_task(normal_task)
+    scheduler.add_task(stop_task)
+    assert scheduler.queued_tasks == [normal_task, stop_task]
+
+    # move the task after the stop task, it should never run
+    assert scheduler.reschedule_task(normal_task, stop_task.get_time() + 1000)
+    assert normal_task.get_time() == stop_task.get_time() + 1000
+    assert scheduler.queued_tasks == [stop_task, normal_task]
+
+    scheduler.main_loop()
+    assert not normal_task.execute.called
+    assert not scheduler.reschedule_task(stop_task, bb.time_ms() + 1000)
+
+
+def test_main_loop_records_stats(scheduler, bb, normal_task, stop_task):
+    stop_task.adjust_time(normal_task.get_time() + 100)
+    scheduler.add_task(normal_task)
+    scheduler.add_task(stop_task)
+    scheduler.main_loop()
+
+    stats = scheduler.stats.to_dict()
+    assert stats["max_workers"] == sum(lane.max_workers for lane in scheduler.lanes.values())
+    assert {lane: d["max_workers"] for lane, d in stats["lanes"].items()} == {lane.lane.value: lane.max_workers for lane in scheduler.lanes.values()}
+    assert stats["lanes"]["realtime"]["lateness"]["count"] >= 1
+    assert stats["tasks"]["MagicMock"]["execution"]["count"] >= 1
+    assert stats["tasks"]["MagicMock"]["lateness"]["count"] >= 1
@@ -0,0 +1,92 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+import pytest
+import server.backend.http_client as http_client
+from server.backend.http_client import HttpClient, configure_client, get_client
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/gw/data/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_connection_is_kept_alive(server_url):
+    client = HttpClient()
+
+    for _ in range(5):
+        assert client.post(server_url, data="barn").status_code == 200
+
+    assert client.pool_stats() == {"127.0.0.1": {"hits": 4, "misses": 1}}
+    client.close()
+
+
+def test_concurrent_posts_are_pooled(server_url):
+    client = HttpClient(pool_size=2)
+    errors = []
+
+    def post():
+        for _ in range(10):
+            if client.post(server_url, json={"a": 1}).status_code != 200:
+                errors.append(1)
+
+    threads = [threading.Thread(target=post) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stats = client.pool_stats()["127.0.0.1"]
+    assert errors == []
+    assert stats["hits"] + stats["misses"] == 20
+    assert stats["misses"] <= 2
+    client.close()
+
+
+def test_default_timeout():
+    client = HttpClient(connect_timeout=3, read_timeout=4)
+    with patch.object(client._session, "request") as mock_request:
+        client.post("https://api.srcful.dev/", json={})
+        client.get("https://api.srcful.dev/", timeout=10)
+
+    assert mock_request.call_args_list[0].kwargs["timeout"] == (3, 4)
+    assert mock_request.call_args_list[1].kwargs["timeout"] == 10
+
+
+def test_get_client_is_shared():
+    assert get_client() is get_client()
+
+
+def test_configure_client():
+    with patch.object(http_client, "_client", None), patch.object(http_client, "_client_config", {}):
+        previous = get_client()
+        with patch.object(previous, "close") as close:
+            configure_client(pool_size=8, connect_timeout=2, read_timeout=20)
+        close.assert_called_once()
+
+        client = get_client()
+        assert client is not previous
+        assert client.timeout == (2, 20)
+        assert client._session.get_adapter("https://api.srcful.dev/")._pool_maxsize == 8
+        client.close()
@@ -158,3 +158,13 @@ def test_add_multiple_devices(blackboard):
     hw.get_SN.return_value = "1234567890"
     bb.devices.add(hw)
     assert len(bb.devices.lst) == 1
+
+
+def test_state_contains_scheduler_stats(blackboard):
+    bb = blackboard
+    bb.scheduler_stats.record_execution("DeviceTask", 3, 1)
+    bb.network_state = MagicMock(return_value={})
+
+    state = bb.state
+    assert state["scheduler"]["tasks"]["DeviceTask"]["execution"]["count"] == 1
+    assert "http_pool" in state["status"]
@@ -36,8 +36,18 @@ from unittest.mock import Mock, patch
 import pytest
 
 from server.app.blackboard import BlackBoard
+from server.crypto import crypto
 from server.crypto.crypto_state import CryptoState
 from server.storage.gateway_storage import DeviceStorage
+from server.storage.harvest_queue import HarvestQueue
+
+
+@pytest.fixture(autouse=True)
+def clear_chip_identity():
+    """The chip identity is cached for the process, tests patch the chip with other identities"""
+    crypto.Chip.clear_identity()
+    yield
+    crypto.Chip.clear_identity()
 
 
 @pytest.fixture
@@ -60,14 +70,18 @@ def blackboard(temp_db_path):
     This fixture is available to all unit tests and provides a properly
     initialized BlackBoard with a temporary SQLite database.
     """
-    with patch('server.app.blackboard.DeviceStorage') as mock_storage_class:
+    with patch('server.app.blackboard.DeviceStorage') as mock_storage_class, \
+            patch('server.app.blackboard.HarvestQueue') as mock_queue_class:
         mock_storage_class.return_value = DeviceStorage(temp_db_path)
+        mock_queue_class.return_value = HarvestQueue(":memory:")
         return BlackBoard(Mock(spec=CryptoState))
 
 
 @pytest.fixture
 def bb(temp_db_path):
     """Alias for blackboard fixture - shorter name for convenience"""
-    with patch('server.app.blackboard.DeviceStorage') as mock_storage_class:
+    with patch('server.app.blackboard.DeviceStorage') as mock_storage_class, \
+            patch('server.app.blackboard.HarvestQueue') as mock_queue_class:
         mock_storage_class.return_value = DeviceStorage(temp_db_path)
+        mock_queue_class.return_value = HarvestQueue(":memory:")
         return BlackBoard(Mock(spec=CryptoState))
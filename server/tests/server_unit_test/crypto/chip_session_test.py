@@ -0,0 +1,111 @@
+import time
+from unittest.mock import patch
+import pytest
+from server.crypto import crypto
+from server.crypto.crypto_state import CryptoState
+from server.tests.server_unit_test.crypto.mockChip import CountingCrypto
+
+
+@pytest.fixture
+def session():
+    crypto.Chip.SESSION_IDLE_S = 0.2
+    yield
+    crypto.Chip.release_session()
+    crypto.Chip.SESSION_IDLE_S = 0.0
+    crypto.Chip.SESSION_HEALTH_CHECK_S = 60.0
+
+
+def _sign(impl: CountingCrypto, count: int):
+    for i in range(count):
+        with crypto.Chip(crypto_impl=impl) as chip:
+            chip.get_signature("barn %d" % i)
+
+
+def test_init_and_release_per_use_by_default():
+    impl = CountingCrypto()
+    _sign(impl, 5)
+    assert impl.inits == 5
+    assert impl.releases == 5
+
+
+def test_session_is_kept_until_idle(session):
+    impl = CountingCrypto()
+    _sign(impl, 5)
+    assert impl.inits == 1
+    assert impl.releases == 0
+
+    time.sleep(0.4)
+    assert impl.releases == 1
+    _sign(impl, 1)
+    assert impl.inits == 2
+
+
+def test_error_ends_session(session):
+    impl = CountingCrypto()
+    with pytest.raises(ValueError):
+        with crypto.Chip(crypto_impl=impl):
+            raise ValueError("failed")
+    assert impl.releases == 1
+
+    _sign(impl, 1)
+    assert impl.inits == 2
+
+
+def test_failed_health_check_initializes_again(session):
+    crypto.Chip.SESSION_HEALTH_CHECK_S = 0
+    impl = CountingCrypto()
+    _sign(impl, 2)
+    assert impl.inits == 1
+
+    impl.info_code = 1
+    _sign(impl, 1)
+    assert impl.inits == 2
+    assert impl.releases == 1
+
+
+def test_other_implementation_ends_session(session):
+    first, second = CountingCrypto(), CountingCrypto()
+    _sign(first, 1)
+    _sign(second, 1)
+    assert first.releases == 1
+    assert second.inits == 1
+
+
+def test_signatures_per_second(session):
+    count = 50
+
+    def rate(impl):
+        start = time.monotonic()
+        _sign(impl, count)
+        elapsed = time.monotonic() - start
+        return count / elapsed, elapsed * 1000 / count
+
+    crypto.Chip.SESSION_IDLE_S = 0.0
+    per_use, per_use_ms = rate(CountingCrypto())
+    crypto.Chip.SESSION_IDLE_S = 0.2
+    kept, kept_ms = rate(CountingCrypto())
+    print("%.0f signatures/s (%.2f ms) with init per use, %.0f signatures/s (%.2f ms) with a session" % (per_use, per_use_ms, kept, kept_ms))
+    assert kept > per_use * 2
+
+
+def test_identity_is_read_once_from_crypto_state():
+    impl = CountingCrypto()
+    with patch.object(crypto.Chip.__init__, "__defaults__", (impl,)):  # the chip CryptoState uses
+        state = CryptoState()
+    assert impl.identity_reads == 2
+
+    for _ in range(5):
+        with crypto.Chip(crypto_impl=impl) as chip:
+            assert chip.build_header({})["device"] == state.serial_number.hex()
+            assert chip.get_public_key() == state.public_key
+            chip.build_jwt({"barn": 1}, {})
+    assert impl.identity_reads == 2  # only the signatures used the chip
+
+
+def test_identity_is_per_implementation():
+    impl, other = CountingCrypto(), CountingCrypto()
+    with crypto.Chip(crypto_impl=impl) as chip:
+        chip.cache_identity(b"serial", b"key")
+    with crypto.Chip(crypto_impl=other) as chip:
+        assert chip.get_serial_number() == bytes(range(9))
+    assert other.identity_reads == 1
@@ -0,0 +1,48 @@
+import time
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec, utils
+from server.crypto import crypto
+from server.crypto.crypto_interface import CryptoInterface
+
+INIT_S = 0.005  # simulated wake up and configuration of the chip
+
+
+class CountingCrypto(CryptoInterface):
+    """Software signing that counts the chip initializations and releases"""
+
+    def __init__(self):
+        self.key = ec.generate_private_key(ec.SECP256R1())
+        self.inits = 0
+        self.releases = 0
+        self.info_code = crypto.ATCA_SUCCESS
+        self.identity_reads = 0
+
+    def atcab_init(self, cfg):
+        time.sleep(INIT_S)
+        self.inits += 1
+        return crypto.ATCA_SUCCESS
+
+    def atcab_release(self):
+        self.releases += 1
+        return crypto.ATCA_SUCCESS
+
+    def atcab_info(self):
+        return self.info_code, bytes(4)
+
+    def atcab_read_serial_number(self):
+        self.identity_reads += 1
+        return crypto.ATCA_SUCCESS, bytes(range(9))
+
+    def atcab_get_pubkey(self, key_id):
+        self.identity_reads += 1
+        return crypto.ATCA_SUCCESS, bytes(range(64))
+
+    def atcab_sign(self, key_id, message):
+        r, s = utils.decode_dss_signature(self.key.sign(message, ec.ECDSA(utils.Prehashed(hashes.SHA256()))))
+        return crypto.ATCA_SUCCESS, r.to_bytes(32, "big") + s.to_bytes(32, "big")
+
+    def atcab_random(self):
+        return crypto.ATCA_SUCCESS, bytes(32)
+
+    def atcab_verify(self, data_hash, signature, public_key=None):
+        return crypto.ATCA_SUCCESS, True
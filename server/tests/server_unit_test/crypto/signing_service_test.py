@@ -0,0 +1,99 @@
+import threading
+from unittest.mock import patch
+import pytest
+from server.crypto import crypto
+from server.crypto.crypto_state import CryptoState
+from server.crypto.signing_service import SigningPriority, SigningService
+from server.tests.server_unit_test.crypto.mockChip import CountingCrypto
+
+
+@pytest.fixture
+def impl():
+    return CountingCrypto()
+
+
+@pytest.fixture
+def service(impl):
+    return SigningService(lambda: crypto.Chip(crypto_impl=impl))
+
+
+def _block(service: SigningService) -> threading.Event:
+    """Keeps the service busy until the returned event is set"""
+    release = threading.Event()
+    started = threading.Event()
+
+    def wait(chip):
+        started.set()
+        release.wait(5)
+    service.submit(wait, SigningPriority.CONTROL)
+    started.wait(5)
+    return release
+
+
+def test_signatures(service: SigningService):
+    signature = service.get_signature("data", SigningPriority.HARVEST).result(5)
+    jwt = service.build_jwt({"barn": 1}, {}, SigningPriority.HARVEST).result(5)
+
+    assert len(signature) == 64
+    assert len(jwt.split(".")) == 3
+
+
+def test_queued_operations_are_done_by_priority_in_one_chip_session(service: SigningService, impl: CountingCrypto):
+    release = _block(service)
+    order = []
+    futures = [service.submit(lambda chip, p=priority: order.append(p), priority)
+               for priority in (SigningPriority.STATE, SigningPriority.HARVEST, SigningPriority.STATE, SigningPriority.CONTROL)]
+    assert not any(future.done() for future in futures)  # the callers are not blocked by the busy chip
+
+    release.set()
+    for future in futures:
+        future.result(5)
+    assert order == [SigningPriority.CONTROL, SigningPriority.HARVEST, SigningPriority.STATE, SigningPriority.STATE]
+    assert impl.inits == 2  # one for the blocking operation, one for the queued batch
+
+
+def test_failed_operation_does_not_fail_the_batch(service: SigningService):
+    release = _block(service)
+
+    def fail(chip):
+        raise crypto.ChipError(1, "sign failed")
+    failing = service.submit(fail, SigningPriority.CONTROL)
+    signing = service.get_signature("data", SigningPriority.HARVEST)
+    release.set()
+
+    with pytest.raises(crypto.ChipError):
+        failing.result(5)
+    assert len(signing.result(5)) == 64
+
+
+def test_chip_that_cannot_be_opened_fails_all_operations(impl: CountingCrypto):
+    impl.atcab_init = lambda cfg: 1
+    service = SigningService(lambda: crypto.Chip(crypto_impl=impl))
+
+    with pytest.raises(crypto.ChipError):
+        service.get_signature("data", SigningPriority.HARVEST).result(5)
+
+
+def test_instance_is_shared():
+    assert SigningService.get_instance() is SigningService.get_instance()
+
+
+def test_stop_does_the_queued_operations(service: SigningService):
+    release = _block(service)
+    future = service.get_signature("data", SigningPriority.STATE)
+    release.set()
+    service.stop()
+
+    assert len(future.result(0)) == 64
+    assert service._thread is None
+
+    # the service starts again for the next operation
+    assert len(service.get_signature("data", SigningPriority.HARVEST).result(5)) == 64
+    service.stop()
+
+
+def test_crypto_state_is_not_created_on_the_service_thread(service: SigningService):
+    with patch.object(SigningService, "_instance", service):
+        assert not service.on_service_thread()
+        with pytest.raises(RuntimeError):
+            service.submit(lambda chip: CryptoState(), SigningPriority.STATE).result(1)  # fails right away instead of waiting for itself
@@ -0,0 +1,126 @@
+import math
+import random
+import time
+import pytest
+from server.devices.profile_keys import ProfileKey, RegistersKey
+from server.devices.registerValue import RegisterValue
+from server.devices.supported_devices.decode_plan import DecodePlan
+from server.devices.supported_devices.profiles import ModbusDeviceProfiles
+from server.devices.supported_devices.inverter_definitions.deye.definitions import deye_profile as full_deye_profile
+from server.devices.supported_devices.inverter_definitions.huawei.definitions import huawei_profile as full_huawei_profile
+from server.devices.supported_devices.inverter_definitions.sungrow.definitions import sungrow_profile as full_sungrow_profile
+
+
+FULL_DEFINITIONS = {
+    "deye": full_deye_profile[ProfileKey.REGISTERS],
+    "huawei_hybrid": full_huawei_profile[ProfileKey.REGISTERS],
+    "sungrow": full_sungrow_profile[ProfileKey.REGISTERS],
+}
+
+
+def _legacy_decoder(raw_register_values: dict, register_defs: list):
+    """The per-harvest decoder that was used before decode plans, kept as reference and benchmark baseline"""
+    reg_defs = {entry[RegistersKey.START_REGISTER]: entry for entry in register_defs}
+
+    def decode(addr: int):
+        entry = reg_defs.get(addr)
+        if not entry:
+            return None
+        size = entry[RegistersKey.NUM_OF_REGISTERS]
+        try:
+            regs = [raw_register_values[addr + i] for i in range(size)]
+        except KeyError:
+            return None
+        raw = bytearray()
+        for r in regs:
+            raw.extend(int(r).to_bytes(2, "big", signed=False))
+        rv = RegisterValue(addr, size, entry[RegistersKey.FUNCTION_CODE], entry[RegistersKey.DATA_TYPE], entry[RegistersKey.SCALE_FACTOR], entry[RegistersKey.ENDIANNESS])
+        _, value = rv._interpret_value(raw)
+        return value
+    return decode
+
+
+def _harvest(register_defs: list, seed: int = 17) -> dict:
+    rnd = random.Random(seed)
+    harvest = {}
+    for entry in register_defs:
+        for address in range(entry[RegistersKey.START_REGISTER], entry[RegistersKey.START_REGISTER] + entry[RegistersKey.NUM_OF_REGISTERS]):
+            harvest[address] = rnd.randint(0, 0xFFFF)
+    return harvest
+
+
+def _same(a, b) -> bool:
+    if isinstance(a, float) and isinstance(b, float) and math.isnan(a):
+        return math.isnan(b)
+    return a == b
+
+
+@pytest.mark.parametrize("name", FULL_DEFINITIONS.keys())
+def test_decode_plan_matches_register_value(name):
+    register_defs = FULL_DEFINITIONS[name]
+    plan = DecodePlan(register_defs)
+
+    for seed in range(5):
+        harvest = _harvest(register_defs, seed)
+        legacy = _legacy_decoder(harvest, register_defs)
+        decode = plan.decoder(harvest)
+
+        for entry in register_defs:
+            address = entry[RegistersKey.START_REGISTER]
+            assert _same(decode(address), legacy(address)), f"{name} register {address}"
+
+
+def test_decode_plan_missing_registers():
+    plan = DecodePlan(FULL_DEFINITIONS["huawei_hybrid"])
+    decode = plan.decoder({32016: 1})
+
+    assert decode(32016) is not None
+    assert decode(32000) is None  # not harvested
+    assert decode(1) is None  # not defined
+
+
+def test_decode_plan_string():
+    plan = DecodePlan(FULL_DEFINITIONS["huawei_hybrid"])
+    harvest = {30015 + i: 0 for i in range(10)}
+    harvest[30015] = ord("A") << 8 | ord("B")
+
+    assert plan.decode(harvest, 30015) == "AB"
+
+
+@pytest.mark.parametrize("name", FULL_DEFINITIONS.keys())
+def test_harvest_to_ders_uses_plan(name):
+    profile = ModbusDeviceProfiles().get(name)
+    harvest = _harvest(FULL_DEFINITIONS[name])
+
+    assert len(profile.decode_plan) > 0
+    assert profile.harvest_to_ders(harvest) is not None
+
+
+def test_decode_benchmark():
+    # micro-benchmark: decode every defined field of a full harvest, i.e. the worst case of harvest_to_ders
+    rounds = 20
+    results = {}
+
+    for name, register_defs in FULL_DEFINITIONS.items():
+        harvest = _harvest(register_defs)
+        addresses = [entry[RegistersKey.START_REGISTER] for entry in register_defs]
+        plan = DecodePlan(register_defs)
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            decode = _legacy_decoder(harvest, register_defs)
+            for address in addresses:
+                decode(address)
+        legacy_us = (time.perf_counter() - start) / rounds * 1e6
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            decode = plan.decoder(harvest)
+            for address in addresses:
+                decode(address)
+        plan_us = (time.perf_counter() - start) / rounds * 1e6
+
+        results[name] = (round(legacy_us), round(plan_us))
+        assert plan_us < legacy_us
+
+    print("Decode time per harvest in us (before, after): %s" % results)
@@ -98,7 +98,7 @@ def test_init_with_no_token_missing_iq_gw_serial(config):
         assert True
 
 
-def test_is_open_disconnected():
+def test_is_open_disconnected(monkeypatch):
 
     # with patch('server.devices.inverters.enphase.Enphase.NetworkUtils.get_mac_from_ip', return_value="1:1:1:1:1:1"):
     enphase = Enphase(**cfg.ENPHASE_CONFIG)
@@ -110,7 +110,7 @@ def test_is_open_disconnected():
     enphase._get_bearer_token = Mock(return_value="1234567890")
     enphase._read_SN = Mock(return_value="1234567890")
 
-    NetworkUtils.get_mac_from_ip = Mock(return_value="1:1:1:1:1:1")
+    monkeypatch.setattr(NetworkUtils, "get_mac_from_ip", Mock(return_value="1:1:1:1:1:1"))
 
     assert enphase.connect()
     assert enphase.is_open()
@@ -131,7 +131,7 @@ def test_disconnect(enphase):
     assert not enphase.is_open()
 
 
-def test_find_device_with_mdns():
+def test_find_device_with_mdns(monkeypatch):
 
     enphase = Enphase(**cfg.ENPHASE_CONFIG)
 
@@ -142,7 +142,7 @@ def test_find_device_with_mdns():
         properties={"serialnum".encode(): "123456".encode()}
     )
 
-    NetworkUtils.get_mac_from_ip = Mock(return_value="00:00:00:00:00:00")
+    monkeypatch.setattr(NetworkUtils, "get_mac_from_ip", Mock(return_value="00:00:00:00:00:00"))
 
     assert enphase.ip == "localhost"
 
@@ -0,0 +1,206 @@
+import asyncio
+import socket
+import threading
+import time
+from unittest.mock import patch
+import pytest
+from pymodbus.datastore import ModbusSequentialDataBlock, ModbusServerContext, ModbusSlaveContext
+from pymodbus.exceptions import ModbusIOException
+from pymodbus.server import ModbusTcpServer
+from server.devices.inverters.ModbusTCP import ModbusTCP
+from server.devices.inverters.async_modbus_engine import AsyncModbusEngine, AsyncModbusTcpClientAdapter, AsyncModbusTcpSession
+from server.devices.profile_keys import FunctionCodeKey
+
+DEVICE_COUNT = 8
+CADENCE_MS = 1000
+REQUEST_DELAY_S = 0.01  # processing time of the simulated device per request
+
+
+class SlowDataBlock(ModbusSequentialDataBlock):
+    """Registers holding their own address, every read takes REQUEST_DELAY_S like on a real device"""
+
+    def getValues(self, address, count=1):
+        time.sleep(REQUEST_DELAY_S)
+        return super().getValues(address, count)
+
+
+class SimulatedDevice:
+    """A Modbus TCP server with its own event loop thread, so a slow device only blocks itself"""
+
+    def __init__(self):
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            self.port = s.getsockname()[1]
+
+        self.server = None
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.started = threading.Event()
+
+    async def _listen(self):
+        values = [address & 0xFFFF for address in range(0, 40000)]
+        slave = ModbusSlaveContext(ir=SlowDataBlock(0, values), hr=SlowDataBlock(0, values), zero_mode=True)
+        self.server = ModbusTcpServer(ModbusServerContext(slaves=slave, single=True), address=("127.0.0.1", self.port))
+        await self.server.transport_listen()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self._listen())
+        self.started.set()
+        self.loop.run_forever()
+
+    def start(self):
+        self.thread.start()
+        self.started.wait(5)
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self.server.shutdown(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+
+
+@pytest.fixture
+def devices():
+    simulated = [SimulatedDevice() for _ in range(DEVICE_COUNT)]
+    for device in simulated:
+        device.start()
+    yield simulated
+    for device in simulated:
+        device.stop()
+
+
+@pytest.fixture
+def engine():
+    engine = AsyncModbusEngine()
+    yield engine
+    engine.stop()
+
+
+def _connect_async_device(engine: AsyncModbusEngine, port: int) -> ModbusTCP:
+    device = ModbusTCP(ip="127.0.0.1", port=port, slave_id=1, device_type="sungrow")
+    with patch.object(ModbusTCP, "ASYNC_HARVEST", True), patch.object(AsyncModbusEngine, "get_instance", return_value=engine):
+        device._create_client()
+    assert device.client.connect()
+    return device
+
+
+def _expected_harvest(device: ModbusTCP) -> dict:
+    return {address: address & 0xFFFF for block in device.profile.get_read_plan(True) for address in block.registers}
+
+
+def test_async_client_is_opt_in():
+    device = ModbusTCP(ip="127.0.0.1", port=502, slave_id=1, device_type="sungrow")
+    device._create_client()
+    assert not device.supports_async_harvest()
+
+    with patch.object(ModbusTCP, "ASYNC_HARVEST", True):
+        device._create_client()
+    assert isinstance(device.client, AsyncModbusTcpClientAdapter)
+    assert device.supports_async_harvest()
+
+
+def test_async_harvest_matches_read_plan(devices, engine):
+    device = _connect_async_device(engine, devices[0].port)
+
+    harvest = device.read_harvest_data_async(force_verbose=True).result(5)
+    assert harvest == _expected_harvest(device)
+
+    # the blocking interface used when opening and validating the device shares the connection
+    assert device.read_registers(FunctionCodeKey.READ_HOLDING_REGISTERS, 13049, 2) == [13049, 13050]
+    device._close()
+    assert not device.client.socket
+
+
+def test_eight_devices_harvested_within_one_cadence_on_one_thread(devices, engine):
+    async_devices = [_connect_async_device(engine, d.port) for d in devices]
+    threads_before = threading.active_count()
+
+    start = time.monotonic()
+    futures = [device.read_harvest_data_async(force_verbose=True) for device in async_devices]
+    harvests = [future.result(5) for future in futures]
+    elapsed_ms = (time.monotonic() - start) * 1000
+
+    blocks = len(async_devices[0].profile.get_read_plan(True))
+    sequential_ms = DEVICE_COUNT * blocks * REQUEST_DELAY_S * 1000
+    print("Harvested %d devices in %.0f ms, one request at a time would take at least %.0f ms" % (DEVICE_COUNT, elapsed_ms, sequential_ms))
+
+    assert all(harvest == _expected_harvest(async_devices[0]) for harvest in harvests)
+    assert sequential_ms > CADENCE_MS
+    assert elapsed_ms < CADENCE_MS
+    assert threading.active_count() == threads_before  # all the I/O ran on the engine thread
+
+
+class PipeliningClient:
+    """A device that answers every request after 10 ms, also when several are outstanding"""
+
+    def __init__(self):
+        self.connected = True
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.reconnects = 0
+
+    async def connect(self):
+        self.reconnects += 1
+        self.connected = True
+        return True
+
+    def close(self, reconnect=False):
+        self.connected = False
+
+    async def read_holding_registers(self, address, count, slave):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            return address
+        finally:
+            self.in_flight -= 1
+
+
+class DroppingClient(PipeliningClient):
+    """A device that drops every request sent while another one is outstanding"""
+
+    async def read_holding_registers(self, address, count, slave):
+        self.in_flight += 1
+        try:
+            await asyncio.sleep(0.01)
+            if self.in_flight > 1:
+                raise ModbusIOException("no response")
+            return address
+        finally:
+            self.in_flight -= 1
+
+
+def _read_all(session: AsyncModbusTcpSession, count: int) -> list:
+    async def read_all():
+        return await asyncio.gather(*(session.read(FunctionCodeKey.READ_HOLDING_REGISTERS, address, 1, 1) for address in range(count)))
+    return asyncio.run(read_all())
+
+
+def test_session_pipelines_requests():
+    session = AsyncModbusTcpSession("127.0.0.1", 502, max_in_flight=4)
+    session.client = PipeliningClient()
+
+    start = time.monotonic()
+    assert _read_all(session, 8) == list(range(8))
+    assert time.monotonic() - start < 0.08  # two round trips instead of eight
+    assert session.client.max_in_flight == 4
+    assert session.max_in_flight == 4
+
+
+def test_session_falls_back_to_one_request_at_a_time():
+    session = AsyncModbusTcpSession("127.0.0.1", 502, max_in_flight=4)
+    session.client = DroppingClient()
+
+    assert _read_all(session, 6) == list(range(6))
+    assert session.max_in_flight == 1
+    assert session.client.reconnects == 1
+
+
+def test_session_raises_unpipelined_timeouts():
+    session = AsyncModbusTcpSession("127.0.0.1", 502, max_in_flight=1)
+    session.client = DroppingClient()
+    session.client.in_flight = 1  # every request is dropped
+
+    with pytest.raises(ModbusIOException):
+        asyncio.run(session.read(FunctionCodeKey.READ_HOLDING_REGISTERS, 0, 1, 1))
@@ -3,6 +3,7 @@ from unittest.mock import patch, MagicMock
 from server.crypto import crypto
 from server.devices.inverters.modbus_device_scanner import scan_for_modbus_devices
 from server.devices.inverters.ModbusTCP import ModbusTCP
+from server.devices.inverters.modbus_fingerprint import FingerprintMatch
 from server.devices.supported_devices.profiles import ModbusProfile
 from server.devices.supported_devices.profile import RegisterInterval
 from server.devices.profile_keys import ProtocolKey, DataTypeKey, EndiannessKey
@@ -53,10 +54,11 @@ def test_scan_no_hosts_found(mock_get_hosts):
     assert len(devices) == 0
 
 
+@patch('server.devices.inverters.modbus_device_scanner.ModbusFingerprinter')
 @patch('server.devices.inverters.modbus_device_scanner.ModbusTCP')
 @patch('server.devices.inverters.modbus_device_scanner.get_profile_by_manufacturer')
 @patch('server.devices.inverters.modbus_device_scanner.NetworkUtils.get_hosts')
-def test_scan_finds_single_device(mock_get_hosts, mock_get_profile, mock_modbus_class,
+def test_scan_finds_single_device(mock_get_hosts, mock_get_profile, mock_modbus_class, mock_fingerprinter_class,
                                   mock_modbus_device, mock_huawei_profile, blackboard):
     """Test scanning finds a single device successfully and saves it to state"""
 
@@ -74,6 +76,7 @@ def test_scan_finds_single_device(mock_get_hosts, mock_get_profile, mock_modbus_
     mock_modbus_device.device_type = mock_huawei_profile.name
     mock_modbus_device.slave_id = 1
     mock_modbus_class.return_value = mock_modbus_device
+    mock_fingerprinter_class.return_value.identify.return_value = FingerprintMatch(mock_huawei_profile, 1, "SN123", 50.0)
 
     # Run test
     devices = scan_for_modbus_devices(ports=[502], timeout=NetworkUtils.DEFAULT_TIMEOUT, open_devices=[])
@@ -94,6 +97,11 @@ def test_scan_finds_single_device(mock_get_hosts, mock_get_profile, mock_modbus_
     assert saved_devices[0].device_type == mock_huawei_profile.name
     assert saved_devices[0].slave_id == 1
 
+    # the device is created with the fingerprinted profile and slave ID
+    assert mock_modbus_class.call_args.kwargs["device_type"] == mock_huawei_profile.name
+    assert mock_modbus_class.call_args.kwargs["slave_id"] == 1
+    assert mock_modbus_class.call_args.kwargs["sn"] == "SN123"
+
 
 def test_filter_out_open_devices():
     """Test filtering out open devices"""
@@ -0,0 +1,142 @@
+import asyncio
+import socket
+import threading
+import time
+import pytest
+from pymodbus.datastore import ModbusSequentialDataBlock, ModbusServerContext, ModbusSlaveContext
+from pymodbus.server import ModbusTcpServer
+from server.devices.inverters.async_modbus_engine import AsyncModbusEngine
+from server.devices.inverters.modbus_fingerprint import ModbusFingerprinter
+from server.devices.profile_keys import ProtocolKey
+from server.devices.supported_devices.profiles import ModbusDeviceProfiles
+from server.network.network_utils import HostInfo
+from server.tests.server_stress_test.harvest_test.modbus_sim import server as modbus_sim
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _registers(values: dict[int, list[int]], size: int = 65535) -> ModbusSequentialDataBlock:
+    registers = [0] * size
+    for address, words in values.items():
+        registers[address:address + len(words)] = words
+    return ModbusSequentialDataBlock(0, registers)
+
+
+def _string(text: str, count: int) -> list[int]:
+    data = text.encode().ljust(count * 2, b"\x00")
+    return [int.from_bytes(data[i:i + 2], "big") for i in range(0, len(data), 2)]
+
+
+class SimulatedInverter:
+    """A Modbus TCP server on its own event loop thread that only answers the given slave IDs"""
+
+    def __init__(self, input_registers: dict[int, list[int]], slave_ids=(0,)):
+        self.port = _free_port()
+        self.input_registers = input_registers
+        self.slave_ids = slave_ids
+        self.server = None
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.started = threading.Event()
+
+    async def _listen(self):
+        slaves = {slave_id: ModbusSlaveContext(ir=_registers(self.input_registers), hr=_registers({}), zero_mode=True)
+                  for slave_id in self.slave_ids}
+        self.server = ModbusTcpServer(ModbusServerContext(slaves=slaves, single=False), address=("127.0.0.1", self.port))
+        await self.server.transport_listen()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self._listen())
+        self.started.set()
+        self.loop.run_forever()
+
+    def __enter__(self) -> HostInfo:
+        self.thread.start()
+        self.started.wait(5)
+        return HostInfo("127.0.0.1", self.port, "00:11:22:33:44:55")
+
+    def __exit__(self, *args):
+        asyncio.run_coroutine_threadsafe(self.server.shutdown(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+
+
+SUNGROW = {4989: _string("A2231234567", 10), 5035: [500]}  # 50.0 Hz with the sungrow scale, 5.0 Hz with sungrow_sf
+
+
+@pytest.fixture
+def engine():
+    engine = AsyncModbusEngine()
+    yield engine
+    engine.stop()
+
+
+@pytest.fixture
+def profiles():
+    return [p for p in ModbusDeviceProfiles().get_supported_devices()
+            if p.protocol == ProtocolKey.MODBUS and p.registers and p.name != "unknown"]
+
+
+def test_reads_are_shared_by_profiles(profiles, engine):
+    fingerprinter = ModbusFingerprinter(profiles, engine=engine)
+    register_count = sum(2 if p.sn else 1 for p in profiles)
+    assert len(fingerprinter.probes) < register_count
+    assert len(set(fingerprinter.probes)) == len(fingerprinter.probes)
+
+
+def test_identifies_profile_by_sn_and_frequency(profiles, engine):
+    with SimulatedInverter(SUNGROW) as host:
+        match = ModbusFingerprinter(profiles, engine=engine).identify(host)
+
+    assert match.profile.name == "sungrow"
+    assert match.slave_id == 0
+    assert match.sn == "A2231234567"
+    assert match.frequency == pytest.approx(50.0)
+
+
+def test_identifies_slave_id(profiles, engine):
+    with SimulatedInverter(SUNGROW, slave_ids=(1,)) as host:
+        start = time.monotonic()
+        match = ModbusFingerprinter(profiles, engine=engine, timeout=0.5).identify(host)
+        elapsed = time.monotonic() - start
+
+    assert (match.profile.name, match.slave_id) == ("sungrow", 1)
+    assert elapsed < 3  # the slave IDs that do not answer are given up after one read
+
+
+def test_unknown_device_is_not_identified(profiles, engine):
+    with SimulatedInverter({}) as host:
+        assert ModbusFingerprinter(profiles, engine=engine).identify(host) is None
+
+
+def test_closed_port_is_not_identified(profiles, engine):
+    host = HostInfo("127.0.0.1", _free_port(), "00:11:22:33:44:55")
+    assert ModbusFingerprinter(profiles, engine=engine).identify(host) is None
+
+
+def test_identification_time_against_modbus_sim(profiles, engine):
+    port = _free_port()
+    threading.Thread(target=modbus_sim.start_server, args=(port,), daemon=True).start()
+    host = HostInfo("127.0.0.1", port, "00:11:22:33:44:55")
+    fingerprinter = ModbusFingerprinter(profiles, engine=engine)
+    try:
+        for _ in range(50):
+            if fingerprinter.engine.run(fingerprinter.identify_async(host)) is not None:
+                break
+            time.sleep(0.1)  # the simulator is starting
+
+        start = time.monotonic()
+        match = fingerprinter.identify(host)
+        elapsed = time.monotonic() - start
+    finally:
+        modbus_sim.stop_server()
+
+    # a ModbusTCP connect per candidate took at least 1 s each, up to 3 slave IDs x every profile
+    print("%s identified as %s with %d reads per slave ID in %.3f s" % (host, match.profile.name, len(fingerprinter.probes), elapsed))
+    assert match is not None
+    assert elapsed < 1
@@ -0,0 +1,92 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+from server.devices.inverters.ModbusTCP import ModbusTCP
+from server.devices.inverters.ModbusRTU import ModbusRTU
+from server.devices.inverters.ModbusSolarman import ModbusSolarman
+from server.devices.profile_keys import FunctionCodeKey
+import server.tests.config_defaults as cfg
+
+
+READ_LATENCY_S = 0.01
+READS_PER_DEVICE = 20
+
+
+def _tcp_config(ip: str, port: int = 502) -> dict:
+    config = {k: v for k, v in cfg.TCP_ARGS.items() if k != 'connection'}
+    config[ModbusTCP.ip_key()] = ip
+    config[ModbusTCP.port_key()] = port
+    return config
+
+
+def _simulated_device(ip: str) -> ModbusTCP:
+    """A ModbusTCP device whose client answers every read after a fixed round trip time"""
+
+    def read(address, count, slave):
+        time.sleep(READ_LATENCY_S)
+        return MagicMock(registers=[0] * count)
+
+    device = ModbusTCP(**_tcp_config(ip))
+    device.client = MagicMock()
+    device.client.read_holding_registers.side_effect = read
+    return device
+
+
+def _reads_per_second(device_count: int) -> float:
+    devices = [_simulated_device(f"192.168.1.{i + 10}") for i in range(device_count)]
+
+    def harvest(device: ModbusTCP):
+        for _ in range(READS_PER_DEVICE):
+            device.read_registers(FunctionCodeKey.READ_HOLDING_REGISTERS, 40000, 10)
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(harvest, devices))
+    elapsed = time.monotonic() - start
+
+    return device_count * READS_PER_DEVICE / elapsed
+
+
+def test_devices_on_same_transport_share_lock():
+    a = ModbusTCP(**_tcp_config("192.168.1.10"))
+    b = ModbusTCP(**_tcp_config("192.168.1.10"))
+
+    assert a._lock is b._lock
+
+
+def test_devices_on_different_transports_do_not_share_lock():
+    a = ModbusTCP(**_tcp_config("192.168.1.10"))
+    b = ModbusTCP(**_tcp_config("192.168.1.11"))
+    c = ModbusTCP(**_tcp_config("192.168.1.10", 503))
+
+    assert a._lock is not b._lock
+    assert a._lock is not c._lock
+
+
+def test_solarman_and_tcp_on_same_host_do_not_share_lock():
+    tcp = ModbusTCP(**_tcp_config("192.168.1.10"))
+    solarman = ModbusSolarman(**{k: v for k, v in cfg.SOLARMAN_ARGS.items() if k != 'connection'})
+    solarman.ip = "192.168.1.10"
+    solarman.port = 502
+
+    assert tcp._lock is not solarman._lock
+
+
+def test_rtu_slaves_on_same_serial_port_share_lock():
+    config = {k: v for k, v in cfg.RTU_ARGS.items() if k != 'connection'}
+    a = ModbusRTU(**{**config, ModbusRTU.port_key(): "/dev/ttyUSB0", ModbusRTU.slave_id_key(): 1})
+    b = ModbusRTU(**{**config, ModbusRTU.port_key(): "/dev/ttyUSB0", ModbusRTU.slave_id_key(): 2})
+    c = ModbusRTU(**{**config, ModbusRTU.port_key(): "/dev/ttyUSB1", ModbusRTU.slave_id_key(): 1})
+
+    assert a._lock is b._lock
+    assert a._lock is not c._lock
+
+
+def test_aggregate_read_rate_grows_with_device_count():
+    # benchmark: with one lock per transport the worker pool reads independent devices in parallel
+    rates = {count: _reads_per_second(count) for count in (1, 2, 4)}
+
+    print("Aggregate reads per second by device count: %s" % {k: round(v) for k, v in rates.items()})
+
+    assert rates[2] > rates[1] * 1.5
+    assert rates[4] > rates[1] * 2.5
@@ -0,0 +1,172 @@
+from server.devices.inverters.ModbusTCP import ModbusTCP
+from server.devices.profile_keys import FunctionCodeKey, PollClassKey, ProfileKey
+from server.devices.supported_devices.profile import DEFAULT_POLL_INTERVALS_MS, ModbusProfile, RegisterInterval
+from server.devices.supported_devices.profiles import ModbusDeviceProfiles
+from unittest.mock import Mock, patch
+import server.tests.config_defaults as cfg
+import pytest
+
+
+HR = FunctionCodeKey.READ_HOLDING_REGISTERS
+
+
+class PollClassProfile(ModbusProfile):
+    def __init__(self, poll_intervals: dict = None):
+        data = {
+            ProfileKey.NAME: "poll_class",
+            ProfileKey.MAKER: "Test",
+            ProfileKey.VERSION: "v1",
+            ProfileKey.VERBOSE_ALWAYS: True,
+            ProfileKey.DISPLAY_NAME: "Poll class",
+            ProfileKey.PROTOCOL: "modbus",
+            ProfileKey.DESCRIPTION: "",
+            ProfileKey.KEYWORDS: [],
+            ProfileKey.ALWAYS_INCLUDE: [],
+        }
+        if poll_intervals:
+            data[ProfileKey.POLL_INTERVALS] = poll_intervals
+        super().__init__(data)
+        self.registers_verbose = [
+            RegisterInterval(HR, 0, 10, poll_class=PollClassKey.STATIC),
+            RegisterInterval(HR, 100, 10, poll_class=PollClassKey.SLOW),
+            RegisterInterval(HR, 200, 10),
+        ]
+
+    def profile_is_valid(self, device) -> bool:
+        return True
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    clock = Clock()
+    with patch("server.devices.inverters.modbus.time.monotonic", clock):
+        yield clock
+
+
+@pytest.fixture
+def modbus_tcp():
+    device = ModbusTCP(**{k: v for k, v in cfg.TCP_ARGS.items() if k != 'connection'})
+    device.profile = PollClassProfile()
+    device.reads = []
+    device.value_offset = 0
+
+    def read_registers(function_code, address, size):
+        device.reads.append(address)
+        return [address + i + device.value_offset for i in range(size)]
+
+    device.read_registers = read_registers
+    return device
+
+
+def _all_registers() -> dict:
+    return {address: address for start in (0, 100, 200) for address in range(start, start + 10)}
+
+
+def test_read_plan_per_poll_class():
+    profile = PollClassProfile()
+
+    assert profile.get_poll_classes(True) == [PollClassKey.FAST, PollClassKey.SLOW, PollClassKey.STATIC]
+    assert [block.start_register for block in profile.get_read_plan(True, PollClassKey.FAST)] == [200]
+    assert [block.start_register for block in profile.get_read_plan(True, PollClassKey.STATIC)] == [0]
+    assert len(profile.get_read_plan(True)) == 3
+    assert profile.get_poll_class_registers(True, PollClassKey.SLOW) == frozenset(range(100, 110))
+
+
+def test_untagged_intervals_are_fast():
+    profile = ModbusDeviceProfiles().get("solaredge")
+    assert profile.get_poll_classes(True) == [PollClassKey.FAST]
+    assert profile.get_poll_classes(False) == [PollClassKey.FAST]
+
+
+def test_profile_overrides_poll_intervals():
+    profile = PollClassProfile({PollClassKey.SLOW: 5000})
+    assert profile.poll_intervals_ms[PollClassKey.SLOW] == 5000
+    assert profile.poll_intervals_ms[PollClassKey.STATIC] == DEFAULT_POLL_INTERVALS_MS[PollClassKey.STATIC]
+
+
+def test_slow_classes_are_served_from_the_cache(modbus_tcp, clock):
+    assert modbus_tcp.read_harvest_data(True) == _all_registers()
+    assert sorted(modbus_tcp.reads) == [0, 100, 200]
+
+    # one second later only the fast registers are read, the others keep their cached values
+    modbus_tcp.reads.clear()
+    modbus_tcp.value_offset = 1
+    clock.now += 1
+    harvest = modbus_tcp.read_harvest_data(True)
+    assert modbus_tcp.reads == [200]
+    assert harvest.keys() == _all_registers().keys()
+    assert harvest[200] == 201
+    assert harvest[100] == 100
+
+    # the slow class is due after its interval, the static class is not
+    modbus_tcp.reads.clear()
+    clock.now += DEFAULT_POLL_INTERVALS_MS[PollClassKey.SLOW] / 1000
+    harvest = modbus_tcp.read_harvest_data(True)
+    assert sorted(modbus_tcp.reads) == [100, 200]
+    assert harvest[100] == 101
+    assert harvest[0] == 0
+
+
+def test_failed_read_is_retried_before_the_interval(modbus_tcp, clock):
+    read_registers = modbus_tcp.read_registers
+
+    def fail_static(function_code, address, size):
+        if address == 0:
+            modbus_tcp.reads.append(address)
+            return []
+        return read_registers(function_code, address, size)
+
+    modbus_tcp.read_registers = fail_static
+    harvest = modbus_tcp.read_harvest_data(True)
+    assert 0 not in harvest
+
+    # the static class was not read, it is read again on the next harvest and then served from the cache
+    modbus_tcp.read_registers = read_registers
+    modbus_tcp.reads.clear()
+    clock.now += 1
+    assert modbus_tcp.read_harvest_data(True) == _all_registers()
+    assert sorted(modbus_tcp.reads) == [0, 200]
+
+    modbus_tcp.reads.clear()
+    clock.now += 1
+    modbus_tcp.read_harvest_data(True)
+    assert modbus_tcp.reads == [200]
+
+
+def test_offline_device_is_not_harvested_from_the_cache(modbus_tcp, clock):
+    assert modbus_tcp.read_harvest_data(True) == _all_registers()
+
+    for offline in (lambda function_code, address, size: [], Mock(side_effect=TimeoutError("timeout"))):
+        modbus_tcp.read_registers = offline  # no answer (read_registers returns []) or an error
+        clock.now += 1
+        with pytest.raises(Exception):
+            modbus_tcp.read_harvest_data(True)
+
+
+def test_deye_bus_traffic(modbus_tcp, clock):
+    # ten minutes of harvests every second with the poll classes of the deye profile
+    modbus_tcp.profile = ModbusDeviceProfiles().get("deye")
+    count = {"registers": 0}
+
+    def read_registers(function_code, address, size):
+        count["registers"] += size
+        return [0] * size
+
+    modbus_tcp.read_registers = read_registers
+    harvests = 600
+    for _ in range(harvests):
+        harvest = modbus_tcp.read_harvest_data(True)
+        clock.now += 1
+
+    all_registers = sum(block.count for block in modbus_tcp.profile.get_read_plan(True))
+    print("Read %d registers instead of %d" % (count["registers"], all_registers * harvests))
+    assert len(harvest) == sum(interval.offset for interval in modbus_tcp.profile.get_registers_verbose())
+    assert count["registers"] * 3 < all_registers * harvests
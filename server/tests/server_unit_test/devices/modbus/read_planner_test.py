@@ -0,0 +1,179 @@
+import asyncio
+from server.devices.inverters.ModbusTCP import ModbusTCP
+from server.devices.inverters.modbus import ReadRejectedError
+from server.devices.profile_keys import FunctionCodeKey
+from server.devices.supported_devices.profile import RegisterInterval
+from server.devices.supported_devices.profiles import ModbusDeviceProfiles
+from server.devices.supported_devices.read_planner import ReadPlanner, MAX_REGISTERS_PER_READ
+import server.tests.config_defaults as cfg
+from unittest.mock import Mock, patch
+import pytest
+
+
+HR = FunctionCodeKey.READ_HOLDING_REGISTERS
+IR = FunctionCodeKey.READ_INPUT_REGISTERS
+
+
+def _scattered_intervals() -> list[RegisterInterval]:
+    # 20 small intervals spread over two areas of the register map
+    starts = [5000, 5003, 5005, 5010, 5012, 5016, 5020, 5021, 5030, 5035,
+              13000, 13002, 13005, 13008, 13012, 13019, 13021, 13025, 13030, 13033]
+    return [RegisterInterval(IR, start, 2) for start in starts]
+
+
+@pytest.fixture
+def modbus_tcp():
+    device = ModbusTCP(**{k: v for k, v in cfg.TCP_ARGS.items() if k != 'connection'})
+
+    def read_registers(function_code, address, size):
+        return [(address + i) * 10 for i in range(size)]  # value is derived from the register address
+
+    device.read_registers = read_registers
+    return device
+
+
+def test_scattered_intervals_need_few_reads():
+    blocks = ReadPlanner().plan(_scattered_intervals())
+    assert len(blocks) == 2
+
+
+def test_plan_without_gap_tolerance_only_merges_adjacent():
+    intervals = [RegisterInterval(HR, 100, 2), RegisterInterval(HR, 102, 2), RegisterInterval(HR, 105, 1)]
+    blocks = ReadPlanner(gap_tolerance=0).plan(intervals)
+
+    assert [(b.start_register, b.count) for b in blocks] == [(100, 4), (105, 1)]
+
+
+def test_plan_respects_pdu_limit():
+    intervals = [RegisterInterval(HR, start, 10) for start in range(0, 500, 12)]
+    blocks = ReadPlanner().plan(intervals)
+
+    assert all(block.count <= MAX_REGISTERS_PER_READ for block in blocks)
+    assert sum(len(block.registers) for block in blocks) == 10 * len(intervals)
+
+
+def test_plan_separates_function_codes():
+    intervals = [RegisterInterval(HR, 100, 2), RegisterInterval(IR, 102, 2)]
+    blocks = ReadPlanner().plan(intervals)
+
+    assert len(blocks) == 2
+    assert {block.function_code for block in blocks} == {HR, IR}
+
+
+def test_plan_includes_scale_factor_register():
+    blocks = ReadPlanner().plan([RegisterInterval(HR, 40085, 1, scale_factor_register=40086)])
+
+    assert len(blocks) == 1
+    assert blocks[0].registers == [40085, 40086]
+
+
+def test_split_returns_only_requested_registers():
+    block = ReadPlanner().plan([RegisterInterval(HR, 10, 2), RegisterInterval(HR, 15, 1)])[0]
+
+    assert (block.start_register, block.count) == (10, 6)
+    assert block.split([0, 1, 2, 3, 4, 5]) == {10: 0, 11: 1, 15: 5}
+
+
+def test_read_plan_is_built_once_per_profile():
+    profile = ModbusDeviceProfiles().get("sdm630")
+
+    assert profile.get_read_plan(False) is profile.get_read_plan(False)
+    assert len(profile.get_read_plan(False)) < len(profile.get_registers())
+
+
+def test_harvest_matches_interval_reads(modbus_tcp):
+    res = modbus_tcp.read_harvest_data(True)
+
+    expected = {}
+    for interval in modbus_tcp.profile.get_registers_verbose():
+        for address in range(interval.start_register, interval.start_register + interval.offset):
+            expected[address] = address * 10
+    assert res == expected
+
+
+def test_harvest_falls_back_to_interval_reads_when_block_is_rejected(modbus_tcp):
+    calls = []
+
+    def read_registers(function_code, address, size):
+        calls.append((address, size))
+        if size == 4:
+            raise ReadRejectedError("illegal data address")  # the merged read is rejected
+        return [(address + i) * 10 for i in range(size)]
+
+    with patch.object(modbus_tcp.profile, "get_read_plan", return_value=ReadPlanner().plan([RegisterInterval(HR, 10, 1), RegisterInterval(HR, 13, 1)])):
+        modbus_tcp.read_registers = read_registers
+        assert modbus_tcp.read_harvest_data(True) == {10: 100, 13: 130}
+        assert calls == [(10, 4), (10, 1), (13, 1)]
+
+        calls.clear()
+        assert modbus_tcp.read_harvest_data(True) == {10: 100, 13: 130}
+        assert calls == [(10, 1), (13, 1)]
+
+
+def test_harvest_retries_block_after_transient_failure(modbus_tcp):
+    calls = []
+    failures = [TimeoutError("timeout"), []]  # an exception and a read without an answer (read_registers returns [])
+
+    def read_registers(function_code, address, size):
+        calls.append((address, size))
+        if failures:
+            failure = failures.pop(0)
+            if isinstance(failure, Exception):
+                raise failure
+            return failure
+        return [(address + i) * 10 for i in range(size)]
+
+    with patch.object(modbus_tcp.profile, "get_read_plan", return_value=ReadPlanner().plan([RegisterInterval(HR, 10, 1), RegisterInterval(HR, 13, 1)])):
+        modbus_tcp.read_registers = read_registers
+        for _ in range(2):
+            with pytest.raises(Exception):
+                modbus_tcp.read_harvest_data(True)  # nothing was read
+
+        assert modbus_tcp.read_harvest_data(True) == {10: 100, 13: 130}
+        assert calls == [(10, 4)] * 3
+        assert not modbus_tcp._split_blocks
+
+
+def test_coalesced_read_raises_when_the_device_is_offline(modbus_tcp):
+    modbus_tcp.read_registers = Mock(side_effect=TimeoutError("timeout"))
+    with patch.object(modbus_tcp.profile, "get_read_plan", return_value=ReadPlanner().plan([RegisterInterval(HR, 10, 1), RegisterInterval(HR, 13, 1)])):
+        with pytest.raises(TimeoutError):
+            modbus_tcp.read_harvest_data(True)
+    assert modbus_tcp.read_registers.call_args.args[1:] == (10, 4)
+    assert not modbus_tcp._split_blocks
+
+
+def test_async_harvest_splits_only_rejected_block(modbus_tcp):
+    block = ReadPlanner().plan([RegisterInterval(HR, 10, 1), RegisterInterval(HR, 13, 1)])[0]
+    failure = {"error": TimeoutError("timeout")}
+
+    async def read_registers_async(function_code, address, size):
+        if size == 4 and failure["error"]:
+            raise failure["error"]
+        return [(address + i) * 10 for i in range(size)]
+
+    modbus_tcp._read_registers_async = read_registers_async
+    with pytest.raises(TimeoutError):
+        asyncio.run(modbus_tcp._read_block_async(block))
+    assert block not in modbus_tcp._split_blocks
+
+    failure["error"] = ReadRejectedError("illegal data address")
+    assert asyncio.run(modbus_tcp._read_block_async(block)) == {10: 100, 13: 130}
+    assert block in modbus_tcp._split_blocks
+
+
+def test_async_harvest_of_offline_device_raises(modbus_tcp):
+    plan = ReadPlanner().plan([RegisterInterval(HR, 10, 1), RegisterInterval(HR, 13, 1)])
+    online = {"up": True}
+
+    async def read_registers_async(function_code, address, size):
+        if not online["up"]:
+            raise ConnectionResetError("connection reset")
+        return [(address + i) * 10 for i in range(size)]
+
+    modbus_tcp._read_registers_async = read_registers_async
+    with patch.object(modbus_tcp.profile, "get_read_plan", return_value=plan):
+        assert asyncio.run(modbus_tcp._read_harvest_data_async(True)) == {10: 100, 13: 130}
+        online["up"] = False
+        with pytest.raises(ConnectionResetError):
+            asyncio.run(modbus_tcp._read_harvest_data_async(True))
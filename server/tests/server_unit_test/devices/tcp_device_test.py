@@ -1,9 +1,10 @@
 import pytest
+from unittest.mock import patch
 
 from server.devices.inverters.ModbusSolarman import ModbusSolarman
 from server.devices.inverters.ModbusTCP import ModbusTCP
 from server.devices.inverters.modbus import Modbus
-from server.network.network_utils import HostInfo
+from server.network.network_utils import HostInfo, NetworkUtils
 import server.tests.config_defaults as cfg
 
 
@@ -33,3 +34,23 @@ def test_compare_host(modbus_devices):
 
     modbus_devices[0].ip = "1.2.3.5"
     assert not modbus_devices[0].compare_host(modbus_devices[1])
+
+
+def test_find_moved_device_by_mac(modbus_devices):
+    device = modbus_devices[0]
+    device.mac = "aa:bb:cc:dd:ee:01"
+    with patch.object(NetworkUtils, "get_ip_from_mac", return_value="1.2.3.5"), \
+            patch.object(NetworkUtils, "is_port_open", return_value=True), \
+            patch.object(NetworkUtils, "get_hosts") as get_hosts:
+        clone = device.find_device()
+    assert clone.ip == "1.2.3.5"
+    get_hosts.assert_not_called()
+
+
+def test_find_device_scans_when_mac_is_not_known(modbus_devices):
+    device = modbus_devices[0]
+    with patch.object(NetworkUtils, "get_ip_from_mac", return_value=None), \
+            patch.object(NetworkUtils, "get_hosts", return_value=[HostInfo("1.2.3.6", 502, device.mac)]) as get_hosts:
+        clone = device.find_device()
+    assert clone.ip == "1.2.3.6"
+    get_hosts.assert_called_once()
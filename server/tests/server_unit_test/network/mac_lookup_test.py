@@ -0,0 +1,119 @@
+import time
+from unittest.mock import Mock, patch
+import pytest
+from server.network.mac_lookup import MacLookupService
+from server.network.oui import OuiDatabase
+
+
+@pytest.fixture(autouse=True)
+def cache():
+    MacLookupService.clear_cache()
+    yield
+    MacLookupService.clear_cache()
+
+
+@pytest.fixture
+def api():
+    reply = Mock(status_code=200)
+    reply.json.return_value = {"success": True, "found": True, "company": "Growatt New Energy"}
+    with patch("server.network.mac_lookup.requests.get", return_value=reply) as get:
+        yield get
+
+
+def test_oui_notations():
+    assert OuiDatabase.oui("00:40:AD:12:34:56") == 0x0040AD
+    assert OuiDatabase.oui("00-40-ad-12-34-56") == 0x0040AD
+    assert OuiDatabase.oui("0040.ad12.3456") == 0x0040AD
+    assert OuiDatabase.oui("02:40:ad:12:34:56") is None  # locally administered
+    assert OuiDatabase.oui("00:40:ad") is None
+    assert OuiDatabase.oui("zz:40:ad:12:34:56") is None
+
+
+def test_table(tmp_path):
+    path = str(tmp_path / "oui.txt")
+    OuiDatabase.write_table([(0xA0BBCC, "B  Company\n"), (0x001122, "A Company"), (0x001123, "A Company")], path)
+    db = OuiDatabase(path)
+
+    assert len(db) == 3
+    assert db.lookup("00:11:22:33:44:55") == "A Company"
+    assert db.lookup("00:11:23:33:44:55") == "A Company"
+    assert db.lookup("a0:bb:cc:00:00:00") == "B Company"
+    assert db.lookup("00:11:24:33:44:55") is None
+
+
+def test_ieee_csv(tmp_path):
+    path = tmp_path / "oui.csv"
+    path.write_text('Registry,Assignment,Organization Name,Organization Address\n'
+                    'MA-L,0040AD,SMA Regelsysteme GmbH,"Hannoversche Str. 1-5 Niestetal  DE 34266 "\n')
+    assert OuiDatabase.read_ieee_csv(str(path)) == [(0x0040AD, "SMA Regelsysteme GmbH")]
+
+
+def test_ieee_txt(tmp_path):
+    path = tmp_path / "oui.txt"
+    path.write_text('OUI/MA-L\t\t\tOrganization\n\n'
+                    '00-40-AD   (hex)\t\tSMA REGELSYSTEME GMBH\n'
+                    '0040AD     (base 16)\t\tSMA REGELSYSTEME GMBH\n'
+                    '\t\t\t\tHannoversche Str. 1-5\n\n'
+                    'AC-19-9F   (hex)\t\tSUNGROW POWER SUPPLY CO.,LTD.\n'
+                    'AC199F     (base 16)\t\tSUNGROW POWER SUPPLY CO.,LTD.\n')
+    assert OuiDatabase.read_ieee_txt(str(path)) == [(0x0040AD, "SMA REGELSYSTEME GMBH"), (0xAC199F, "SUNGROW POWER SUPPLY CO.,LTD.")]
+
+
+def test_missing_table(tmp_path):
+    assert OuiDatabase(str(tmp_path / "missing")).lookup("00:40:ad:12:34:56") is None
+
+
+def test_shipped_table_lookups_are_fast():
+    db = OuiDatabase()
+    assert "sma" in db.lookup("00:40:ad:12:34:56").lower()
+
+    count = 10000
+    start = time.perf_counter()
+    for _ in range(count):
+        db.lookup("00:40:ad:12:34:56")
+    elapsed_us = (time.perf_counter() - start) * 1e6 / count
+    print("%.1f us per lookup" % elapsed_us)
+    assert elapsed_us < 100
+
+
+def test_shipped_table_covers_the_module_vendors():
+    db = OuiDatabase()
+    keywords = {"24:0a:c4": "espressif", "98:d8:63": "high-flying", "d4:ca:6e": "u-blox ag", "00:03:ac": "fronius",
+                "00:e0:fc": "huawei", "00:40:ad": "sma", "84:d6:c5": "solaredge", "ac:19:9f": "sungrow", "f0:c1:ce": "goodwe"}
+    for prefix, keyword in keywords.items():
+        assert keyword in db.lookup(prefix + ":12:34:56").lower(), keyword
+
+
+def test_offline_lookup_does_not_go_online(api):
+    assert "sma" in MacLookupService.get_manufacturer("00:40:ad:12:34:56").lower()
+    api.assert_not_called()
+
+
+def test_online_fallback_is_cached_per_oui(api):
+    assert MacLookupService.get_manufacturer("a0:bb:cc:00:00:01") == "Growatt New Energy"
+    assert MacLookupService.get_manufacturer("a0:bb:cc:00:00:02") == "Growatt New Energy"
+    assert api.call_count == 1
+    assert api.call_args.kwargs["timeout"] == MacLookupService.TIMEOUT_S
+
+
+def test_failed_online_lookup_is_retried_later(api):
+    api.side_effect = Exception("offline")
+    assert MacLookupService.get_manufacturer("a0:bb:cc:00:00:01") is None
+    assert MacLookupService.get_manufacturer("a0:bb:cc:00:00:01") is None
+    assert api.call_count == 1
+
+    with patch.object(MacLookupService, "NEGATIVE_CACHE_TTL_S", 0):
+        MacLookupService.get_manufacturer("a0:bb:cc:00:00:01")
+    assert api.call_count == 2
+
+
+def test_online_fallback_can_be_disabled(api):
+    with patch.object(MacLookupService, "online_fallback", False):
+        assert MacLookupService.get_manufacturer("a0:bb:cc:00:00:01") is None
+    api.assert_not_called()
+
+
+def test_invalid_mac_is_not_looked_up(api):
+    assert MacLookupService.get_manufacturer("00:00:00:00:00:00") is None
+    assert MacLookupService.get_manufacturer("not a mac") is None
+    api.assert_not_called()
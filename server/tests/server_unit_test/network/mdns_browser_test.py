@@ -0,0 +1,130 @@
+import threading
+from unittest.mock import MagicMock, patch
+import pytest
+from server.network.mdns import mdns
+from server.network.mdns.mdns import MdnsBrowser, MdnsEvent
+
+ENVOY = "_enphase-envoy._tcp.local."
+P1 = "_jemacp1._tcp.local."
+
+
+def _info(address: str, port: int = 80, properties=None):
+    info = MagicMock()
+    info.parsed_addresses.return_value = [address]
+    info.port = port
+    info.properties = properties or {b"serialnum": b"123"}
+    return info
+
+
+@pytest.fixture
+def zeroconf():
+    zc = MagicMock()
+    zc.get_service_info.side_effect = lambda type_, name: _info("192.168.1.10" if type_ == ENVOY else "192.168.1.20")
+    return zc
+
+
+@pytest.fixture
+def browser(zeroconf):
+    with patch("server.network.mdns.mdns.ServiceBrowser") as service_browser:
+        browser = MdnsBrowser(lambda: zeroconf)
+        browser.service_browser = service_browser
+        yield browser
+
+
+def test_browses_known_services_once(browser: MdnsBrowser, zeroconf):
+    browser.browse([ENVOY, "_other._tcp.local."])
+    browser.browse([ENVOY, "_other._tcp.local."])
+
+    browsed = [call.args[1] for call in browser.service_browser.call_args_list]
+    assert browsed == MdnsBrowser.KNOWN_SERVICES + ["_other._tcp.local."]
+    assert all(call.args[0] is zeroconf for call in browser.service_browser.call_args_list)
+
+
+def test_cache_follows_add_update_remove(browser: MdnsBrowser, zeroconf):
+    browser.browse([ENVOY])
+    browser.add_service(zeroconf, ENVOY, "envoy." + ENVOY)
+    browser.add_service(zeroconf, P1, "p1." + P1)
+
+    assert [s.address for s in browser.services([ENVOY])] == ["192.168.1.10"]
+    assert len(browser.services()) == 2
+    assert browser.services([ENVOY])[0].properties == {"serialnum": "123"}
+
+    zeroconf.get_service_info.side_effect = lambda type_, name: _info("192.168.1.11")
+    browser.update_service(zeroconf, ENVOY, "envoy." + ENVOY)
+    assert [s.address for s in browser.services([ENVOY])] == ["192.168.1.11"]
+
+    browser.remove_service(zeroconf, ENVOY, "envoy." + ENVOY)
+    assert browser.services([ENVOY]) == []
+    assert len(browser.services()) == 1
+
+
+def test_service_without_info_is_not_cached(browser: MdnsBrowser, zeroconf):
+    zeroconf.get_service_info.side_effect = None
+    zeroconf.get_service_info.return_value = None
+    browser.add_service(zeroconf, ENVOY, "envoy." + ENVOY)
+    assert browser.services() == []
+
+
+def test_subscribe(browser: MdnsBrowser, zeroconf):
+    browser.add_service(zeroconf, ENVOY, "envoy." + ENVOY)
+    events = []
+    callback = lambda event, service: events.append((event, service.name))
+    browser.subscribe(callback, [ENVOY])
+    assert events == [(MdnsEvent.ADDED, "envoy." + ENVOY)]  # the services already found are replayed
+
+    browser.add_service(zeroconf, P1, "p1." + P1)  # another type
+    browser.remove_service(zeroconf, ENVOY, "envoy." + ENVOY)
+    browser.remove_service(zeroconf, ENVOY, "envoy." + ENVOY)  # already removed
+    assert events == [(MdnsEvent.ADDED, "envoy." + ENVOY), (MdnsEvent.REMOVED, "envoy." + ENVOY)]
+
+    browser.unsubscribe(callback)
+    browser.add_service(zeroconf, ENVOY, "envoy." + ENVOY)
+    assert len(events) == 2
+
+
+def test_failing_callback_does_not_stop_the_others(browser: MdnsBrowser, zeroconf):
+    events = []
+    browser.subscribe(MagicMock(side_effect=Exception("boom")))
+    browser.subscribe(lambda event, service: events.append(event))
+    browser.add_service(zeroconf, ENVOY, "envoy." + ENVOY)
+    assert events == [MdnsEvent.ADDED]
+    assert len(browser.services()) == 1
+
+
+def test_close(browser: MdnsBrowser, zeroconf):
+    browser.browse([ENVOY])
+    browser.add_service(zeroconf, ENVOY, "envoy." + ENVOY)
+    browser.close()
+
+    assert browser.services() == []
+    assert browser.browsing_for(ENVOY) == 0
+    zeroconf.close.assert_called_once()
+    browser.service_browser.return_value.cancel.assert_called()
+
+
+def test_scan_waits_only_until_browsed_for_duration(browser: MdnsBrowser, zeroconf):
+    with patch.object(MdnsBrowser, "_instance", browser), \
+         patch("server.network.mdns.mdns.time.sleep") as sleep:
+        browser.add_service(zeroconf, ENVOY, "envoy." + ENVOY)
+        assert [s.name for s in mdns.scan(5, ENVOY)] == ["envoy." + ENVOY]
+        assert sleep.call_args.args[0] == pytest.approx(5, abs=0.1)
+
+        sleep.reset_mock()
+        browser._browsing_since[ENVOY] -= 5  # browsed long enough, the cache is returned right away
+        assert [s.name for s in mdns.scan(5, ENVOY)] == ["envoy." + ENVOY]
+        sleep.assert_not_called()
+
+
+def test_concurrent_scans_get_the_services(browser: MdnsBrowser, zeroconf):
+    browser.add_service(zeroconf, ENVOY, "envoy." + ENVOY)
+    results = []
+
+    with patch.object(MdnsBrowser, "_instance", browser):
+        threads = [threading.Thread(target=lambda: results.append(mdns.scan(0.2, ENVOY))) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert [[s.name for s in result] for result in results] == [["envoy." + ENVOY]] * 3
+    assert not mdns.is_scanning()
@@ -0,0 +1,61 @@
+from unittest.mock import patch
+import pytest
+from server.network.neighbour_table import NeighbourTable
+from server.network.network_utils import NetworkUtils
+
+HEADER = "IP address       HW type     Flags       HW address            Mask     Device\n"
+
+
+def _line(ip: str, mac: str, flags: str = "0x2") -> str:
+    return f"{ip:<17}0x1         {flags:<12}{mac:<22}*        eth0\n"
+
+
+@pytest.fixture
+def arp_file(tmp_path):
+    path = tmp_path / "arp"
+    path.write_text(HEADER + _line("192.168.1.10", "aa:bb:cc:dd:ee:01") + _line("192.168.1.11", "00:00:00:00:00:00", "0x0"))
+    return path
+
+
+@pytest.fixture
+def table(arp_file):
+    return NeighbourTable(str(arp_file))
+
+
+def test_lookups(table: NeighbourTable):
+    assert table.get_mac("192.168.1.10") == "aa:bb:cc:dd:ee:01"
+    assert table.get_ip("AA:BB:CC:DD:EE:01") == "192.168.1.10"
+    assert table.get_mac("192.168.1.11") == "00:00:00:00:00:00"
+    assert table.get_ip("00:00:00:00:00:00") is None  # incomplete entries are not in the MAC index
+    assert table.entries()[0] == {"ip": "192.168.1.10", "hw": "0x1", "flags": "0x2", "mac": "aa:bb:cc:dd:ee:01", "mask": "*", "device": "eth0"}
+
+
+def test_hits_are_cached_until_the_ttl_has_passed(table: NeighbourTable, arp_file):
+    table.get_mac("192.168.1.10")
+    arp_file.write_text(HEADER + _line("192.168.1.10", "aa:bb:cc:dd:ee:02"))
+    assert table.get_mac("192.168.1.10") == "aa:bb:cc:dd:ee:01"
+
+    table.invalidate()
+    assert table.get_mac("192.168.1.10") == "aa:bb:cc:dd:ee:02"
+
+
+def test_miss_reads_the_table_again(table: NeighbourTable, arp_file):
+    assert table.get_mac("192.168.1.12") is None
+    arp_file.write_text(HEADER + _line("192.168.1.12", "aa:bb:cc:dd:ee:03"))
+    assert table.get_mac("192.168.1.12") == "aa:bb:cc:dd:ee:03"
+    assert table.get_ip("aa:bb:cc:dd:ee:03") == "192.168.1.12"
+
+
+def test_missing_file_is_an_empty_table(tmp_path):
+    table = NeighbourTable(str(tmp_path / "missing"))
+    assert table.get_mac("192.168.1.10") is None
+    assert table.entries() == []
+
+
+def test_network_utils_lookups(table: NeighbourTable):
+    with patch.object(NeighbourTable, "get_instance", return_value=table):
+        assert NetworkUtils.get_mac_from_ip("http://192.168.1.10:502") == "aa:bb:cc:dd:ee:01"
+        assert NetworkUtils.get_mac_from_ip("192.168.1.99") == NetworkUtils.INVALID_MAC
+        assert NetworkUtils.get_ip_from_mac("aa:bb:cc:dd:ee:01") == "192.168.1.10"
+        assert NetworkUtils.get_ip_from_mac(NetworkUtils.INVALID_MAC) is None
+        assert len(NetworkUtils.arp_table()) == 2
@@ -0,0 +1,116 @@
+import asyncio
+import socket
+import time
+from unittest.mock import patch
+import pytest
+from server.network.network_utils import HostInfo, NetworkUtils
+from server.network.port_scanner import PortScanner, RttEstimator
+
+
+@pytest.fixture
+def listeners():
+    """Two listening ports on 127.0.0.1, the other loopback addresses refuse them"""
+    sockets = []
+    for _ in range(2):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind(("127.0.0.1", 0))
+        sock.listen(16)
+        sockets.append(sock)
+    yield [sock.getsockname()[1] for sock in sockets]
+    for sock in sockets:
+        sock.close()
+
+
+def test_targets_of_overlapping_networks():
+    targets = list(PortScanner.targets(["10.0.0.0/30", "10.0.0.1/32", "10.0.0.2"], [502, 1502]))
+    assert targets == [("10.0.0.1", 502), ("10.0.0.1", 1502), ("10.0.0.2", 502), ("10.0.0.2", 1502)]
+
+
+def test_rtt_estimator_timeout():
+    rtt = RttEstimator(0.5, 5)
+    assert rtt.timeout == RttEstimator.INITIAL_TIMEOUT_S
+
+    for _ in range(20):
+        rtt.add(0.001)
+    assert rtt.timeout == 0.5
+
+    for _ in range(20):
+        rtt.add(2.0)
+    assert 2.0 <= rtt.timeout <= 5
+
+
+def test_scan_finds_open_ports(listeners):
+    ports = listeners + [1]
+    found = PortScanner(5, max_concurrency=4).scan_blocking(["127.0.0.0/29"], ports)
+    assert sorted(found) == sorted(("127.0.0.1", port) for port in listeners)
+
+
+def test_scan_streams_results(listeners):
+    streamed = []
+    found = PortScanner(5).scan_blocking(["127.0.0.1"], listeners, lambda ip, port: streamed.append((ip, port)))
+    assert streamed == found
+    assert len(found) == 2
+
+
+def test_unanswered_probes_follow_the_observed_round_trip(listeners):
+    sock_connect = asyncio.selector_events.BaseSelectorEventLoop.sock_connect
+
+    async def silent_hosts(loop, sock, address):
+        if address[0].startswith("10."):
+            await asyncio.sleep(60)  # a host that does not answer
+        return await sock_connect(loop, sock, address)
+
+    scanner = PortScanner(5, min_timeout=0.2, first_contact_timeout=0.3)
+    start = time.monotonic()
+    with patch.object(asyncio.selector_events.BaseSelectorEventLoop, "sock_connect", silent_hosts):
+        found = scanner.scan_blocking(["127.0.0.1", "10.0.0.0/28"], listeners)
+    elapsed = time.monotonic() - start
+
+    assert len(found) == 2
+    assert elapsed < RttEstimator.INITIAL_TIMEOUT_S  # not the 5 s timeout or the initial timeout
+
+
+def test_slow_host_among_fast_ones_is_found(listeners):
+    sock_connect = asyncio.selector_events.BaseSelectorEventLoop.sock_connect
+
+    async def slow_host(loop, sock, address):
+        if address[0] == "10.0.0.5":
+            await asyncio.sleep(0.8)  # e.g. a WiFi datalogger, longer than the timeout of the fast hosts
+            address = ("127.0.0.1", address[1])
+        return await sock_connect(loop, sock, address)
+
+    with patch.object(asyncio.selector_events.BaseSelectorEventLoop, "sock_connect", slow_host):
+        found = PortScanner(5, max_concurrency=4).scan_blocking(["127.0.0.0/29", "10.0.0.5"], listeners)
+
+    assert sorted(found) == sorted((ip, port) for ip in ("127.0.0.1", "10.0.0.5") for port in listeners)
+
+
+def test_scan_of_a_24_is_fast(listeners):
+    ports = listeners + [502, 1502]
+    start = time.monotonic()
+    found = PortScanner(5).scan_blocking(["127.0.0.0/24"], ports)
+    elapsed = time.monotonic() - start
+    print("%d probes in %.2f s" % (254 * len(ports), elapsed))
+
+    assert sorted(found) == sorted(("127.0.0.1", port) for port in listeners)
+    assert elapsed < 2
+
+
+def test_get_hosts(listeners):
+    streamed = []
+    with patch.object(NetworkUtils, "get_mac_from_ip", return_value="aa:bb:cc:dd:ee:ff"):
+        hosts = NetworkUtils.get_hosts(listeners, "5", networks=["127.0.0.0/30"], on_host=streamed.append)
+    assert sorted(hosts, key=lambda h: h.port) == [HostInfo("127.0.0.1", port, "aa:bb:cc:dd:ee:ff") for port in sorted(listeners)]
+    assert streamed == hosts
+
+
+def test_get_hosts_of_invalid_network():
+    assert NetworkUtils.get_hosts([502], 5, networks=["not a network"]) == []
+
+
+def test_get_hosts_scans_the_local_networks():
+    with patch.object(NetworkUtils, "get_network_interfaces", return_value={"eth0": "192.168.1.10", "wlan0": "10.0.0.5"}), \
+            patch.object(NetworkUtils, "get_ip_address", return_value="192.168.1.10"), \
+            patch.object(PortScanner, "scan_blocking", return_value=[]) as scan:
+        assert NetworkUtils.get_hosts([502], 5) == []
+    assert [str(n) for n in scan.call_args.args[0]] == ["192.168.1.0/24", "10.0.0.0/24"]
@@ -0,0 +1,76 @@
+import time
+from server.app.scheduler_stats import LatencyHistogram, SchedulerStats
+
+
+def test_histogram_buckets():
+    h = LatencyHistogram()
+    for value in [0.5, 1, 3, 3, 40, 20_000]:
+        h.add(value)
+
+    d = h.to_dict()
+    assert d["count"] == 6
+    assert d["buckets"] == {"<=1": 2, "<=5": 2, "<=50": 1, ">10000": 1}
+    assert d["max_ms"] == 20_000
+    assert h.percentile(50) == 5
+    assert h.percentile(100) == 20_000
+
+
+def test_empty_histogram():
+    d = LatencyHistogram().to_dict()
+    assert d["count"] == 0
+    assert d["mean_ms"] is None
+    assert d["p95_ms"] is None
+
+
+def test_per_task_class():
+    stats = SchedulerStats(max_workers=4)
+    stats.record_execution("DeviceTask", 5, 2)
+    stats.record_execution("DeviceTask", -3, 4)  # early starts count as on time
+    stats.record_execution("DiscoverHostsTask", 100, 3000)
+
+    tasks = stats.to_dict()["tasks"]
+    assert tasks["DeviceTask"]["execution"]["count"] == 2
+    assert tasks["DeviceTask"]["lateness"]["buckets"] == {"<=1": 1, "<=5": 1}
+    assert tasks["DiscoverHostsTask"]["execution"]["buckets"] == {"<=5000": 1}
+
+
+def test_worker_saturation():
+    stats = SchedulerStats(max_workers=2)
+    stats.record_active_workers(2)
+    time.sleep(0.05)
+    stats.record_active_workers(0)
+    time.sleep(0.05)
+
+    d = stats.to_dict()
+    assert 0.2 < d["saturated_ratio"] < 0.8
+    assert 0.2 < d["worker_utilization"] < 0.8
+    assert d["active_workers"] == 0
+
+
+def test_lane_saturation():
+    stats = SchedulerStats(max_workers=4)
+    stats.set_lane_workers("realtime", 2)
+    stats.set_lane_workers("discovery", 2)
+    stats.record_active_workers(2, "realtime", 2)  # the realtime lane is full, discovery is idle
+    time.sleep(0.05)
+    stats.record_execution("DeviceTask", 30, 1, "realtime")
+    stats.record_active_workers(0, "realtime", 0)
+    time.sleep(0.05)
+
+    d = stats.to_dict()
+    assert d["saturated_ratio"] == 0
+    assert 0.2 < d["lanes"]["realtime"]["saturated_ratio"] < 0.8
+    assert d["lanes"]["realtime"]["max_workers"] == 2
+    assert d["lanes"]["realtime"]["lateness"]["buckets"] == {"<=50": 1}
+    assert d["lanes"]["discovery"]["saturated_ratio"] == 0
+    assert d["lanes"]["discovery"]["lateness"]["count"] == 0
+
+
+def test_queue_depth():
+    stats = SchedulerStats()
+    stats.record_queue_depth(10)
+    stats.record_queue_depth(3)
+
+    d = stats.to_dict()
+    assert d["queue_depth"] == 3
+    assert d["max_queue_depth"] == 10
@@ -125,7 +125,10 @@ def test_to_json(settings):
                 settings.harvest.ENDPOINTS: [
                     "https://example.com",
                     "https://test.com"
-                ]
+                ],
+                settings.harvest.DELTA_ENCODING: False,
+                settings.harvest.PAYLOAD_FORMATS: {},
+                settings.harvest.BATCH_WINDOW_MS: 0
             },
             settings.devices.DEVICES: {
                 settings.devices.CONNECTIONS: []
@@ -448,3 +451,45 @@ def test_add_three_devices_to_settings_same_serial(settings: Settings):
 
     # the old device is removed
     assert len(settings.devices.connections) == 2
+
+
+def test_delta_encoding(settings: Settings):
+    calls = []
+    settings.add_listener(calls.append)
+    assert not settings.harvest.delta_encoding
+
+    settings.update_from_dict({settings.SETTINGS: {settings.harvest.HARVEST: {settings.harvest.DELTA_ENCODING: True}}}, ChangeSource.BACKEND)
+    assert settings.harvest.delta_encoding
+    assert calls == [ChangeSource.BACKEND]
+
+    settings.harvest.set_delta_encoding(True, ChangeSource.LOCAL)
+    assert calls == [ChangeSource.BACKEND]
+    assert settings.harvest.to_dict()[settings.harvest.DELTA_ENCODING] is True
+
+
+def test_payload_formats(settings: Settings):
+    calls = []
+    settings.add_listener(calls.append)
+    assert settings.harvest.payload_format("https://example.com") == "json"
+
+    settings.update_from_dict({settings.SETTINGS: {settings.harvest.HARVEST: {settings.harvest.PAYLOAD_FORMATS: {"https://example.com": "cbor+zlib"}}}}, ChangeSource.BACKEND)
+    assert settings.harvest.payload_format("https://example.com") == "cbor+zlib"
+    assert settings.harvest.payload_format("https://test.com") == "json"
+    assert calls == [ChangeSource.BACKEND]
+
+    settings.harvest.set_payload_format("https://example.com", "cbor+zlib", ChangeSource.LOCAL)
+    assert calls == [ChangeSource.BACKEND]
+    settings.harvest.set_payload_format("https://test.com", "cbor+zlib", ChangeSource.LOCAL)
+    assert calls == [ChangeSource.BACKEND, ChangeSource.LOCAL]
+    assert settings.harvest.to_dict()[settings.harvest.PAYLOAD_FORMATS] == {"https://example.com": "cbor+zlib", "https://test.com": "cbor+zlib"}
+
+
+def test_batch_window(settings: Settings):
+    calls = []
+    settings.add_listener(calls.append)
+    assert settings.harvest.batch_window_ms == 0
+
+    settings.update_from_dict({settings.SETTINGS: {settings.harvest.HARVEST: {settings.harvest.BATCH_WINDOW_MS: 5000}}}, ChangeSource.BACKEND)
+    assert settings.harvest.batch_window_ms == 5000
+    settings.harvest.set_batch_window_ms(5000, ChangeSource.LOCAL)
+    assert calls == [ChangeSource.BACKEND]
@@ -0,0 +1,124 @@
+import os
+import tempfile
+import pytest
+from server.storage.harvest_queue import HarvestQueue
+from server.tasks.harvest_payload import cbor_encode
+
+
+ENDPOINT = "https://mainnet.srcful.dev/gw/data/"
+HEADERS = {"sn": "1234", "model": "huawei", "dtype": "modbus_registers"}
+
+
+@pytest.fixture
+def db_path():
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.db') as tmp:
+        path = tmp.name
+    yield path
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.unlink(path + suffix)
+
+
+def _barn(timestamp: int) -> dict:
+    return {timestamp: {"32016": 1717, "32017": 42}}
+
+
+def test_put_is_buffered_until_flush(db_path):
+    queue = HarvestQueue(db_path, flush_count=10)
+    queue.put(ENDPOINT, HEADERS, _barn(1000))
+
+    # a fresh queue on the same file does not see the buffered barn yet
+    assert len(HarvestQueue(db_path)) == 0
+    assert len(queue) == 1
+
+    queue.flush()
+    assert len(HarvestQueue(db_path)) == 1
+
+
+def test_put_flushes_when_buffer_is_full(db_path):
+    queue = HarvestQueue(db_path, flush_count=3)
+    for t in range(3):
+        queue.put(ENDPOINT, HEADERS, _barn(t))
+
+    assert len(HarvestQueue(db_path)) == 3
+
+
+def test_queue_survives_restart(db_path):
+    queue = HarvestQueue(db_path)
+    queue.put(ENDPOINT, HEADERS, _barn(1000))
+    queue.flush()
+
+    batch = HarvestQueue(db_path).peek_batch(10)
+    assert len(batch) == 1
+    assert batch[0].endpoint == ENDPOINT
+    assert batch[0].headers == HEADERS
+    assert batch[0].barn == {1000: {"32016": 1717, "32017": 42}}
+
+
+def test_ack_removes_barns(db_path):
+    queue = HarvestQueue(db_path)
+    for t in range(5):
+        queue.put(ENDPOINT, HEADERS, _barn(t))
+
+    batch = queue.peek_batch(3)
+    assert [list(b.barn.keys()) for b in batch] == [[0], [1], [2]]
+
+    queue.ack(batch)
+    assert len(queue) == 2
+    assert [list(b.barn.keys()) for b in queue.peek_batch(10)] == [[3], [4]]
+
+
+def test_unacknowledged_barns_are_kept(db_path):
+    queue = HarvestQueue(db_path)
+    queue.put(ENDPOINT, HEADERS, _barn(0))
+
+    queue.peek_batch(10)  # e.g. the upload failed or the process crashed
+    assert len(HarvestQueue(db_path)) == 1
+
+
+def test_batch_only_contains_one_device_and_endpoint():
+    queue = HarvestQueue(":memory:")
+    queue.put(ENDPOINT, HEADERS, _barn(0))
+    queue.put(ENDPOINT, {**HEADERS, "sn": "5678"}, _barn(1))
+    queue.put("https://other.srcful.dev/", HEADERS, _barn(2))
+    queue.put(ENDPOINT, HEADERS, _barn(3))
+
+    batch = queue.peek_batch(10)
+    assert [list(b.barn.keys()) for b in batch] == [[0], [3]]
+
+
+def test_oldest_barns_are_evicted_when_full():
+    barn_size = len(cbor_encode(_barn(0)))
+    queue = HarvestQueue(":memory:", max_bytes=barn_size * 3, flush_count=1)
+
+    for t in range(5):
+        queue.put(ENDPOINT, HEADERS, _barn(t))
+
+    assert len(queue) == 3
+    assert queue.size_bytes <= barn_size * 3
+    assert [list(b.barn.keys()) for b in queue.peek_batch(10)] == [[2], [3], [4]]
+
+
+def test_unwritable_path_falls_back_to_memory():
+    queue = HarvestQueue("/this/path/does/not/exist/queue.db")
+    queue.put(ENDPOINT, HEADERS, _barn(0))
+
+    assert queue.db_path == ":memory:"
+    assert len(queue.peek_batch(10)) == 1
+
+
+def test_barn_keeps_key_types(db_path):
+    queue = HarvestQueue(db_path)
+    queue.put(ENDPOINT, HEADERS, {1000: {40000: 5, 40001: -1}, 2000: {"kf": 1000, "d": {40000: 6}}})
+    queue.flush()
+
+    assert HarvestQueue(db_path).peek_batch(10)[0].barn == {1000: {40000: 5, 40001: -1}, 2000: {"kf": 1000, "d": {40000: 6}}}
+
+
+def test_reads_barns_queued_as_json(db_path):
+    queue = HarvestQueue(db_path)
+    with queue._conn:
+        queue._conn.execute("INSERT INTO harvest_queue (endpoint, headers, barn, size) VALUES (?, ?, ?, ?)",
+                            (ENDPOINT, '{"sn": "1234"}', '{"1000": {"1": 2}}', 18))
+
+    assert queue.peek_batch(10)[0].barn == {"1000": {"1": 2}}
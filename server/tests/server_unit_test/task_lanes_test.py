@@ -0,0 +1,113 @@
+from server.app.isystem_time import ISystemTime
+from server.app.itask_source import ITaskSource
+from server.app.task_scheduler import TaskScheduler
+from server.tasks.itask import ITask, Lane
+
+
+class SimulatedTime(ISystemTime):
+    def __init__(self):
+        self.now = 0
+
+    def time_ms(self) -> int:
+        return self.now
+
+    def elapsed_time(self) -> int:
+        return self.now
+
+
+class NoTasks(ITaskSource):
+    def add_task(self, task: ITask):
+        pass
+
+    def purge_tasks(self) -> list[ITask]:
+        return []
+
+
+class SimTask(ITask):
+    """Periodic task that keeps its worker busy for duration ms of simulated time"""
+
+    def __init__(self, time: int, lane: Lane, period: int, duration: int):
+        self.time = time
+        self.lane = lane
+        self.period = period
+        self.duration = duration
+
+    def get_time(self) -> int:
+        return self.time
+
+    def adjust_time(self, new_time: int):
+        self.time = new_time
+
+    def execute(self, event_time):
+        self.time = max(self.time + self.period, event_time + 1)
+        return self
+
+
+def _simulate(discovery_lane: Lane, network_lane: Lane, duration_ms: int = 60_000) -> int:
+    """Runs harvests every second next to a storm of scans and slow uploads, returns the worst harvest lateness"""
+    clock = SimulatedTime()
+    scheduler = TaskScheduler(2, clock, NoTasks(), lane_workers={Lane.NETWORK: 2, Lane.DISCOVERY: 1})
+
+    harvests = [SimTask(1000 + i * 100, Lane.REALTIME, 1000, 50) for i in range(2)]
+    for task in harvests:
+        scheduler.add_task(task)
+    for i in range(10):
+        scheduler.add_task(SimTask(500 + i, discovery_lane, 1, 5_000))  # back to back /24 scans
+        scheduler.add_task(SimTask(500 + i, network_lane, 1, 5_000))  # uploads that time out
+
+    running: list[tuple[int, SimTask]] = []
+    worst = 0
+    for now in range(duration_ms):
+        clock.now = now
+        for done in [r for r in running if r[0] == now]:
+            running.remove(done)
+            scheduler.finish_task(done[1], done[1].execute(now))
+
+        with scheduler.new_tasks_condition:
+            dispatched = scheduler.dispatch_due(now)
+        for task in dispatched:
+            if task in harvests:
+                worst = max(worst, now - task.get_time())
+            running.append((now + task.duration, task))
+
+    return worst
+
+
+HARVEST_LATENESS_BOUND_MS = 10
+
+
+def test_discovery_storm_does_not_delay_harvest():
+    assert _simulate(Lane.DISCOVERY, Lane.NETWORK) <= HARVEST_LATENESS_BOUND_MS
+
+
+def test_shared_workers_delay_harvest():
+    # the same load on one shared set of workers, as before lanes
+    assert _simulate(Lane.REALTIME, Lane.REALTIME) > HARVEST_LATENESS_BOUND_MS
+
+
+def test_lane_concurrency():
+    clock = SimulatedTime()
+    scheduler = TaskScheduler(4, clock, NoTasks(), lane_workers={Lane.DISCOVERY: 1})
+    for _ in range(3):
+        scheduler.add_task(SimTask(200, Lane.DISCOVERY, 1000, 10))
+    scheduler.add_task(SimTask(200, Lane.REALTIME, 1000, 10))
+
+    clock.now = 200
+    with scheduler.new_tasks_condition:
+        dispatched = scheduler.dispatch_due(200)
+        assert [t.lane for t in dispatched] == [Lane.REALTIME, Lane.DISCOVERY]
+        assert scheduler.next_due_time() is None  # discovery is busy, nothing else is queued
+
+    scheduler.finish_task(dispatched[1], None)
+    with scheduler.new_tasks_condition:
+        assert scheduler.next_due_time() == 200
+        assert len(scheduler.dispatch_due(200)) == 1
+
+
+def test_unknown_lane_runs_on_realtime_workers():
+    scheduler = TaskScheduler(1, SimulatedTime(), NoTasks())
+    task = SimTask(100, Lane.REALTIME, 1000, 10)
+    task.lane = "not a lane"
+    scheduler.add_task(task)
+
+    assert scheduler.lanes[Lane.REALTIME].tasks.peek_time() == 100
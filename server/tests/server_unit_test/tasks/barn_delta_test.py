@@ -0,0 +1,173 @@
+import json
+import random
+from unittest.mock import Mock
+from server.app.blackboard import BlackBoard
+from server.app.settings import ChangeSource
+from server.devices.ICom import DeviceMode, HarvestDataType, ICom
+from server.devices.supported_devices.profiles import ModbusDeviceProfiles
+from server.tasks import deviceTask
+import server.tasks.harvestTransport as harvestTransport
+from server.tasks.barn_delta import BarnDeltaEncoder, DELTA_ENCODING, decode_barn
+
+
+def _harvests(count: int, registers: int = 10) -> dict:
+    barn = {}
+    harvest = {register: register for register in range(registers)}
+    for i in range(count):
+        harvest = {**harvest, 0: i}  # one register changes on every harvest
+        barn[1000 * i] = harvest
+    return barn
+
+
+def test_keyframe_then_deltas():
+    barn = _harvests(3)
+    encoded = BarnDeltaEncoder().encode(barn)
+
+    assert encoded[0] == barn[0]
+    assert encoded[1000] == {"kf": 0, "d": {0: 1}}
+    assert encoded[2000] == {"kf": 0, "d": {0: 2}}
+    assert decode_barn(encoded) == barn
+
+
+def test_round_trip_over_json_and_barns():
+    encoder = BarnDeltaEncoder(keyframe_interval=4)
+    barn = _harvests(10)
+    timestamps = sorted(barn)
+
+    keyframes = {}
+    decoded = {}
+    for start in range(0, 10, 6):  # the harvests are sent in several barns
+        sent = json.loads(json.dumps(encoder.encode({t: barn[t] for t in timestamps[start:start + 6]})))
+        decoded.update(decode_barn(sent, keyframes))
+
+    assert {int(t): {int(r): v for r, v in h.items()} for t, h in decoded.items()} == barn
+    assert sorted(keyframes) == [0, 4000, 8000]  # every 4th harvest, the deltas refer to keyframes of earlier barns
+
+
+def test_changed_register_set_is_a_keyframe():
+    encoder = BarnDeltaEncoder()
+    encoded = encoder.encode({0: {1: 1, 2: 2}, 1000: {1: 1, 2: 2, 3: 3}, 2000: {1: 1, 2: 2}})
+
+    assert encoded == {0: {1: 1, 2: 2}, 1000: {1: 1, 2: 2, 3: 3}, 2000: {1: 1, 2: 2}}
+
+
+def test_lost_barn_only_affects_the_deltas_until_the_next_keyframe():
+    encoder = BarnDeltaEncoder(keyframe_interval=10)
+    barn = _harvests(30)
+    barns = [encoder.encode({t: barn[t]}) for t in sorted(barn)]  # one harvest per barn as sent by DeviceTask
+
+    # the first barn with the keyframe is lost
+    keyframes = {}
+    decoded = {}
+    for sent in barns[1:]:
+        decoded.update(decode_barn(sent, keyframes))
+    assert sorted(keyframes) == [10000, 20000]
+    assert decoded == {t: barn[t] for t in sorted(barn)[10:]}
+
+
+def test_keyframe_age():
+    encoder = BarnDeltaEncoder(keyframe_age_ms=60000)
+    barn = {t: {1: 1} for t in range(0, 200000, 30000)}  # a device harvested every 30 s
+
+    encoded = encoder.encode(barn)
+    assert [t for t, entry in encoded.items() if "kf" not in entry] == [0, 60000, 120000, 180000]
+
+
+def test_deadband():
+    # a two register value with a deadband of 100 and a single register without deadband
+    encoder = BarnDeltaEncoder(deadbands=[((10, 11), 100)])
+    barn = {
+        0: {10: 0, 11: 65500, 12: 7},
+        1000: {10: 1, 11: 10, 12: 7},  # 65546, within the deadband across the word boundary
+        2000: {10: 1, 11: 200, 12: 8},  # 65736, outside the deadband
+    }
+    encoded = encoder.encode(barn)
+
+    assert encoded[1000] == {"kf": 0, "d": {}}
+    assert encoded[2000] == {"kf": 0, "d": {10: 1, 11: 200, 12: 8}}
+    assert decode_barn(encoded)[1000] == barn[0]
+
+
+def test_profile_deadbands():
+    profile = ModbusDeviceProfiles().get("solaredge")
+    assert profile.get_deadbands() == []
+
+    profile.registers[0].deadband = 5
+    try:
+        assert profile.get_deadbands() == [((40085,), 5)]
+    finally:
+        profile.registers[0].deadband = 0
+
+
+def _device(registers: dict) -> Mock:
+    device = Mock(spec=ICom)
+    device.DEFAULT_HARVEST_INTERVAL_MS = 1000
+    device.read_harvest_data.return_value = registers
+    device.get_harvest_data_type.return_value = HarvestDataType.MODBUS_REGISTERS
+    device.get_barn_deadbands.return_value = []
+    device.get_device_mode.return_value = DeviceMode.READ
+    device.get_name.return_value = "test"
+    return device
+
+
+def test_device_task_sends_delta_encoded_barns(blackboard: BlackBoard):
+    blackboard.settings.harvest.add_endpoint("https://example.com", ChangeSource.LOCAL)
+    blackboard.settings.harvest.set_delta_encoding(True, ChangeSource.LOCAL)
+    device = _device({1: 1, 2: 2})
+
+    task = deviceTask.DeviceTask(0, blackboard, device, harvestTransport.DefaultHarvestTransportFactory())
+    first = [t for t in task.execute(17) if isinstance(t, harvestTransport.HarvestTransport)]
+    second = [t for t in task.execute(task.time) if isinstance(t, harvestTransport.HarvestTransport)]
+
+    assert first[0].headers["enc"] == DELTA_ENCODING
+    assert list(first[0].barn.values()) == [{1: 1, 2: 2}]
+    assert second[0].headers["enc"] == DELTA_ENCODING
+    assert list(second[0].barn.values()) == [{"kf": list(first[0].barn)[0], "d": {}}]  # refers to the keyframe of the first barn
+
+
+def test_device_task_barns_are_not_encoded_by_default(blackboard: BlackBoard):
+    blackboard.settings.harvest.add_endpoint("https://example.com", ChangeSource.LOCAL)
+    task = deviceTask.DeviceTask(0, blackboard, _device({1: 1}), harvestTransport.DefaultHarvestTransportFactory())
+    transports = [t for t in task.execute(17) if isinstance(t, harvestTransport.HarvestTransport)]
+
+    assert "enc" not in transports[0].headers
+    assert list(transports[0].barn.values()) == [{1: 1}]
+
+
+def _simulated_minute(profile_name: str, changing_fraction: float) -> list[dict]:
+    """One harvest per second of the verbose registers of a profile where a fraction of the registers changes every second"""
+    rnd = random.Random(5)
+    profile = ModbusDeviceProfiles().get(profile_name)
+    registers = sorted({address for block in profile.get_read_plan(True) for address in block.registers})
+    changing = rnd.sample(registers, int(len(registers) * changing_fraction))
+    harvest = {register: rnd.randint(0, 65535) for register in registers}
+    harvests = []
+    for _ in range(60):
+        harvest = {**harvest, **{register: rnd.randint(0, 65535) for register in changing}}
+        harvests.append(harvest)
+    return harvests
+
+
+def _sent_minute(blackboard: BlackBoard, harvests: list[dict]) -> int:
+    """The JSON bytes of the barns DeviceTask sends for the harvests"""
+    device = _device({})
+    device.read_harvest_data.side_effect = harvests
+    task = deviceTask.DeviceTask(0, blackboard, device, harvestTransport.DefaultHarvestTransportFactory())
+    sent = 0
+    for _ in harvests:
+        for transport in task.execute(task.time):
+            if isinstance(transport, harvestTransport.HarvestTransport):
+                sent += len(json.dumps(dict(transport.barn)))
+    return sent
+
+
+def test_bytes_per_minute(blackboard: BlackBoard):
+    blackboard.settings.harvest.add_endpoint("https://example.com", ChangeSource.LOCAL)
+    for profile_name in ("huawei", "sungrow"):
+        harvests = _simulated_minute(profile_name, 0.1)
+        blackboard.settings.harvest.set_delta_encoding(False, ChangeSource.LOCAL)
+        plain = _sent_minute(blackboard, harvests)
+        blackboard.settings.harvest.set_delta_encoding(True, ChangeSource.LOCAL)
+        delta = _sent_minute(blackboard, harvests)
+        print("%s: %d bytes per minute, %d delta encoded" % (profile_name, plain, delta))
+        assert delta * 3 < plain
@@ -1,6 +0,0 @@
-from server.tasks.checkForWebRequestTask import CheckForWebRequest
-
-
-def test_create():
-    t = CheckForWebRequest(0, {}, None)
-    assert t is not None
@@ -0,0 +1,93 @@
+import json
+import random
+import tracemalloc
+import server.crypto.crypto as crypto
+from server.devices.supported_devices.profiles import ModbusDeviceProfiles
+from server.tasks.deviceTask import CompactBarn
+
+
+def _huawei_harvests(count: int) -> list[dict]:
+    """Verbose huawei harvests with random register values, each read creates its own int objects like a real read"""
+    rnd = random.Random(3)
+    profile = ModbusDeviceProfiles().get("huawei")
+    addresses = [address for block in profile.get_read_plan(True) for address in block.registers]
+    return [{int(str(address)): rnd.randint(0, 65535) for address in addresses} for _ in range(count)]
+
+
+def test_samples_read_back_as_dicts():
+    harvests = _huawei_harvests(3)
+    barn = CompactBarn()
+    for i, harvest in enumerate(harvests):
+        barn.add(i * 1000, harvest)
+
+    assert len(barn) == 3
+    assert 1000 in barn
+    assert barn[2000] == harvests[2]
+    assert barn == {i * 1000: harvest for i, harvest in enumerate(harvests)}
+
+
+def test_register_index_is_shared():
+    barn = CompactBarn()
+    barn.add(0, {1: 1, 2: 2})
+    barn.add(1000, {1: 3, 2: 4})
+    index = barn.index
+
+    next_barn = CompactBarn(barn.index)
+    next_barn.add(2000, {1: 5, 2: 6})
+    assert next_barn.index is index
+
+    next_barn.add(3000, {1: 5, 2: 6, 3: 7})  # e.g. a verbose read
+    assert next_barn.index is not index
+    assert next_barn[2000] == {1: 5, 2: 6}
+    assert next_barn[3000] == {1: 5, 2: 6, 3: 7}
+
+
+def test_other_harvests_are_kept_as_is():
+    barn = CompactBarn()
+    barn.add(0, {"1": "1717"})
+    barn.add(1000, {1: -1})
+    barn.add(2000, {1: 70000})
+    barn.add(3000, {})
+
+    assert barn == {0: {"1": "1717"}, 1000: {1: -1}, 2000: {1: 70000}, 3000: {}}
+
+
+def test_to_json_matches_json_dumps():
+    barn = CompactBarn()
+    barn.add(0, {"1": "1717"})
+    for i, harvest in enumerate(_huawei_harvests(2)):
+        barn.add((i + 1) * 1000, harvest)
+    barn.add(3000, {})
+
+    assert barn.to_json() == json.dumps(dict(barn))
+    assert crypto.jwtlify(barn) == crypto.jwtlify(dict(barn))
+    assert CompactBarn().to_json() == "{}"
+
+
+def _allocated(build) -> tuple[int, object]:
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        ret = build()
+        return tracemalloc.get_traced_memory()[0] - before, ret
+    finally:
+        tracemalloc.stop()
+
+
+def test_memory_per_sample():
+    samples = 60
+
+    def build_dicts():
+        return {i * 1000: harvest for i, harvest in enumerate(_huawei_harvests(samples))}
+
+    def build_compact():
+        barn = CompactBarn()
+        for i, harvest in enumerate(_huawei_harvests(samples)):
+            barn.add(i * 1000, harvest)
+        return barn
+
+    dict_bytes, _ = _allocated(build_dicts)
+    compact_bytes, barn = _allocated(build_compact)
+    print("%d bytes per sample as dicts, %d compact" % (dict_bytes // samples, compact_bytes // samples))
+    assert len(barn) == samples
+    assert compact_bytes * 10 < dict_bytes
@@ -0,0 +1,101 @@
+import json
+from unittest.mock import Mock, patch
+import pytest
+from server.app.blackboard import BlackBoard
+from server.app.settings import ChangeSource
+from server.devices.ICom import DeviceMode, HarvestDataType, ICom
+from server.tasks import deviceTask
+from server.tasks.harvest_batch import BATCH_DTYPE, BatchHarvestTransport, BatchingHarvestTransportFactory
+from server.tasks.harvest_payload import PayloadFormat, decode_payload, encode_payload
+import server.tasks.harvestTransport as harvestTransport
+
+ENDPOINTS = ["https://a.example.com", "https://b.example.com"]
+
+
+@pytest.fixture
+def chip():
+    with patch("server.crypto.crypto.Chip", autospec=True) as mock_chip_class:
+        chip = mock_chip_class.return_value.__enter__.return_value
+        chip.build_jwt.return_value = "jwt"
+        yield chip
+
+
+def _device(sn: str, harvest: dict) -> Mock:
+    device = Mock(spec=ICom)
+    device.DEFAULT_HARVEST_INTERVAL_MS = 1000
+    device.read_harvest_data.return_value = harvest
+    device.get_harvest_data_type.return_value = HarvestDataType.MODBUS_REGISTERS
+    device.get_device_mode.return_value = DeviceMode.READ
+    device.get_name.return_value = "test"
+    device.get_SN.return_value = sn
+    return device
+
+
+def _harvest_all(blackboard: BlackBoard, window_ms: int) -> tuple[list, list]:
+    """Harvests a hybrid inverter, a meter and a P1 dongle once, returns the transports and the device tasks"""
+    blackboard.settings.harvest.clear_endpoints(ChangeSource.LOCAL)
+    for endpoint in ENDPOINTS:
+        blackboard.settings.harvest.add_endpoint(endpoint, ChangeSource.LOCAL)
+    blackboard.settings.harvest.set_batch_window_ms(window_ms, ChangeSource.LOCAL)
+
+    factory = BatchingHarvestTransportFactory()
+    devices = [_device("inverter", {1: 1, 2: 2}), _device("meter", {3: 3}), _device("p1", {"1-0:1.8.0": "12.3"})]
+    tasks = [deviceTask.DeviceTask(0, blackboard, device, factory) for device in devices]
+    transports = []
+    for task in tasks:
+        transports += [t for t in task.execute(17) if isinstance(t, harvestTransport.HarvestTransport)]
+    return transports, tasks
+
+
+def test_barns_are_sent_one_by_one_without_window(blackboard: BlackBoard):
+    transports, _ = _harvest_all(blackboard, 0)
+    assert len(transports) == 3 * len(ENDPOINTS)
+    assert not any(isinstance(t, BatchHarvestTransport) for t in transports)
+
+
+def test_barns_of_all_devices_are_batched(blackboard: BlackBoard, chip):
+    transports, _ = _harvest_all(blackboard, 1000)
+
+    assert [t.post_url for t in transports] == ENDPOINTS
+    assert all(isinstance(t, BatchHarvestTransport) for t in transports)
+    assert transports[0].batch is transports[1].batch
+    assert transports[0].time >= blackboard.time_ms() + 1000  # sent when the window has passed
+
+    signed = transports[0].batch.close()
+    assert signed.headers == {"dtype": BATCH_DTYPE}
+    sections = signed.barn["devices"]
+    assert [section["headers"]["sn"] for section in sections] == ["inverter", "meter", "p1"]
+    assert [list(section["barn"].values()) for section in sections] == [[{1: 1, 2: 2}], [{3: 3}], [{"1-0:1.8.0": "12.3"}]]
+
+    # one signature for all devices and endpoints
+    assert [t.batch.close().jwt(t.payload_format) for t in transports] == ["jwt", "jwt"]
+    assert chip.build_jwt.call_count == 1
+
+
+def test_envelope_serialization(blackboard: BlackBoard):
+    transports, _ = _harvest_all(blackboard, 1000)
+    envelope = transports[0].batch.close().barn
+
+    plain = {"devices": [{"headers": s["headers"], "barn": dict(s["barn"])} for s in envelope["devices"]]}
+    assert envelope.to_json() == json.dumps(plain)
+    assert decode_payload(encode_payload(envelope, PayloadFormat.CBOR_ZLIB), PayloadFormat.CBOR_ZLIB) == plain
+
+
+def test_closed_batch_starts_a_new_one(blackboard: BlackBoard):
+    transports, tasks = _harvest_all(blackboard, 1000)
+    transports[0].batch.close()
+
+    next_transports = [t for t in tasks[0].execute(tasks[0].time) if isinstance(t, harvestTransport.HarvestTransport)]
+    assert len(next_transports) == len(ENDPOINTS)
+    assert next_transports[0].batch is not transports[0].batch
+    assert len(next_transports[0].batch.sections) == 1
+
+
+def test_failed_batch_is_queued_per_device(blackboard: BlackBoard):
+    transports, _ = _harvest_all(blackboard, 1000)
+    transports[0].batch.close()
+
+    with patch.object(type(blackboard), "harvest_queue") as queue:
+        transports[0]._on_error(Mock(status_code=503))
+    assert [call.args[1]["sn"] for call in queue.put.call_args_list] == ["inverter", "meter", "p1"]
+    assert all(call.args[0] == ENDPOINTS[0] for call in queue.put.call_args_list)
@@ -0,0 +1,86 @@
+import threading
+import time
+from unittest.mock import Mock, patch
+import pytest
+from server.app.blackboard import BlackBoard
+from server.app.settings import ChangeSource
+import server.crypto.crypto as crypto
+from server.devices.ICom import DeviceMode, HarvestDataType, ICom
+from server.tasks import deviceTask
+from server.tasks.harvest_payload import PayloadFormat
+import server.tasks.harvestTransport as harvestTransport
+
+ENDPOINTS = ["https://a.example.com", "https://b.example.com"]
+
+
+@pytest.fixture
+def chip():
+    with patch("server.crypto.crypto.Chip", autospec=True) as mock_chip_class:
+        chip = mock_chip_class.return_value.__enter__.return_value
+
+        def sign(*args):
+            time.sleep(0.02)  # the chip is slow
+            return "jwt%d" % (chip.build_jwt.call_count + chip.sign_payload.call_count)
+
+        chip.build_jwt.side_effect = sign
+        chip.sign_payload.side_effect = sign
+        yield chip
+
+
+def _device_task(blackboard: BlackBoard) -> deviceTask.DeviceTask:
+    blackboard.settings.harvest.clear_endpoints(ChangeSource.LOCAL)
+    for endpoint in ENDPOINTS:
+        blackboard.settings.harvest.add_endpoint(endpoint, ChangeSource.LOCAL)
+    device = Mock(spec=ICom)
+    device.DEFAULT_HARVEST_INTERVAL_MS = 1000
+    device.read_harvest_data.return_value = {1: 1}
+    device.get_harvest_data_type.return_value = HarvestDataType.MODBUS_REGISTERS
+    device.get_device_mode.return_value = DeviceMode.READ
+    device.get_name.return_value = "test"
+    return deviceTask.DeviceTask(0, blackboard, device, harvestTransport.DefaultHarvestTransportFactory())
+
+
+def _transports(blackboard: BlackBoard) -> list:
+    return [t for t in _device_task(blackboard).execute(17) if isinstance(t, harvestTransport.HarvestTransport)]
+
+
+def _sign_concurrently(transports: list) -> list:
+    jwts = [None] * len(transports)
+
+    def sign(i):
+        jwts[i] = transports[i]._data()
+    threads = [threading.Thread(target=sign, args=(i,)) for i in range(len(transports))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return jwts
+
+
+def test_barn_is_signed_once_for_all_endpoints(blackboard: BlackBoard, chip):
+    transports = _transports(blackboard)
+
+    assert [t.post_url for t in transports] == ENDPOINTS
+    assert transports[0].signed is transports[1].signed
+    assert _sign_concurrently(transports) == ["jwt1", "jwt1"]
+    assert chip.build_jwt.call_count == 1  # instead of once per endpoint
+
+
+def test_barn_is_signed_once_per_payload_format(blackboard: BlackBoard, chip):
+    blackboard.settings.harvest.set_payload_format(ENDPOINTS[1], PayloadFormat.CBOR_ZLIB.value, ChangeSource.LOCAL)
+    transports = _transports(blackboard)
+
+    _sign_concurrently(transports)
+    assert chip.build_jwt.call_count == 1
+    assert chip.sign_payload.call_count == 1
+
+
+def test_failed_signature_is_retried_by_the_next_transport(blackboard: BlackBoard, chip):
+    transports = _transports(blackboard)
+    chip.build_jwt.side_effect = [crypto.ChipError(1, "chip busy"), "jwt"]
+
+    with pytest.raises(crypto.ChipError):
+        transports[0]._create_jwt()
+    assert transports[1]._create_jwt() == "jwt"
+    assert transports[0]._create_jwt() == "jwt"
+
@@ -0,0 +1,89 @@
+import json
+import random
+from unittest.mock import patch
+import pytest
+from server.app.blackboard import BlackBoard
+from server.app.settings import ChangeSource
+from server.devices.supported_devices.profiles import ModbusDeviceProfiles
+from server.tasks.deviceTask import CompactBarn
+from server.tasks.harvest_payload import PayloadFormat, cbor_decode, cbor_encode, decode_payload, encode_payload
+import server.tasks.harvestTransport as harvestTransport
+
+
+@pytest.mark.parametrize("value", [0, 23, 24, 255, 256, 65535, 65536, 2**32, 2**64 - 1, -1, -24, -25, -2**63, 1.5, -0.25,
+                                   "", "kWh", "åäö", b"\x00\x01", True, False, None, [], [1, "a", [2]], {}, {1: {"2": None}}])
+def test_cbor_round_trip(value):
+    assert cbor_decode(cbor_encode(value)) == value
+
+
+def test_cbor_known_encodings():
+    # examples from RFC 8949 appendix A
+    assert cbor_encode(1000) == bytes.fromhex("1903e8")
+    assert cbor_encode(-100) == bytes.fromhex("3863")
+    assert cbor_encode({1: 2, 3: 4}) == bytes.fromhex("a201020304")
+    assert cbor_encode("IETF") == bytes.fromhex("6449455446")
+    assert cbor_encode([1, [2, 3]]) == bytes.fromhex("8201820203")
+
+
+def test_cbor_rejects_unknown_types():
+    with pytest.raises(TypeError):
+        cbor_encode(object())
+    with pytest.raises(ValueError):
+        cbor_encode(2**64)
+
+
+def _verbose_barn(profile_name: str, samples: int) -> CompactBarn:
+    """A barn of one harvest per second where a tenth of the registers change between harvests"""
+    rnd = random.Random(7)
+    profile = ModbusDeviceProfiles().get(profile_name)
+    registers = [address for block in profile.get_read_plan(True) for address in block.registers]
+    changing = rnd.sample(registers, len(registers) // 10)
+    harvest = {register: rnd.randint(0, 65535) for register in registers}
+    barn = CompactBarn()
+    for i in range(samples):
+        harvest = {**harvest, **{register: rnd.randint(0, 65535) for register in changing}}
+        barn.add(1700000000000 + i * 1000, harvest)
+    return barn
+
+
+def test_payload_round_trip():
+    barn = _verbose_barn("huawei", 3)
+    assert decode_payload(encode_payload(barn, PayloadFormat.CBOR_ZLIB), PayloadFormat.CBOR_ZLIB) == barn
+    assert decode_payload(encode_payload(barn, PayloadFormat.JSON), PayloadFormat.JSON) == json.loads(barn.to_json())
+
+
+def test_payload_size():
+    for profile_name in ("huawei", "sungrow"):
+        barn = _verbose_barn(profile_name, 10)
+        json_size = len(encode_payload(barn, PayloadFormat.JSON))
+        cbor_size = len(encode_payload(barn, PayloadFormat.CBOR_ZLIB))
+        print("%s: %d bytes as base64url json, %d as cbor+zlib" % (profile_name, json_size, cbor_size))
+        assert cbor_size * 2 < json_size
+
+
+@patch("server.crypto.crypto.Chip", autospec=True)
+def test_transport_signs_binary_payload(mock_chip_class):
+    mock_chip = mock_chip_class.return_value.__enter__.return_value
+    mock_chip.sign_payload.return_value = "jwt"
+    barn = _verbose_barn("huawei", 2)
+    transport = harvestTransport.HarvestTransport(0, None, barn, {"model": "huawei"})
+    transport.payload_format = PayloadFormat.CBOR_ZLIB
+
+    assert transport._data() == "jwt"
+    payload, headers, retries = mock_chip.sign_payload.call_args.args
+    assert headers == {"model": "huawei", "cty": "cbor+zlib"}
+    assert decode_payload(payload, PayloadFormat.CBOR_ZLIB) == barn
+    assert "cty" not in transport.headers  # the headers are also used if the barn is queued
+    mock_chip.build_jwt.assert_not_called()
+
+
+def test_factory_picks_format_per_endpoint(blackboard: BlackBoard):
+    blackboard.settings.harvest.set_payload_format("https://binary.example.com", PayloadFormat.CBOR_ZLIB.value, ChangeSource.LOCAL)
+    blackboard.settings.harvest.set_payload_format("https://unknown.example.com", "xml", ChangeSource.LOCAL)
+    factory = harvestTransport.DefaultHarvestTransportFactory()
+
+    binary = factory.create(0, blackboard, {}, {}, "https://binary.example.com")
+    assert binary.post_url == "https://binary.example.com"
+    assert binary.payload_format == PayloadFormat.CBOR_ZLIB
+    assert factory.create(0, blackboard, {}, {}, "https://example.com").payload_format == PayloadFormat.JSON
+    assert factory.create(0, blackboard, {}, {}, "https://unknown.example.com").payload_format == PayloadFormat.JSON
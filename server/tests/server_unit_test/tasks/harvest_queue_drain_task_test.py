@@ -0,0 +1,112 @@
+from unittest.mock import Mock, patch
+import requests
+from server.tasks.harvest_queue_drain_task import HarvestQueueDrainTask
+from server.app.settings import ChangeSource
+from server.tasks.harvestTransport import HarvestTransport
+from server.tasks.harvest_payload import PayloadFormat, decode_payload, encode_payload
+
+
+ENDPOINT = "https://mainnet.srcful.dev/gw/data/"
+HEADERS = {"sn": "1234", "model": "huawei", "dtype": "modbus_registers"}
+
+
+def _response(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    return response
+
+
+def test_transport_queues_barn_when_backend_is_unreachable(bb):
+    transport = HarvestTransport(0, bb, {1000: {"1": 2}}, HEADERS)
+    transport.post_url = ENDPOINT
+
+    with patch("server.backend.http_client.HttpClient.post", side_effect=requests.exceptions.ConnectionError), \
+            patch.object(transport, "_data", return_value="jwt"):
+        transport.execute(0)
+
+    batch = bb.harvest_queue.peek_batch(10)
+    assert len(batch) == 1
+    assert batch[0].barn == {1000: {"1": 2}}
+
+
+def test_transport_does_not_queue_rejected_barn(bb):
+    transport = HarvestTransport(0, bb, {1000: {"1": 2}}, HEADERS)
+
+    with patch("server.backend.http_client.HttpClient.post", return_value=_response(400)), \
+            patch.object(transport, "_data", return_value="jwt"):
+        transport.execute(0)
+
+    assert len(bb.harvest_queue) == 0
+
+
+def test_drain_idle_when_queue_is_empty(bb):
+    task = HarvestQueueDrainTask(0, bb)
+
+    with patch("server.backend.http_client.HttpClient.post") as mock_post:
+        ret = task.execute(1000)
+
+    mock_post.assert_not_called()
+    assert ret is task
+    assert task.get_time() == 1000 + HarvestQueueDrainTask.IDLE_INTERVAL_MS
+
+
+def test_drain_uploads_merged_batch_and_acks(bb):
+    for t in range(3):
+        bb.harvest_queue.put(ENDPOINT, HEADERS, {t: {"1": t}})
+
+    task = HarvestQueueDrainTask(0, bb)
+    with patch("server.backend.http_client.HttpClient.post", return_value=_response(200)) as mock_post, \
+            patch.object(HarvestTransport, "_create_jwt", return_value="jwt"):
+        ret = task.execute(1000)
+
+    mock_post.assert_called_once()
+    assert mock_post.call_args[0][0] == ENDPOINT
+    assert task.barn == {0: {"1": 0}, 1: {"1": 1}, 2: {"1": 2}}
+    assert task.headers == HEADERS
+    assert ret is task
+    assert len(bb.harvest_queue) == 0
+
+
+def test_drain_keeps_batch_while_offline(bb):
+    bb.harvest_queue.put(ENDPOINT, HEADERS, {0: {"1": 0}})
+
+    task = HarvestQueueDrainTask(0, bb)
+    with patch("server.backend.http_client.HttpClient.post", side_effect=requests.exceptions.ConnectionError), \
+            patch.object(HarvestTransport, "_create_jwt", return_value="jwt"):
+        ret = task.execute(1000)
+
+    assert ret is task
+    assert task.get_time() == 1000 + HarvestQueueDrainTask.RETRY_INTERVAL_MS
+    assert len(bb.harvest_queue) == 1
+
+
+def test_drain_drops_batch_rejected_by_backend(bb):
+    bb.harvest_queue.put(ENDPOINT, HEADERS, {0: {"1": 0}})
+
+    task = HarvestQueueDrainTask(0, bb)
+    with patch("server.backend.http_client.HttpClient.post", return_value=_response(400)), \
+            patch.object(HarvestTransport, "_create_jwt", return_value="jwt"):
+        task.execute(1000)
+
+    assert len(bb.harvest_queue) == 0
+
+
+def test_drained_barn_keeps_integer_keys(bb):
+    bb.settings.harvest.set_payload_format(ENDPOINT, PayloadFormat.CBOR_ZLIB.value, ChangeSource.LOCAL)
+    transport = HarvestTransport(0, bb, {1000: {40000: 5}}, HEADERS)
+    transport.post_url = ENDPOINT
+
+    with patch("server.backend.http_client.HttpClient.post", side_effect=requests.exceptions.ConnectionError), \
+            patch.object(transport, "_data", return_value="jwt"):
+        transport.execute(0)
+
+    task = HarvestQueueDrainTask(0, bb)
+    with patch("server.backend.http_client.HttpClient.post", return_value=_response(200)), \
+            patch.object(HarvestTransport, "_create_jwt", return_value="jwt"):
+        task.execute(1000)
+
+    # the drained upload carries the same payload as the live upload would have
+    assert task.payload_format == PayloadFormat.CBOR_ZLIB
+    payload = encode_payload(task.signed.barn, task.payload_format)
+    assert decode_payload(payload, PayloadFormat.CBOR_ZLIB) == {1000: {40000: 5}}
+    assert payload == encode_payload(transport.barn, PayloadFormat.CBOR_ZLIB)
@@ -1,5 +1,6 @@
 import json
 import time
+from concurrent.futures import Future
 from server.crypto.crypto_state import CryptoState
 from server.devices.ICom import DeviceMode, HarvestDataType, ICom
 from server.tasks import deviceTask
@@ -312,3 +313,61 @@ def test_closed_device_disconnection(blackboard: BlackBoard):
     # Verify we got back the expected tasks
     assert len(result) >= 1  # Should have at least the DevicePerpetualTask
     assert any(isinstance(t, DevicePerpetualTask) for t in result)
+
+
+def _async_device(registers: dict) -> Mock:
+    mock_device = Mock(spec=ICom)
+    mock_device.DEFAULT_HARVEST_INTERVAL_MS = 1000
+    mock_device.supports_async_harvest.return_value = True
+    mock_device.get_device_mode.return_value = DeviceMode.READ
+
+    def read_async(force_verbose):
+        future = Future()
+        future.set_result(registers)
+        return future
+    mock_device.read_harvest_data_async.side_effect = read_async
+    return mock_device
+
+
+def test_execute_device_task_async_harvest(blackboard: BlackBoard):
+    registers = {"1": "1717"}
+    mock_device = _async_device(registers)
+
+    t = deviceTask.DeviceTask(0, blackboard, mock_device, harvestTransport.DefaultHarvestTransportFactory())
+    assert isinstance(t.harvester, harvest.AsyncHarvest)
+
+    # the first execution only starts the read
+    ret = t.execute(17)
+    assert t in ret
+    assert len(t.barn) == 0
+    mock_device.read_harvest_data.assert_not_called()
+
+    # the next one collects it and starts the next read
+    ret = t.execute(t.time)
+    assert t in ret
+    transports = [task for task in ret if isinstance(task, harvestTransport.HarvestTransport)]
+    assert len(transports) > 0
+    assert list(transports[0].barn.values()) == [registers]
+    assert mock_device.read_harvest_data_async.call_count == 2
+
+
+def test_async_harvest_waits_for_slow_read(blackboard: BlackBoard):
+    mock_device = _async_device({})
+    pending = Future()
+    mock_device.read_harvest_data_async.side_effect = None
+    mock_device.read_harvest_data_async.return_value = pending
+
+    h = harvest.AsyncHarvest()
+    now = blackboard.time_ms()
+    next_time, data = h.harvest(now, mock_device, blackboard)
+    assert data is None
+    assert next_time == now + 1000
+
+    next_time, data = h.harvest(next_time, mock_device, blackboard)
+    assert data is None
+    assert next_time <= blackboard.time_ms() + harvest.AsyncHarvest.POLL_INTERVAL_MS
+    assert mock_device.read_harvest_data_async.call_count == 1
+
+    pending.set_exception(ConnectionResetError())
+    with pytest.raises(ICom.ConnectionException):
+        h.harvest(next_time, mock_device, blackboard)
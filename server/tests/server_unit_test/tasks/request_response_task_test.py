@@ -5,6 +5,7 @@ from server.app.blackboard import BlackBoard
 from server.crypto.crypto_state import CryptoState
 from server.tasks.requestResponseTask import RequestTask, ResponseTask, handle_request, handle_request_task
 from server.web import handler
+from server.web.server import Endpoints
 
 
 @pytest.fixture
@@ -59,11 +60,12 @@ def test_handle_request_valid(blackboard):
         'id': 'test_id'
     }
 
-    with patch('server.tasks.requestResponseTask.Endpoints') as mock_entitites:
+    with patch('server.tasks.requestResponseTask.Endpoints.shared') as mock_shared:
         mock_endpoints = Mock()
+        mock_endpoints.routers = {'GET': Mock()}
         mock_endpoints.pre_do.return_value = ('/api/test', {})
-        mock_endpoints.get_api_handler.return_value = (Mock(), {})
-        mock_entitites.return_value = mock_endpoints
+        mock_endpoints.route.return_value = (Mock(), {})
+        mock_shared.return_value = mock_endpoints
 
         result = handle_request(blackboard, request_data)
 
@@ -137,25 +139,36 @@ def test_handle_request_task_wrong_subkey(blackboard):
     assert result is None
 
 # test when the api handler is not found
+def test_handle_request_handler_not_found(blackboard):
+    request_data = {
+        'method': 'GET',
+        'path': '/api/does/not/exist',
+        'headers': {},
+        'body': {},
+        'query': {},
+        'timestamp': blackboard.time_ms() // 1000,
+        'id': 'test_id'
+    }
 
+    result = handle_request(blackboard, request_data)
 
-def test_handle_request_task_api_handler_not_found(blackboard):
+    assert isinstance(result, ResponseTask)
+    assert "API handler not found" in result.data['error']
 
-    nonexistent_path = '/api/nonexistent'
 
-    data = {
-        'subKey': RequestTask.SUBKEY,
-        'data': json.dumps({
-            'method': 'GET',
-            'path': nonexistent_path,
-            'headers': {},
-            'body': {},
-            'query': {},
-            'timestamp': blackboard.time_ms() // 1000,
-            'id': 'test_id'
-        })
+def test_handle_request_uses_shared_routes(blackboard):
+    request_data = {
+        'method': 'DELETE',
+        'path': '/api/notification/42',
+        'headers': {},
+        'body': {},
+        'query': {},
+        'timestamp': blackboard.time_ms() // 1000,
+        'id': 'test_id'
     }
 
-    result = handle_request_task(blackboard, data)
-    assert isinstance(result, ResponseTask)
-    assert result.data['error'] == f"API handler not found for path {nonexistent_path}"
+    result = handle_request(blackboard, request_data)
+
+    assert isinstance(result, RequestTask)
+    assert result.handler is Endpoints.shared().api_delete_dict['notification/{id}']
+    assert result.request_data.post_params == {'id': '42'}
@@ -28,7 +28,7 @@ def test_execute_calls_post_and_handles_200_response():
     task = ConcreteSUT(0, {})
 
     # Mock the requests module so we can intercept the post() call
-    with patch("requests.post") as mock_post:
+    with patch("server.backend.http_client.HttpClient.post") as mock_post:
         mock_post.return_value = mock_response
         task._data = Mock(return_value=mock_data)
         task._on_200 = mock_on200
@@ -37,7 +37,7 @@ def test_execute_calls_post_and_handles_200_response():
 
         # wait for the thread to finish
         mock_post.assert_called_once_with(
-            "https://testnet.srcful.dev/gw/data/", data=mock_data, timeout=5
+            "https://testnet.srcful.dev/gw/data/", data=mock_data
         )
 
         mock_on200.assert_called_once_with(mock_response)
@@ -52,7 +52,7 @@ def test_execute_calls_post_and_handles_post_request_exception():
 
     # Mock the requests module so we can intercept the post() call
     with patch(
-        "requests.post", side_effect=requests.exceptions.RequestException
+        "server.backend.http_client.HttpClient.post", side_effect=requests.exceptions.RequestException
     ) as mock_post:
         mock_post.return_value = mock_response
         task._data = Mock(return_value=mock_data)
@@ -62,7 +62,7 @@ def test_execute_calls_post_and_handles_post_request_exception():
 
         # wait for the thread to finish
         mock_post.assert_called_once_with(
-            "https://testnet.srcful.dev/gw/data/", data=mock_data, timeout=5
+            "https://testnet.srcful.dev/gw/data/", data=mock_data
         )
 
         # check that onError was called with a requests.Response object
@@ -79,14 +79,14 @@ def test_execute_calls_post_and_handles_non_200_response():
     task = ConcreteSUT(0, {})
 
     # Mock the requests module so we can intercept the post() call
-    with patch("requests.post") as mock_post:
+    with patch("server.backend.http_client.HttpClient.post") as mock_post:
         mock_post.return_value = mock_response
         task._data = Mock(return_value=mock_data)
         task._on_error = mock_on_error
 
         result = task.execute(0)
         mock_post.assert_called_once_with(
-            "https://testnet.srcful.dev/gw/data/", data=mock_data, timeout=5
+            "https://testnet.srcful.dev/gw/data/", data=mock_data
         )
 
         mock_on_error.assert_called_once_with(mock_response)
@@ -101,14 +101,14 @@ def test_execute_calls_post_and_handles_non_200_response_with_tasks():
     task = ConcreteSUT(0, {})
 
     # Mock the requests module so we can intercept the post() call
-    with patch("requests.post") as mock_post:
+    with patch("server.backend.http_client.HttpClient.post") as mock_post:
         mock_post.return_value = mock_response
         task._data = Mock(return_value=mock_data)
         task._on_error = mock_on_error
 
         result = task.execute(0)
         mock_post.assert_called_once_with(
-            "https://testnet.srcful.dev/gw/data/", data=mock_data, timeout=5
+            "https://testnet.srcful.dev/gw/data/", data=mock_data
         )
 
         mock_on_error.assert_called_once_with(mock_response)
@@ -131,7 +131,7 @@ def test_execute_handles_request_exception_returns_time():
     task = ConcreteSUT(0, {})
 
     # Mock the requests module so it raises a RequestException when post() is called
-    with patch("requests.post", side_effect=requests.exceptions.RequestException):
+    with patch("server.backend.http_client.HttpClient.post", side_effect=requests.exceptions.RequestException):
         # Set the task's _data method to return our mock data
         task._data = Mock(return_value=mock_data)
 
@@ -155,7 +155,7 @@ def test_execute_handles_request_exception_returns_task():
     task = ConcreteSUT(0, {})
 
     # Mock the requests module so it raises a RequestException when post() is called
-    with patch("requests.post", side_effect=requests.exceptions.RequestException):
+    with patch("server.backend.http_client.HttpClient.post", side_effect=requests.exceptions.RequestException):
         # Set the task's _data method to return our mock data
         task._data = Mock(return_value=mock_data)
 
@@ -178,7 +178,7 @@ def test_execute_handles_request_exception_returns_time_and_task():
     task = ConcreteSUT(0, {})
 
     # Mock the requests module so it raises a RequestException when post() is called
-    with patch("requests.post", side_effect=requests.exceptions.RequestException):
+    with patch("server.backend.http_client.HttpClient.post", side_effect=requests.exceptions.RequestException):
         # Set the task's _data method to return our mock data
         task._data = Mock(return_value=mock_data)
 
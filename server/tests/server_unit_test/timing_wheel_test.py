@@ -0,0 +1,196 @@
+import queue
+import random
+import time
+from server.app.timing_wheel import TimingWheel
+from server.tasks.itask import ITask
+
+
+class SimTask(ITask):
+    def __init__(self, time: int, period: int = 0):
+        self.time = time
+        self.period = period
+
+    def get_time(self) -> int:
+        return self.time
+
+    def adjust_time(self, new_time: int):
+        self.time = new_time
+
+
+def _drain(wheel: TimingWheel, now: int) -> list:
+    ret = []
+    task = wheel.pop_due(now)
+    while task is not None:
+        ret.append(task)
+        task = wheel.pop_due(now)
+    return ret
+
+
+def test_pop_in_time_order():
+    wheel = TimingWheel(tick_ms=10, num_slots=8)
+    rnd = random.Random(3)
+    tasks = [SimTask(rnd.randint(0, 1000)) for _ in range(200)]
+    for task in tasks:
+        wheel.add(task)
+
+    assert wheel.peek_time() == min(t.time for t in tasks)
+    popped = _drain(wheel, 1000)
+    assert [t.time for t in popped] == sorted(t.time for t in tasks)
+    assert len(wheel) == 0
+    assert wheel.peek_time() is None
+
+
+def test_nothing_before_due():
+    wheel = TimingWheel(tick_ms=10, num_slots=8)
+    task = SimTask(105)
+    wheel.add(task)
+
+    assert wheel.pop_due(104) is None
+    assert wheel.peek_time() == 105
+    assert wheel.pop_due(105) is task
+
+
+def test_same_time_is_fifo():
+    wheel = TimingWheel()
+    tasks = [SimTask(50) for _ in range(5)]
+    for task in tasks:
+        wheel.add(task)
+
+    assert _drain(wheel, 50) == tasks
+
+
+def test_task_added_in_the_past():
+    wheel = TimingWheel(tick_ms=10, num_slots=8)
+    wheel.add(SimTask(500))
+    _drain(wheel, 400)
+
+    late = SimTask(100)
+    wheel.add(late)
+    assert wheel.peek_time() == 100
+    assert wheel.pop_due(400) is late
+
+
+def test_tasks_beyond_one_turn():
+    wheel = TimingWheel(tick_ms=10, num_slots=8)  # one turn is 80 ms
+    far = SimTask(5 * 60 * 1000)
+    near = SimTask(15)
+    wheel.add(far)
+    wheel.add(near)
+
+    assert _drain(wheel, 1000) == [near]
+    assert wheel.peek_time() == far.time
+    assert wheel.pop_due(far.time - 1) is None
+    assert wheel.pop_due(far.time) is far
+
+
+def test_cancel():
+    wheel = TimingWheel()
+    a, b = SimTask(10), SimTask(20)
+    wheel.add(a)
+    wheel.add(b)
+
+    assert wheel.cancel(a)
+    assert not wheel.cancel(a)
+    assert a not in wheel
+    assert wheel.peek_time() == 20
+    assert _drain(wheel, 100) == [b]
+
+
+def test_cancel_ready_task():
+    wheel = TimingWheel(tick_ms=10)
+    a, b = SimTask(10), SimTask(11)
+    wheel.add(a)
+    wheel.add(b)
+    assert wheel.pop_due(10) is a  # b is moved to the ready heap with a
+
+    assert wheel.cancel(b)
+    assert wheel.pop_due(100) is None
+    assert len(wheel) == 0
+
+
+def test_reschedule_in_place():
+    wheel = TimingWheel()
+    a, b = SimTask(10), SimTask(20)
+    wheel.add(a)
+    wheel.add(b)
+
+    wheel.reschedule(a, 30)
+    assert a.time == 30
+    assert len(wheel) == 2
+    assert _drain(wheel, 100) == [b, a]
+
+
+def test_time_is_read_when_added():
+    wheel = TimingWheel()
+    task = SimTask(10)
+    wheel.add(task)
+    task.time = 1000  # changing the task outside of the wheel does not move it
+
+    assert wheel.pop_due(10) is task
+
+
+def test_tasks_snapshot():
+    wheel = TimingWheel()
+    tasks = [SimTask(t) for t in (30, 10, 20)]
+    for task in tasks:
+        wheel.add(task)
+
+    assert sorted(wheel.tasks(), key=lambda e: e[0]) == [(10, tasks[1]), (20, tasks[2]), (30, tasks[0])]
+
+
+PERIODS = [250, 1000, 10_000, 300_000]
+
+
+def _periodic_tasks(count: int) -> list[SimTask]:
+    rnd = random.Random(11)
+    tasks = []
+    for _ in range(count):
+        period = rnd.choice(PERIODS)
+        tasks.append(SimTask(rnd.randint(0, period), period))
+    return tasks
+
+
+def _simulate_priority_queue(tasks: list[SimTask], duration_ms: int, step_ms: int) -> int:
+    # the scheduler core before the timing wheel
+    q = queue.PriorityQueue()
+    for task in tasks:
+        q.put(task)
+    executed = 0
+    for now in range(0, duration_ms, step_ms):
+        while not q.empty() and q.queue[0].get_time() <= now:
+            task = q.get()
+            executed += 1
+            task.adjust_time(task.time + task.period)
+            q.put(task)
+    return executed
+
+
+def _simulate_wheel(tasks: list[SimTask], duration_ms: int, step_ms: int) -> int:
+    wheel = TimingWheel()
+    for task in tasks:
+        wheel.add(task)
+    executed = 0
+    for now in range(0, duration_ms, step_ms):
+        while wheel.peek_time() is not None and wheel.peek_time() <= now:
+            task = wheel.pop_due(now)
+            executed += 1
+            task.adjust_time(task.time + task.period)
+            wheel.add(task)
+    return executed
+
+
+def test_scheduler_benchmark():
+    # 10k periodic tasks with the periods of the gateway tasks, 10 s simulated time in 10 ms steps
+    duration_ms, step_ms = 10_000, 10
+
+    start = time.perf_counter()
+    executed_queue = _simulate_priority_queue(_periodic_tasks(10_000), duration_ms, step_ms)
+    queue_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    executed_wheel = _simulate_wheel(_periodic_tasks(10_000), duration_ms, step_ms)
+    wheel_s = time.perf_counter() - start
+
+    print("Executed %d tasks, priority queue %.2f s, timing wheel %.2f s" % (executed_wheel, queue_s, wheel_s))
+    assert executed_wheel == executed_queue
+    assert wheel_s < queue_s
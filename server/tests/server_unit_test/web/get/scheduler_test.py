@@ -0,0 +1,19 @@
+import pytest
+import json
+from server.web.handler.requestData import RequestData
+from server.web.handler.get.scheduler import Handler
+
+
+@pytest.fixture
+def request_data(blackboard):
+    return RequestData(blackboard, {}, {}, {})
+
+
+def test_scheduler(request_data):
+    request_data.bb.scheduler_stats.record_execution("DeviceTask", 12, 3)
+
+    status_code, response = Handler().do_get(request_data)
+    assert status_code == 200
+    response = json.loads(response)
+    assert response["tasks"]["DeviceTask"]["lateness"]["count"] == 1
+    assert "worker_utilization" in response
@@ -0,0 +1,73 @@
+import time
+from server.web.server import Endpoints, Router
+
+
+def _registered_paths(endpoints: Endpoints):
+    """All registered (method, path) pairs with parameters filled in"""
+    api_dicts = {"GET": endpoints.api_get_dict, "POST": endpoints.api_post_dict, "DELETE": endpoints.api_delete_dict}
+    return [(method, "/api/" + key.replace("{id}", "17")) for method, api_dict in api_dicts.items() for key in api_dict]
+
+
+def test_shared_endpoints_are_built_once():
+    assert Endpoints.shared() is Endpoints.shared()
+
+
+def test_router_literal_and_parameterized():
+    router = Router({"notification": "list", "notification/{id}": "message", "state": "state"})
+
+    assert router.route("/api/notification") == ("list", {})
+    assert router.route("/api/notification/5") == ("message", {"id": "5"})
+    assert router.route("/api/state") == ("state", {})
+    assert router.route("/api/nothing") == (None, None)
+    assert router.route("/state") == (None, None)
+
+
+def test_route_of_registered_paths():
+    endpoints = Endpoints.shared()
+    expected = [
+        ("GET", "/api/crypto", endpoints.api_get_dict["crypto"], {}),
+        ("GET", "/api/crypto/revive", endpoints.api_get_dict["crypto/revive"], {}),
+        ("GET", "/api/inverter/modbus/scan", endpoints.api_get_dict["inverter/modbus/scan"], {}),
+        ("GET", "/api/device/supported/configurations", endpoints.api_get_dict["device/supported/configurations"], {}),
+        ("GET", "/api/notification", endpoints.api_get_dict["notification"], {}),
+        ("GET", "/api/notification/17", endpoints.api_get_dict["notification/{id}"], {"id": "17"}),
+        ("GET", "/api/notification/17/18", endpoints.api_get_dict["notification/{id}"], {"id": "17/18"}),
+        ("POST", "/api/crypto/sign", endpoints.api_post_dict["crypto/sign"], {}),
+        ("POST", "/api/system/ble/stop", endpoints.api_post_dict["system/ble/stop"], {}),
+        ("DELETE", "/api/notification/17", endpoints.api_delete_dict["notification/{id}"], {"id": "17"}),
+        ("DELETE", "/api/wifi", endpoints.api_delete_dict["wifi"], {}),
+        ("GET", "/api/unknown", None, None),
+        ("GET", "/api/notification/", None, None),
+        ("GET", "/state", None, None),
+        ("POST", "/api/crypto", None, None),
+        ("DELETE", "/api/notification", None, None),
+        ("PUT", "/api/state", None, None),
+    ]
+
+    for method, path, handler, params in expected:
+        assert endpoints.route(method, path) == (handler, params), f"{method} {path}"
+
+    for method, path in _registered_paths(endpoints):
+        assert endpoints.route(method, path)[0] is not None, f"{method} {path}"
+
+
+def test_routing_benchmark():
+    # micro-benchmark: route every registered path, before each request built its own Endpoints
+    endpoints = Endpoints.shared()
+    paths = _registered_paths(endpoints)
+    rounds = 5
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for method, path in paths:
+            Endpoints().route(method, path)
+    before_us = (time.perf_counter() - start) / (rounds * len(paths)) * 1e6
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for method, path in paths:
+            endpoints.route(method, path)
+    after_us = (time.perf_counter() - start) / (rounds * len(paths)) * 1e6
+
+    print("Routing time per request in us over %d paths (before, after): (%.1f, %.2f)" % (len(paths), before_us, after_us))
+    assert after_us < before_us
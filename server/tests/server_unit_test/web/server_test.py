@@ -1,8 +1,12 @@
+import http.client
+import socket
+import time
+import threading
 from http import HTTPStatus
 from io import BytesIO
 from unittest.mock import Mock, patch
 from server.crypto.crypto_state import CryptoState
-from server.web.server import Server, request_handler_factory, Endpoints
+from server.web.server import Server, request_handler_factory, Endpoints, Router
 from http.server import BaseHTTPRequestHandler
 import pytest
 import json
@@ -48,7 +52,7 @@ def test_handler_api_get_enpoints_params(mock_setup, mock_handle, mock_finish):
     from server.web.handler.get.modbus import ModbusHandler
     handlers = {"inverter/modbus": ModbusHandler()}
 
-    handler, params = h.get_api_handler(path, "/api/", h.convert_keys_to_regex(handlers))
+    handler, params = Router(handlers).route(path)
     assert handler is not None
     assert params is not None
     assert hasattr(handler, "do_get")
@@ -227,7 +231,7 @@ def test_hanler_post_returns_exception(mock_setup, mock_handle, mock_finish, bb:
 def test_handler_get_do_get(mock_setup, mock_handle, mock_finish, bb: BlackBoard):
     # check that all get handlers have a doGet method
     h = request_handler_factory(bb)(None, None, None)
-    for handler in h.endpoints.api_get.values():
+    for handler in h.endpoints.api_get_dict.values():
         assert hasattr(handler, "do_get")
         assert hasattr(handler, "schema")
         assert handler.schema() is not None
@@ -243,7 +247,7 @@ def test_handler_get_do_get(mock_setup, mock_handle, mock_finish, bb: BlackBoard
 def test_handler_get_do_post(mock_setup, mock_handle, mock_finish, bb: BlackBoard):
     # check that all post handlers have a doPost method
     h = request_handler_factory(bb)(None, None, None)
-    for handler in h.endpoints.api_post.values():
+    for handler in h.endpoints.api_post_dict.values():
         assert hasattr(handler, "do_post")
         assert hasattr(handler, "schema")
         assert handler.schema() is not None
@@ -259,7 +263,7 @@ def test_handler_get_do_post(mock_setup, mock_handle, mock_finish, bb: BlackBoar
 def test_handler_get_do_delete(mock_setup, mock_handle, mock_finish, bb: BlackBoard):
     # check that all post handlers have a doPost method
     h = request_handler_factory(bb)(None, None, None)
-    for handler in h.endpoints.api_delete.values():
+    for handler in h.endpoints.api_delete_dict.values():
         assert hasattr(handler, "do_delete")
         assert hasattr(handler, "schema")
         assert handler.schema() is not None
@@ -267,3 +271,108 @@ def test_handler_get_do_delete(mock_setup, mock_handle, mock_finish, bb: BlackBo
             json.dumps(handler.schema())
         except Exception:
             raise AssertionError("Failed to json.dumps schema for {}".format(handler))
+
+
+def test_server_keeps_connections_alive(bb: BlackBoard):
+    s = Server(("127.0.0.1", 0), bb, max_workers=2)
+    s.start()
+    threads_before = threading.active_count()
+    try:
+        conn = http.client.HTTPConnection(*s.server_address, timeout=5)
+        for _ in range(10):
+            conn.request("GET", "/api/uptime")
+            response = conn.getresponse()
+            assert response.status == 200
+            assert "msek" in json.loads(response.read())
+
+        # unknown paths must not close the connection either
+        conn.request("GET", "/api/does/not/exist")
+        response = conn.getresponse()
+        assert response.status == 404
+        response.read()
+
+        conn.request("GET", "/api/uptime")
+        assert conn.getresponse().status == 200
+        conn.close()
+
+        # at most the pool workers are started, not one thread per request
+        assert threading.active_count() <= threads_before + 2
+    finally:
+        s.close()
+    assert s._web_server is None
+
+
+def test_idle_connections_do_not_hold_workers(bb: BlackBoard):
+    s = Server(("127.0.0.1", 0), bb, max_workers=2)
+    s.start()
+    idle = []
+    try:
+        for _ in range(8):
+            conn = http.client.HTTPConnection(*s.server_address, timeout=5)
+            conn.request("GET", "/api/uptime")
+            conn.getresponse().read()
+            idle.append(conn)  # kept alive, no request is sent
+
+        start = time.monotonic()
+        conn = http.client.HTTPConnection(*s.server_address, timeout=5)
+        conn.request("GET", "/api/uptime")
+        assert conn.getresponse().status == 200
+        assert time.monotonic() - start < 1
+        conn.close()
+
+        # the idle connections are still open for the next request
+        idle[0].request("GET", "/api/uptime")
+        assert idle[0].getresponse().status == 200
+    finally:
+        for conn in idle:
+            conn.close()
+        s.close()
+
+
+def test_unknown_post_body_is_not_read_as_a_request(bb: BlackBoard):
+    s = Server(("127.0.0.1", 0), bb, max_workers=2)
+    s.start()
+    try:
+        conn = http.client.HTTPConnection(*s.server_address, timeout=5)
+        for method in ("POST", "DELETE"):
+            conn.request(method, "/api/does/not/exist", body="GARBAGE / HTTP/1.1\r\n\r\n")
+            response = conn.getresponse()
+            assert response.status == 404
+            response.read()
+
+            conn.request("GET", "/api/uptime")
+            response = conn.getresponse()
+            assert response.status == 200
+            response.read()
+        conn.close()
+    finally:
+        s.close()
+
+
+def test_pipelined_requests_are_answered(bb: BlackBoard):
+    s = Server(("127.0.0.1", 0), bb, max_workers=2)
+    s.start()
+    try:
+        with socket.create_connection(s.server_address, timeout=5) as sock:
+            sock.sendall(b"GET /api/uptime HTTP/1.1\r\nHost: x\r\n\r\n" * 3)
+            received = b""
+            while received.count(b"HTTP/1.1 200") < 3:
+                data = sock.recv(4096)
+                assert data
+                received += data
+    finally:
+        s.close()
+
+
+def test_idle_connections_are_closed_after_keep_alive_timeout(bb: BlackBoard):
+    s = Server(("127.0.0.1", 0), bb, max_workers=2, keep_alive_timeout=0.2)
+    s.start()
+    try:
+        with socket.create_connection(s.server_address, timeout=5) as sock:
+            sock.sendall(b"GET /api/uptime HTTP/1.1\r\nHost: x\r\n\r\n")
+            received = sock.recv(4096)
+            assert received.startswith(b"HTTP/1.1 200")
+            while received:
+                received = sock.recv(4096)  # returns b"" when the server closes the connection
+    finally:
+        s.close()
@@ -22,3 +22,4 @@ from . import system
 from . import mdns_scan
 from . import connections
 from . import owner
+from . import scheduler
@@ -0,0 +1,15 @@
+import json
+from ..handler import GetHandler
+from ..requestData import RequestData
+
+
+class Handler(GetHandler):
+    def schema(self):
+        return {
+            "type": "get",
+            "description": "Returns task scheduler instrumentation: execution time and start lateness histograms per task class, queue depth and worker utilization",
+            "returns": "scheduler statistics as a json object",
+        }
+
+    def do_get(self, data: RequestData):
+        return 200, json.dumps(data.bb.scheduler_stats.to_dict())
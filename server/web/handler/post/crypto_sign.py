@@ -4,6 +4,7 @@ import random
 import re
 from typing import Optional
 from server.crypto import crypto
+from server.crypto.signing_service import SigningService, SigningPriority
 
 from ..handler import PostHandler
 from ..requestData import RequestData
@@ -64,8 +65,8 @@ class Handler(PostHandler):
             return 400, json.dumps({"status": str(e)})
 
 
-        with crypto.Chip() as chip:
-            message, signature = self._add_serial_and_sign_message(message, chip)
+        sign = lambda chip: self._add_serial_and_sign_message(message, chip)
+        message, signature = SigningService.get_instance().submit(sign, SigningPriority.REQUEST).result(SigningService.TIMEOUT_S)
 
-            return 200, json.dumps({"message": message, "sign": signature})
+        return 200, json.dumps({"message": message, "sign": signature})
 
@@ -1,6 +1,7 @@
 import json
 import logging
 from server.crypto import crypto
+from server.crypto.signing_service import SigningService, SigningPriority
 
 from ..handler import PostHandler
 from ..requestData import RequestData
@@ -43,24 +44,23 @@ class Handler(PostHandler):
             expires_in = data.data.get("expires_in", 5)
 
             # Create JWT using crypto chip
-            with crypto.Chip() as chip:
-                try:
-                    jwt_token = chip.build_jwt(barn, headers, expires_in)
-                    logger.info("JWT created successfully")
+            try:
+                jwt_token = SigningService.get_instance().build_jwt(barn, headers, SigningPriority.REQUEST, expires_in).result(SigningService.TIMEOUT_S)
+                logger.info("JWT created successfully")
 
-                    # Return JWT with data and headers
-                    response = {
-                        "jwt": jwt_token,
-                        "headers": headers,
-                        "data": barn,
-                        "expires_in": expires_in
-                    }
+                # Return JWT with data and headers
+                response = {
+                    "jwt": jwt_token,
+                    "headers": headers,
+                    "data": barn,
+                    "expires_in": expires_in
+                }
 
-                    return 200, json.dumps(response)
+                return 200, json.dumps(response)
 
-                except crypto.ChipError as e:
-                    logger.error("Error creating JWT: %s", e)
-                    return 500, json.dumps({"error": f"Failed to create JWT: {str(e)}"})
+            except (crypto.ChipError, TimeoutError) as e:
+                logger.error("Error creating JWT: %s", e)
+                return 500, json.dumps({"error": f"Failed to create JWT: {str(e)}"})
 
         except Exception as e:
             logger.error("Unexpected error in JWT creation: %s", e)
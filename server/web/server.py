@@ -1,6 +1,12 @@
 import re
 import json
-import select
+import queue
+import selectors
+import socket
+import threading
+import time
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
 from http.server import BaseHTTPRequestHandler, HTTPServer
 from urllib.parse import unquote_plus
 
@@ -13,7 +19,43 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 
+class Router:
+    """Maps the api paths of one http method to their handlers.
+    Literal paths are a dict lookup, only paths with {parameters} fall back to a regex match."""
+
+    def __init__(self, api_dict: dict):
+        self.literal = {key: value for key, value in api_dict.items() if "{" not in key}
+        self.parameterized = Router.convert_keys_to_regex({key: value for key, value in api_dict.items() if "{" in key})
+
+    @staticmethod
+    def convert_keys_to_regex(api_dict):
+        regex_dict = {}
+        for key, value in api_dict.items():
+            key = re.sub(r"\{(.+?)\}", r"(?P<\1>.+)", key)
+            regex_dict[re.compile("^" + key + "$")] = value
+        return regex_dict
+
+    def route(self, path: str, api_root: str = "/api/"):
+        """Returns the handler and path parameters for path, or None, None if there is no handler"""
+        if not path.startswith(api_root):
+            return None, None
+        path = path[len(api_root):]
+
+        _handler = self.literal.get(path)
+        if _handler is not None:
+            return _handler, {}
+
+        for pattern, _handler in self.parameterized.items():
+            match = pattern.match(path)
+            if match:
+                return _handler, match.groupdict()
+        return None, None
+
+
 class Endpoints:
+    _shared: Optional["Endpoints"] = None
+    _shared_lock = threading.Lock()
+
     def __init__(self):
         self.api_get_dict = {
             # "dee": handler.get.dee.Handler(),
@@ -63,6 +105,7 @@ class Endpoints:
             "state/update": handler.get.state.UpdateStateHandler(),
             "system": handler.get.system.SystemHandler(),
             "system/details": handler.get.system.SystemDetailsHandler(),
+            "scheduler": handler.get.scheduler.Handler(),
         }
 
         self.api_post_dict = {
@@ -91,9 +134,26 @@ class Endpoints:
             "wifi": handler.delete.wifi.Handler(),
         }
 
-        self.api_get = Endpoints.convert_keys_to_regex(self.api_get_dict)
-        self.api_post = Endpoints.convert_keys_to_regex(self.api_post_dict)
-        self.api_delete = Endpoints.convert_keys_to_regex(self.api_delete_dict)
+        self.routers = {
+            "GET": Router(self.api_get_dict),
+            "POST": Router(self.api_post_dict),
+            "DELETE": Router(self.api_delete_dict),
+        }
+
+    @classmethod
+    def shared(cls) -> "Endpoints":
+        """Returns the endpoints built at startup, handlers are stateless and can be shared by all requests"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def route(self, method: str, path: str):
+        """Returns the handler and path parameters for an http method and path, or None, None if there is no handler"""
+        router = self.routers.get(method)
+        if router is None:
+            return None, None
+        return router.route(path)
 
     @staticmethod
     def query_2_dict(query_string: str):
@@ -108,23 +168,6 @@ class Endpoints:
             for k, v in (x.split("=") for x in post_data.split("&"))
         }
 
-    @staticmethod
-    def convert_keys_to_regex(api_dict):
-        regex_dict = {}
-        for key, value in api_dict.items():
-            key = re.sub(r"\{(.+?)\}", r"(?P<\1>.+)", key)
-            regex_dict[re.compile("^" + key + "$")] = value
-        return regex_dict
-
-    @staticmethod
-    def get_api_handler(path: str, api_root: str, api_handler_regex: dict):
-        if path.startswith(api_root):
-            for pattern, _handler in api_handler_regex.items():
-                match = pattern.match(path[len(api_root):])
-                if match:
-                    return _handler, match.groupdict()
-        return None, None
-
     @staticmethod
     def get_data(headers: dict, rfile):
         if "Content-Length" not in headers:
@@ -152,12 +195,56 @@ class Endpoints:
         return parts[0], Endpoints.query_2_dict(query_string)
 
 
+class KeepAliveRequestHandler(BaseHTTPRequestHandler):
+    """Handles the requests of a connection that are ready to be read, then hands the connection back to the
+    server. The server waits for the next request on the connection without holding a worker."""
+
+    # HTTP/1.1 keeps the connection open between requests
+    protocol_version = "HTTP/1.1"
+    MAX_DISCARD = 64 * 1024  # larger bodies of unhandled requests are not read, the connection is closed instead
+
+    keep_alive = False  # the connection is open for the next request when the handler is done
+
+    def handle_one_request(self):
+        super().handle_one_request()
+        if not self.close_connection and not self._request_buffered():
+            self.keep_alive = True
+            self.close_connection = True  # ends handle(), the server waits for the next request
+
+    def _request_buffered(self) -> bool:
+        """True if (part of) the next request is already read, e.g. a pipelined request, it is handled right away"""
+        timeout = self.connection.gettimeout()
+        try:
+            self.connection.settimeout(0)
+            return len(self.rfile.peek(1)) > 0
+        except OSError:
+            return False
+        finally:
+            self.connection.settimeout(timeout)
+
+    def discard_body(self):
+        """Read the body of a request that is not handled, the next request on the connection starts after it"""
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+        if length < 0 or length > self.MAX_DISCARD or "Transfer-Encoding" in self.headers:
+            self.close_connection = True
+        elif length > 0:
+            self.rfile.read(length)
+
+
 def request_handler_factory(bb: BlackBoard):
-    class Handler(BaseHTTPRequestHandler):
+    endpoints = Endpoints.shared()
+
+    class Handler(KeepAliveRequestHandler):
+        # the time a request that has started to arrive may take, idle connections are closed by the server
+        timeout = Server.KEEP_ALIVE_TIMEOUT
+
         def __init__(self, *args, **kwargs):
 
             logger.debug("initializing a request handler")
-            self.endpoints = Endpoints()
+            self.endpoints = endpoints
 
             super(Handler, self).__init__(*args, **kwargs)
 
@@ -165,7 +252,6 @@ def request_handler_factory(bb: BlackBoard):
             try:
                 self.send_response(code)
                 self.send_header("Content-type", "application/json")
-                self.send_header("Connection", "close")
                 response = bytes(response, "utf-8")
                 self.send_header("Content-Length", len(response))
                 self.end_headers()
@@ -183,6 +269,11 @@ def request_handler_factory(bb: BlackBoard):
             self.wfile.write(response)
             self.wfile.flush()
 
+        def send_not_found(self):
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
         def log_message(self, format, *args):
             """Override BaseHTTPRequestHandler's log_message to use our logger instead of stderr"""
             # Use debug level for HTTP request logging to reduce verbosity
@@ -193,7 +284,7 @@ def request_handler_factory(bb: BlackBoard):
         def do_POST(self):
             path, query = Endpoints.pre_do(self.path)
 
-            api_handler, params = Endpoints.get_api_handler(path, "/api/", self.endpoints.api_post)
+            api_handler, params = self.endpoints.route("POST", path)
             if api_handler is not None:
                 post_data = Endpoints.get_data(self.headers, self.rfile)
 
@@ -209,8 +300,8 @@ def request_handler_factory(bb: BlackBoard):
                 self.send_api_response(code, response)
                 return
             else:
-                self.send_response(404)
-                self.end_headers()
+                self.discard_body()
+                self.send_not_found()
                 return
 
         # this needs to be GET as this is a direct mapping of the http method
@@ -223,7 +314,7 @@ def request_handler_factory(bb: BlackBoard):
                     self.send_api_response(200, schema)
                     return
 
-                api_handler, params = Endpoints.get_api_handler(path, "/api/", self.endpoints.api_get)
+                api_handler, params = self.endpoints.route("GET", path)
                 rdata = handler.RequestData(bb, params, query, {})
 
                 if path == "" or path == "/":
@@ -242,17 +333,15 @@ def request_handler_factory(bb: BlackBoard):
                     return
                 else:
                     # check if we have a post handler
-                    api_handler, params = self.endpoints.get_api_handler(
-                        path, "/api/", self.endpoints.api_post
-                    )
+                    api_handler, params = self.endpoints.route("POST", path)
                     if api_handler is not None:
                         self.send_api_response(200, api_handler.schema())
                         return
 
-                self.send_response(404)
-                self.end_headers()
+                self.send_not_found()
             except Exception as e:
                 logger.exception("Exception in do_GET: %s", e)
+                self.close_connection = True
             return
 
         # this needs to be DELETE as this is a direct mapping of the http method
@@ -260,7 +349,7 @@ def request_handler_factory(bb: BlackBoard):
         def do_DELETE(self):
             path, query = self.endpoints.pre_do(self.path)
 
-            api_handler, params = Endpoints.get_api_handler(path, "/api/", self.endpoints.api_delete)
+            api_handler, params = self.endpoints.route("DELETE", path)
             if api_handler is not None:
                 post_data = Endpoints.get_data(self.headers, self.rfile)
 
@@ -270,8 +359,8 @@ def request_handler_factory(bb: BlackBoard):
                 self.send_api_response(code, response)
                 return
 
-            self.send_response(404)
-            self.end_headers()
+            self.discard_body()
+            self.send_not_found()
             return
 
         def get_doc_dict(self, api_dict: dict, path: str):
@@ -296,30 +385,157 @@ def request_handler_factory(bb: BlackBoard):
     return Handler
 
 
+class PooledHTTPServer(HTTPServer):
+    """HTTP server that waits for requests on a selector and handles them on a bounded pool of worker threads.
+
+    Only connections with a request to read are handed to a worker. Idle keep-alive connections wait in the
+    selector, so they do not hold a worker, and are closed after keep_alive_timeout seconds without a request.
+    The selector and the idle connections are only used by the thread running serve_forever, the workers hand
+    kept alive connections back through a queue."""
+
+    def __init__(self, server_address: tuple[str, int], request_handler_class, max_workers: int,
+                 keep_alive_timeout: float):
+        super().__init__(server_address, request_handler_class)
+        self.keep_alive_timeout = keep_alive_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="web")
+        self._selector = selectors.DefaultSelector()
+        self._idle: dict[socket.socket, tuple[tuple, float]] = {}  # connection -> (client address, idle since)
+        self._returned: queue.SimpleQueue = queue.SimpleQueue()  # connections kept alive by the workers
+        self._wakeup_receiver, self._wakeup_sender = socket.socketpair()
+        self._wakeup_receiver.setblocking(False)
+        self._stop_request = False
+        self._stopped = threading.Event()
+        self._stopped.set()
+
+    def serve_forever(self, poll_interval: float = 0.5):
+        self._stopped.clear()
+        try:
+            self._selector.register(self.socket, selectors.EVENT_READ)
+            self._selector.register(self._wakeup_receiver, selectors.EVENT_READ)
+            while not self._stop_request:
+                for key, _ in self._selector.select(poll_interval):
+                    if key.fileobj is self.socket:
+                        self._accept()
+                    elif key.fileobj is self._wakeup_receiver:
+                        self._drain_wakeups()
+                    else:
+                        self._dispatch(key.fileobj)
+                self._park_returned()
+                self._close_idle(time.monotonic() - self.keep_alive_timeout)
+        finally:
+            self._selector.unregister(self.socket)
+            self._selector.unregister(self._wakeup_receiver)
+            self._park_returned()
+            self._close_idle(float("inf"))
+            self._stop_request = False
+            self._stopped.set()
+
+    def shutdown(self):
+        self._stop_request = True
+        self._wakeup()
+        self._stopped.wait()
+
+    def _accept(self):
+        try:
+            request, client_address = self.get_request()
+        except OSError:
+            return
+        if self.verify_request(request, client_address):
+            self._park(request, client_address)  # a new connection is handled when its first request arrives
+        else:
+            self.shutdown_request(request)
+
+    def _park(self, request: socket.socket, client_address: tuple):
+        self._idle[request] = (client_address, time.monotonic())
+        self._selector.register(request, selectors.EVENT_READ)
+
+    def _park_returned(self):
+        while True:
+            try:
+                request, client_address = self._returned.get_nowait()
+            except queue.Empty:
+                return
+            self._park(request, client_address)
+
+    def _dispatch(self, request: socket.socket):
+        self._selector.unregister(request)
+        client_address, _ = self._idle.pop(request)
+        self._executor.submit(self._process_request, request, client_address)
+
+    def _close_idle(self, idle_since: float):
+        for request, (_, since) in list(self._idle.items()):
+            if since <= idle_since:
+                self._selector.unregister(request)
+                del self._idle[request]
+                self.shutdown_request(request)
+
+    def _process_request(self, request, client_address):
+        keep_alive = False
+        try:
+            keep_alive = self.RequestHandlerClass(request, client_address, self).keep_alive
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            if keep_alive and not self._stop_request:
+                self._returned.put((request, client_address))
+                self._wakeup()
+            else:
+                self.shutdown_request(request)
+
+    def _wakeup(self):
+        try:
+            self._wakeup_sender.send(b"\0")
+        except OSError:
+            pass  # the socket buffer is full, the server is woken up already
+
+    def _drain_wakeups(self):
+        try:
+            while self._wakeup_receiver.recv(4096):
+                pass
+        except OSError:
+            pass
+
+    def server_close(self):
+        super().server_close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        while not self._returned.empty():
+            self.shutdown_request(self._returned.get_nowait()[0])
+        self._selector.close()
+        self._wakeup_receiver.close()
+        self._wakeup_sender.close()
+
+
 class Server:
+    """The local REST server, it runs on its own thread and is not driven by the task scheduler"""
+
+    MAX_WORKERS = 8
+    KEEP_ALIVE_TIMEOUT = 5  # seconds
+
     _web_server: HTTPServer = None
+    _thread: threading.Thread = None
 
-    def __init__(self, web_host: tuple[str, int], bb: BlackBoard):
-        self._web_server = HTTPServer(web_host, request_handler_factory(bb))
+    def __init__(self, web_host: tuple[str, int], bb: BlackBoard, max_workers: int = MAX_WORKERS,
+                 keep_alive_timeout: float = KEEP_ALIVE_TIMEOUT):
+        self._web_server = PooledHTTPServer(web_host, request_handler_factory(bb), max_workers, keep_alive_timeout)
 
-        self._web_server.timeout = 0.25
-        # self._web_server.socket.setblocking(False)
+    @property
+    def server_address(self) -> tuple[str, int]:
+        return self._web_server.server_address
+
+    def start(self):
+        self._thread = threading.Thread(target=self._web_server.serve_forever, name="web_server", daemon=True)
+        self._thread.start()
 
     def close(self):
         if self._web_server:
+            if self._thread is not None:
+                self._web_server.shutdown()
+                self._thread.join()
+                self._thread = None
             self._web_server.server_close()
             self._web_server = None
 
-    def request_pending(self) -> bool:
-        ready_to_read, _, _ = select.select([self._web_server.socket], [], [], 0)
-        return ready_to_read
-
-    def request_queue_size(self) -> int:
-        return self._web_server.request_queue_size
-
-    def handle_request(self):
-        # logger.info("handling request")
-        self._web_server.handle_request()
-
     def __del__(self):
-        self.close()
+        # a running server must be closed explicitly, waiting for the server thread here can dead lock at interpreter exit
+        if self._thread is None:
+            self.close()